@@ -0,0 +1,159 @@
+"""
+Cold start and import-time profile of the app
+
+Starts fresh interpreters that import src/main.py and serve one request,
+with routes registered up front (eager) and on first request
+(LAZY_BLUEPRINTS=1), and reports where the import time goes:
+
+    cd asx_backend
+    python -m benchmarks.cold_start --path /api/analyze/CBA --runs 5
+    python -m benchmarks.cold_start --path /api/users --modes lazy --top 30
+
+Timings come from the child (import of src.main, then the first response
+through the test client) plus the parent's wall time for the whole process.
+The module table is parsed from `python -X importtime`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+MODES = {'eager': '0', 'lazy': '1'}
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+from src.main import app
+imported = time.perf_counter()
+response = app.test_client().get(sys.argv[1])
+response.get_data()
+done = time.perf_counter()
+print(json.dumps({'import_s': imported - start, 'first_response_s': done - imported, 'status': response.status_code}))
+'''
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold start and import time of the API')
+    parser.add_argument('--path', default='/api/health', help='URL requested once the app is imported')
+    parser.add_argument('--modes', default=','.join(MODES), help='Comma-separated startup modes (default: eager,lazy)')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh processes per mode; the median is reported')
+    parser.add_argument('--top', type=int, default=15, help='Rows in the import-time tables')
+    parser.add_argument('--output', help='Also write the report as JSON to this file')
+    return parser.parse_args(argv)
+
+
+def parse_importtime(stderr):
+    """
+    {module: (self seconds, cumulative seconds)} from -X importtime output
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own) / 1e6, int(cumulative) / 1e6)
+    return modules
+
+
+def run_once(mode, path, env):
+    env = dict(env, LAZY_BLUEPRINTS=MODES[mode])
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, path],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.dirname(__file__))
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise SystemExit(f"{mode} start failed:\n{completed.stderr[-2000:]}")
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings['process_s'] = wall
+    return timings, parse_importtime(completed.stderr)
+
+
+def by_package(modules):
+    totals = defaultdict(float)
+    for name, (own, _) in modules.items():
+        totals[name.split('.')[0]] += own
+    return totals
+
+
+def profile_mode(mode, args, env):
+    runs = [run_once(mode, args.path, env) for _ in range(args.runs)]
+    timings = {
+        key: round(statistics.median(run[0][key] for run in runs) * 1000, 2)
+        for key in ('import_s', 'first_response_s', 'process_s')
+    }
+    # Modules from the run closest to the median import time
+    median_import = statistics.median(run[0]['import_s'] for run in runs)
+    modules = min(runs, key=lambda run: abs(run[0]['import_s'] - median_import))[1]
+    packages = by_package(modules)
+    return {
+        'mode': mode,
+        'status': runs[-1][0]['status'],
+        'import_ms': timings['import_s'],
+        'first_response_ms': timings['first_response_s'],
+        'time_to_first_response_ms': round(timings['import_s'] + timings['first_response_s'], 2),
+        'process_ms': timings['process_s'],
+        'modules_imported': len(modules),
+        'slowest_modules': [
+            {'module': name, 'cumulative_ms': round(cumulative * 1000, 2), 'self_ms': round(own * 1000, 2)}
+            for name, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]
+        ],
+        'packages': [
+            {'package': name, 'self_ms': round(seconds * 1000, 2)}
+            for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        ]
+    }
+
+
+def print_report(report):
+    for result in report['results']:
+        print(
+            f"\n{result['mode']:<6} status={result['status']} import={result['import_ms']:.1f}ms "
+            f"first_response={result['first_response_ms']:.1f}ms "
+            f"time_to_first_response={result['time_to_first_response_ms']:.1f}ms "
+            f"process={result['process_ms']:.1f}ms modules={result['modules_imported']}"
+        )
+        print('  import time by package (self):')
+        for row in result['packages']:
+            print(f"    {row['package']:<28} {row['self_ms']:>8.1f}ms")
+        print('  slowest modules (cumulative):')
+        for row in result['slowest_modules']:
+            print(f"    {row['module']:<40} {row['cumulative_ms']:>8.1f}ms")
+
+    if len(report['results']) > 1:
+        first, last = report['results'][0], report['results'][-1]
+        change = last['time_to_first_response_ms'] - first['time_to_first_response_ms']
+        print(
+            f"\n{last['mode']} vs {first['mode']}: time to first response "
+            f"{first['time_to_first_response_ms']:.1f} -> {last['time_to_first_response_ms']:.1f}ms "
+            f"({change / first['time_to_first_response_ms'] * 100:+.1f}%)"
+        )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    env = dict(os.environ)
+    # Keep benchmark bars out of the real bar store
+    env.setdefault('BAR_STORE_PATH', os.path.join(tempfile.mkdtemp(prefix='asx-cold-'), 'bars.db'))
+    env.setdefault('DEMO_TICK_SECONDS', '0')
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            raise SystemExit(f"Unknown mode {mode}; choose from {', '.join(MODES)}")
+
+    report = {'path': args.path, 'runs': args.runs, 'results': [profile_mode(mode, args, env) for mode in modes]}
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from src.services.demo_data import demo_ohlcv
+
+# Fixed "now" so generated histories are identical from run to run
+FAKE_NOW = 1760000000
+FAKE_DATE = np.datetime64(FAKE_NOW, 's').astype('datetime64[D]')
+
+_CHART_RANGE_BARS = {
+    '5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252,
+    '2y': 504, '5y': 1260, '10y': 2520, 'max': 2520
+}
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class FakeUpstream:
+    """
+    Local stand-in for a market data API
+    Every call sleeps for `latency` seconds (+/- `jitter` as a fraction) and
+    fails with probability `failure_rate`, so benchmarks see upstream-shaped
+    waits without touching the network.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.2, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self, name):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self._random.gauss(self.latency, self.latency * self.jitter))
+            fail = self._random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        time.sleep(delay)
+        if fail:
+            raise UpstreamError(f"Injected failure in {name}")
+
+    def stats(self):
+        return {'calls': self.calls, 'failures': self.failures}
+
+
+def _rng(symbol):
+    return np.random.default_rng(zlib.crc32(symbol.encode()))
+
+
+class FakeFinnhubClient(FakeUpstream):
+    """
+    The subset of finnhub.Client used by the Finnhub provider and search route
+    """
+
+    def __init__(self, listing=None, **kwargs):
+        super().__init__(**kwargs)
+        self.listing = listing
+
+    def company_profile2(self, symbol):
+        self._call('company_profile2')
+        rng = _rng(symbol)
+        return {
+            'country': 'AU',
+            'currency': 'AUD',
+            'exchange': 'ASX',
+            'finnhubIndustry': 'Banking',
+            'ipo': '1991-09-12',
+            'marketCapitalization': round(float(rng.uniform(1e3, 2e5)), 2),
+            'name': f"{symbol.split('.')[0]} Limited",
+            'shareOutstanding': round(float(rng.uniform(100, 5000)), 2),
+            'ticker': symbol,
+            'weburl': 'https://www.example.com.au'
+        }
+
+    def quote(self, symbol):
+        self._call('quote')
+        rng = _rng(symbol)
+        pc = round(float(rng.uniform(1, 300)), 2)
+        c = round(pc * (1 + float(rng.normal(0, 0.01))), 2)
+        return {
+            'c': c,
+            'd': round(c - pc, 2),
+            'dp': round((c - pc) / pc * 100, 4),
+            'h': round(max(c, pc) * 1.01, 2),
+            'l': round(min(c, pc) * 0.99, 2),
+            'o': pc,
+            'pc': pc,
+            't': FAKE_NOW
+        }
+
+    def company_basic_financials(self, symbol, metric):
+        self._call('company_basic_financials')
+        rng = _rng(symbol)
+        return {
+            'symbol': symbol,
+            'metricType': metric,
+            'metric': {
+                '10DayAverageTradingVolume': round(float(rng.uniform(0.5, 10)), 4),
+                '52WeekHigh': round(float(rng.uniform(50, 300)), 2),
+                '52WeekLow': round(float(rng.uniform(10, 50)), 2),
+                'beta': round(float(rng.uniform(0.5, 1.5)), 4),
+                'dividendYieldIndicatedAnnual': round(float(rng.uniform(0, 7)), 4),
+                'peBasicExclExtraTTM': round(float(rng.uniform(5, 40)), 4),
+                'roeTTM': round(float(rng.uniform(-5, 30)), 4)
+            },
+            'series': {}
+        }
+
+    def news_sentiment(self, symbol):
+        self._call('news_sentiment')
+        rng = _rng(symbol)
+        bullish = round(float(rng.uniform(0, 1)), 4)
+        return {
+            'buzz': {'articlesInLastWeek': int(rng.integers(0, 50)), 'buzz': 1.0, 'weeklyAverage': 10.0},
+            'companyNewsScore': round(float(rng.uniform(0, 1)), 4),
+            'sentiment': {'bearishPercent': round(1 - bullish, 4), 'bullishPercent': bullish},
+            'symbol': symbol
+        }
+
+    def symbol_lookup(self, query):
+        self._call('symbol_lookup')
+        matches = self.listing.search(query) if self.listing is not None else []
+        return {
+            'count': len(matches),
+            'result': [{
+                'description': security['name'].upper(),
+                'displaySymbol': f"{security['code']}.AX",
+                'symbol': f"{security['code']}.AX",
+                'type': 'Common Stock'
+            } for security in matches]
+        }
+
+
+class FakeYahooClient(FakeUpstream):
+    """
+    Stand-in for the sandbox data_api.ApiClient (YahooFinance/get_stock_chart)
+    """
+
+    def call_api(self, path, query=None):
+        self._call(path)
+        symbol = query['symbol']
+        bars = _CHART_RANGE_BARS.get(query.get('range', '1y'), 252)
+        # Every range is a tail of the same ten-year demo history
+        series = demo_ohlcv(symbol.split('.')[0], _CHART_RANGE_BARS['max'], end=FAKE_DATE).tail(bars)
+        close = series.close.round(3)
+        volume = series.volume.astype(np.int64)
+        timestamps = series.timestamps.tolist()
+        events = {}
+        if bars > 30:
+            events['dividends'] = {str(timestamps[-30]): {'amount': 1.0, 'date': timestamps[-30]}}
+        return {'chart': {'result': [{
+            'meta': {
+                'currency': 'AUD',
+                'symbol': symbol,
+                'exchangeName': 'ASX',
+                'longName': f"{symbol.split('.')[0]} Limited",
+                'regularMarketPrice': float(close[-1]),
+                'regularMarketTime': timestamps[-1],
+                'previousClose': float(close[-2]) if bars > 1 else float(close[-1]),
+                'regularMarketVolume': int(volume[-1])
+            },
+            'timestamp': timestamps,
+            'events': events,
+            'indicators': {
+                'quote': [{
+                    'open': series.open.round(3).tolist(),
+                    'high': series.high.round(3).tolist(),
+                    'low': series.low.round(3).tolist(),
+                    'close': close.tolist(),
+                    'volume': volume.tolist()
+                }],
+                'adjclose': [{'adjclose': close.tolist()}]
+            }
+        }], 'error': None}}
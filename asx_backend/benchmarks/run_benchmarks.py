@@ -0,0 +1,299 @@
+"""
+Latency and throughput benchmark for the API
+
+Drives the Flask app from src/main.py in-process with fake upstreams, so
+numbers reflect this code rather than the network:
+
+    cd asx_backend
+    python -m benchmarks.run_benchmarks --provider yahoo --concurrency 1,8,32
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<earlier run>.json
+
+Results are written as JSON to benchmarks/results/ (named after the commit)
+so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from benchmarks.fake_upstreams import FakeFinnhubClient, FakeYahooClient
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+ENDPOINTS = ('analyze', 'search', 'health')
+# A mix of exact codes, name prefixes, multi-word and misspelled queries
+SEARCH_QUERIES = ['CBA', 'bhp', 'comm bank', 'wes', 'westpak', 'mining', 'tel', 'macquarie', 'fort', 'csl ltd']
+# Where each provider's blueprint is mounted; demo is the deployed /api blueprint
+PROVIDER_PREFIXES = {'demo': '/api', 'finnhub': '/bench/finnhub', 'yahoo': '/bench/yahoo'}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the ASX analyzer API against fake upstreams')
+    parser.add_argument('--provider', choices=sorted(PROVIDER_PREFIXES), default='demo',
+                        help='Data provider behind /analyze and /search (default: demo)')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS),
+                        help='Comma-separated endpoints to run (default: analyze,search,health)')
+    parser.add_argument('--concurrency', default='1,4,16',
+                        help='Comma-separated client concurrency levels (default: 1,4,16)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint and level')
+    parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per endpoint first')
+    parser.add_argument('--tickers', type=int, default=50, help='Distinct tickers cycled through by /analyze')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mean fake upstream latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.2, help='Latency standard deviation as a fraction')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of upstream calls that fail')
+    parser.add_argument('--rate-limits', default='',
+                        help='Upstream quotas as in RATE_LIMITS, e.g. finnhub:quote=40/60 (default: none)')
+    parser.add_argument('--cold', action='store_true', help='Clear the in-memory and response caches before each level')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Report peak Python allocations per level (slows requests down)')
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/<time>-<commit>-<provider>.json)')
+    parser.add_argument('--compare', help='Earlier result file to print p95 and throughput changes against')
+    return parser.parse_args(argv)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def rss_mb():
+    """
+    Current resident set size in MB (peak RSS where /proc is unavailable)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except Exception:
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def load_app(args):
+    """
+    Import the app with every upstream replaced by a local fake
+    """
+    # Keep benchmark bars out of the real bar store
+    os.environ.setdefault('BAR_STORE_PATH', os.path.join(tempfile.mkdtemp(prefix='asx-bench-'), 'bars.db'))
+    # Identical demo quotes in every run, so runs can be compared
+    os.environ.setdefault('DEMO_TICK_SECONDS', '0')
+    # The fakes have no quota unless one is asked for
+    os.environ['RATE_LIMITS'] = args.rate_limits
+
+    upstream = dict(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate)
+    yahoo = FakeYahooClient(**upstream)
+    # The Yahoo provider imports the sandbox data_api at import time
+    sys.modules.setdefault('data_api', types.SimpleNamespace(ApiClient=lambda: yahoo))
+
+    from src.main import app
+    from src.providers.registry import get_provider_registry
+    from src.services.symbol_search import get_symbol_index
+
+    finnhub = FakeFinnhubClient(listing=get_symbol_index(), **upstream)
+    registry = get_provider_registry()
+    if registry.get('finnhub') is not None:
+        registry.get('finnhub').client = finnhub
+    if registry.get('yahoo') is not None:
+        from src.providers import yahoo_provider
+        yahoo_provider.yahoo_client = yahoo
+
+    if args.provider != 'demo' and registry.get(args.provider) is None:
+        raise SystemExit(f"Provider {args.provider} is not available in this environment")
+    if args.provider == 'finnhub':
+        from src.routes.stock import stock_bp
+        app.register_blueprint(stock_bp, url_prefix=PROVIDER_PREFIXES['finnhub'], name='bench_finnhub')
+    elif args.provider == 'yahoo':
+        from src.routes.stock_yahoo import stock_yahoo_bp
+        app.register_blueprint(stock_yahoo_bp, url_prefix=PROVIDER_PREFIXES['yahoo'], name='bench_yahoo')
+
+    return app, {'finnhub': finnhub, 'yahoo': yahoo}
+
+
+def endpoint_paths(endpoint, prefix, tickers):
+    if endpoint == 'analyze':
+        return [f'{prefix}/analyze/{ticker}' for ticker in tickers]
+    if endpoint == 'search':
+        return [f'{prefix}/search/{query}' for query in SEARCH_QUERIES]
+    if endpoint == 'health':
+        return [f'{prefix}/health']
+    raise SystemExit(f"Unknown endpoint {endpoint}")
+
+
+def run_level(app, paths, concurrency, total):
+    """
+    Issue `total` GETs cycling through `paths` from `concurrency` threads
+    Returns (latencies in seconds, status codes, wall time).
+    """
+    local = threading.local()
+
+    def request(path):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        start = time.perf_counter()
+        response = client.get(path)
+        response.get_data()
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(request, (paths[i % len(paths)] for i in range(total))))
+    wall = time.perf_counter() - start
+    latencies = np.array([latency for latency, _ in results])
+    statuses = [status for _, status in results]
+    return latencies, statuses, wall
+
+
+def cache_hit_ratio(before, after):
+    hits = (after['hits'] - before['hits']) + (after['stale_hits'] - before['stale_hits'])
+    lookups = hits + after['misses'] - before['misses']
+    return round(hits / lookups, 4) if lookups else None
+
+
+def summarize(endpoint, concurrency, latencies, statuses, wall):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': sum(1 for status in statuses if status >= 500),
+        'rps': round(len(latencies) / wall, 2),
+        'mean_ms': round(float(latencies.mean()) * 1000, 3),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(latencies.max()) * 1000, 3)
+    }
+
+
+def run(args):
+    import tracemalloc
+
+    app, fakes = load_app(args)
+    from src.services.cache import market_cache
+    from src.services.response_cache import response_cache
+    from src.services.symbol_search import get_symbol_index
+
+    prefix = PROVIDER_PREFIXES[args.provider]
+    codes = [security['code'] for security in get_symbol_index().securities][:args.tickers] or ['CBA']
+    endpoints = [e.strip() for e in args.endpoints.split(',') if e.strip()]
+    levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+
+    results = []
+    for endpoint in endpoints:
+        paths = endpoint_paths(endpoint, prefix, codes)
+        if args.warmup:
+            run_level(app, paths, 1, args.warmup)
+
+        for concurrency in levels:
+            if args.cold:
+                market_cache.memory.clear()
+                response_cache.clear()
+            cache_before = dict(market_cache.stats)
+            calls_before = {name: fake.calls for name, fake in fakes.items()}
+            if args.trace_memory:
+                tracemalloc.start()
+
+            latencies, statuses, wall = run_level(app, paths, concurrency, args.requests)
+
+            row = summarize(endpoint, concurrency, latencies, statuses, wall)
+            if args.trace_memory:
+                row['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 3)
+                tracemalloc.stop()
+            rss = rss_mb()
+            row['rss_mb'] = round(rss, 2) if rss is not None else None
+            row['cache_hit_ratio'] = cache_hit_ratio(cache_before, market_cache.stats)
+            row['upstream_calls'] = {name: fake.calls - calls_before[name] for name, fake in fakes.items()}
+            results.append(row)
+            print_row(row)
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'provider': args.provider,
+            'requests': args.requests,
+            'tickers': len(codes),
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'failure_rate': args.failure_rate,
+            'rate_limits': args.rate_limits,
+            'cold': args.cold
+        },
+        'results': results
+    }
+
+
+def print_row(row):
+    print(
+        f"{row['endpoint']:<8} c={row['concurrency']:<4} "
+        f"p50={row['p50_ms']:>9.2f}ms p95={row['p95_ms']:>9.2f}ms p99={row['p99_ms']:>9.2f}ms "
+        f"rps={row['rps']:>9.1f} errors={row['errors']:<4} "
+        f"rss={row['rss_mb']}MB cache_hit={row['cache_hit_ratio']}"
+    )
+
+
+def compare(report, baseline_path):
+    """
+    Print p95 and throughput change per endpoint and level versus a baseline run
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r['endpoint'], r['concurrency']): r for r in baseline['results']}
+
+    print(f"\nCompared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for row in report['results']:
+        old = previous.get((row['endpoint'], row['concurrency']))
+        if old is None:
+            continue
+        p95_change = (row['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0.0
+        rps_change = (row['rps'] - old['rps']) / old['rps'] * 100 if old['rps'] else 0.0
+        print(
+            f"{row['endpoint']:<8} c={row['concurrency']:<4} "
+            f"p95 {old['p95_ms']:.2f} -> {row['p95_ms']:.2f}ms ({p95_change:+.1f}%)  "
+            f"rps {old['rps']:.1f} -> {row['rps']:.1f} ({rps_change:+.1f}%)"
+        )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['commit']}-{args.provider}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
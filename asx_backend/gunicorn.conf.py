@@ -0,0 +1,30 @@
+"""
+gunicorn settings for multi-process serving with a shared quote board
+
+    cd asx_backend
+    QUOTE_BOARD=asx-quotes gunicorn -c gunicorn.conf.py src.main:app
+
+With QUOTE_BOARD set, the master starts one quote fetcher process before
+forking the workers; the workers read quotes from its shared memory board.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+
+_fetcher = None
+
+
+def on_starting(server):
+    global _fetcher
+    if os.environ.get('QUOTE_BOARD'):
+        from src.services.quote_board import start_fetcher_process
+        _fetcher = start_fetcher_process(os.environ['QUOTE_BOARD'])
+
+
+def on_exit(server):
+    if _fetcher is not None and _fetcher.is_alive():
+        _fetcher.terminate()
+        _fetcher.join(5)
@@ -0,0 +1,275 @@
+"""
+ASGI entry point
+
+    uvicorn src.asgi:app --workers 2
+
+Analyze, search and health are served by async handlers: upstream calls
+wait on the event loop through a pooled HTTP client instead of holding a
+worker thread. Every other URL (batch, stream, metrics, users, static
+files) is passed to the Flask app in src/main.py on a thread pool, so
+URLs and JSON shapes are the same in both serving modes.
+"""
+import asyncio
+import io
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.main import app as flask_app
+from src.providers.finnhub_async import AsyncFinnhubProvider
+from src.providers.registry import get_provider_registry
+from src.routes.stock_production import build_production_search, build_production_health
+from src.services.async_http import AsyncHTTPClient
+from src.services.json_codec import dumps_bytes, encode_analysis
+from src.services.metrics import request_latency, request_errors, requests_in_flight
+from src.services.prewarm import ticker_heat
+from src.services.response_cache import response_cache, etag_matches
+
+# Provider behind /api/analyze; demo matches the Flask app's production routes
+ASGI_PROVIDER = os.environ.get('ASGI_PROVIDER', 'demo')
+# Threads for Flask routes and providers without an async client
+ASGI_SYNC_WORKERS = int(os.environ.get('ASGI_SYNC_WORKERS', '32'))
+
+ANALYZE_PATH = re.compile(r'^/api/analyze/(?P<ticker>[^/]+)$')
+SEARCH_PATH = re.compile(r'^/api/search/(?P<query>[^/]+)$')
+HEALTH_PATH = '/api/health'
+
+
+class InlineProvider:
+    """
+    Async face for a provider that never blocks (demo data is pure CPU)
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.name = provider.name
+        self.data_source = provider.data_source
+        self.note = provider.note
+        self.hedged = provider.hedged
+
+    async def analyze(self, asx_ticker):
+        return self.provider.analyze(asx_ticker)
+
+
+class ASGIApp:
+    def __init__(self, wsgi_app, provider=ASGI_PROVIDER, sync_workers=ASGI_SYNC_WORKERS):
+        self.wsgi_app = wsgi_app
+        self.provider = provider
+        self.executor = ThreadPoolExecutor(max_workers=sync_workers, thread_name_prefix='asgi-sync')
+        # Created on startup, inside the server's event loop
+        self.http = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http_request(scope, receive, send)
+        else:
+            raise RuntimeError(f"Unsupported ASGI scope type {scope['type']}")
+
+    async def startup(self):
+        if self.http is not None:
+            return
+        self.http = AsyncHTTPClient()
+        # Coroutine providers join the registry's failover and hedging
+        registry = get_provider_registry()
+        if registry.get('demo') is not None:
+            registry.register_async(InlineProvider(registry.get('demo')))
+        registry.register_async(AsyncFinnhubProvider(self.http))
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.http is not None:
+                    await self.http.close()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def run_sync(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, copy_context().run, fn, *args)
+
+    async def http_request(self, scope, receive, send):
+        # Servers without lifespan support start us on the first request
+        await self.startup()
+        path = scope['path']
+        if scope['method'] in ('GET', 'HEAD'):
+            match = ANALYZE_PATH.match(path)
+            # /api/analyze/batch belongs to the Flask batch route
+            if match and match['ticker'] != 'batch':
+                if_none_match = header_value(scope, b'if-none-match')
+                return await self.native(scope, send, '/api/analyze/<ticker>', self.analyze, match['ticker'], if_none_match)
+            match = SEARCH_PATH.match(path)
+            if match:
+                return await self.native(scope, send, '/api/search/<query>', self.search, match['query'])
+            if path == HEALTH_PATH:
+                return await self.native(scope, send, HEALTH_PATH, self.health)
+        await self.wsgi(scope, receive, send)
+
+    async def native(self, scope, send, route, handler, *args):
+        """
+        Run an async handler, with the same metrics the Flask hooks record
+        Handlers return (status, payload or encoded body, extra headers).
+        """
+        start = time.perf_counter()
+        requests_in_flight.inc()
+        try:
+            status, body, headers = await handler(*args)
+            if not isinstance(body, bytes):
+                body = dumps_bytes(body) + b'\n'
+        finally:
+            requests_in_flight.dec()
+        request_latency.observe(time.perf_counter() - start, method=scope['method'], route=route, status=status)
+        if status >= 500:
+            request_errors.inc(method=scope['method'], route=route)
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1')),
+            ] + headers
+        })
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+    async def analyze(self, ticker, if_none_match=None):
+        try:
+            # Shares encoded responses with the Flask analyze route
+            key = (self.provider, ticker.upper())
+            cached = response_cache.get(key)
+            if cached is None:
+                cached = encode_analysis(await self.build_analysis(ticker))
+                response_cache.set(key, *cached)
+            body, etag = cached
+            # Only tickers that resolved count towards pre-warming
+            ticker_heat.record(ticker)
+
+        except Exception as e:
+            return 500, {
+                'error': f'Failed to analyze stock {ticker}',
+                'message': str(e)
+            }, []
+
+        headers = [(b'etag', f'"{etag}"'.encode('latin-1')), (b'cache-control', b'no-cache')]
+        if etag_matches(if_none_match, etag):
+            response_cache.stats['not_modified'] += 1
+            return 304, b'', headers
+        return 200, body, headers
+
+    async def build_analysis(self, ticker):
+        # Async providers wait on the loop; the others run on the provider pool
+        return await get_provider_registry().analyze_async(ticker, self.provider)
+
+    async def search(self, query):
+        try:
+            return 200, build_production_search(query), []
+
+        except Exception as e:
+            return 500, {
+                'error': f'Failed to search for {query}',
+                'message': str(e)
+            }, []
+
+    async def health(self):
+        return 200, build_production_health(), []
+
+    async def wsgi(self, scope, receive, send):
+        """
+        Serve the request with the Flask app on the sync pool
+        Response bodies are relayed chunk by chunk, so streamed responses
+        (NDJSON batches, server-sent events) keep streaming.
+        """
+        body = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        environ = wsgi_environ(scope, b''.join(body))
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+        iterable = await self.run_sync(self.wsgi_app, environ, start_response)
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        watcher = asyncio.get_running_loop().create_task(watch_disconnect())
+        try:
+            chunks = iter(iterable)
+            first = await self.run_sync(next, chunks, None)
+            await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+            chunk = first
+            while chunk is not None and not disconnected.is_set():
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await self.run_sync(next, chunks, None)
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            watcher.cancel()
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                # Ends generators, e.g. unsubscribing a closed event stream
+                await self.run_sync(close)
+
+
+def header_value(scope, name):
+    for key, value in scope.get('headers', []):
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return None
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body)),
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+app = ASGIApp(flask_app)
@@ -4,22 +4,73 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from flask import Flask, send_from_directory
-from src.models.user import db
-from src.routes.user import user_bp
-from src.routes.stock_production import stock_prod_bp
+from src.services.json_codec import FastJSONProvider
+from src.services.lazy_routes import BlueprintGroup, LazyBlueprints, register_group
+from src.services.metrics import init_metrics
+from src.services.prewarm import start_prewarm
+
+# Register route groups on their first request instead of at import, so a
+# cold serverless instance only loads what the request needs
+LAZY_BLUEPRINTS = os.environ.get('LAZY_BLUEPRINTS', '0') == '1'
+
+DATABASE_DIR = os.path.join(os.path.dirname(__file__), 'database')
+
+def configure(app):
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    # orjson-backed when installed, Flask's encoder otherwise
+    app.json = FastJSONProvider(app)
+    # Request latency, error and in-flight metrics for every route
+    init_metrics(app)
+
+def setup_database(app):
+    from src.services.database import init_database, ensure_schema
+    # uncomment if you need to use database
+    os.makedirs(DATABASE_DIR, exist_ok=True)
+    # Pooled connections; SQLite runs in WAL mode with a busy timeout
+    init_database(app, f"sqlite:///{os.path.join(DATABASE_DIR, 'app.db')}")
+    # Tables are only created when the models changed since the last boot
+    ensure_schema(app)
+
+def start_screener(app):
+    from src.services.screener import screener
+    # The first snapshot builds in the background; /api/screen answers 503 until it is ready
+    screener.build_in_background()
+
+ROUTE_GROUPS = [
+    BlueprintGroup('accounts', ['/api/users', '/api/portfolios'], [
+        'src.routes.user:user_bp',
+        'src.routes.portfolio:portfolio_bp'
+    ], setup=setup_database),
+    BlueprintGroup('stock', ['/api/analyze', '/api/search', '/api/health'], ['src.routes.stock_production:stock_prod_bp']),
+    BlueprintGroup('stream', ['/api/stream'], ['src.routes.stream:stream_bp']),
+    BlueprintGroup('quotes', ['/api/quote', '/api/quotes'], ['src.routes.quotes:quotes_bp']),
+    BlueprintGroup('screener', ['/api/screen'], ['src.routes.screener:screener_bp'], setup=start_screener),
+    BlueprintGroup('metrics', ['/api/metrics'], ['src.routes.metrics:metrics_bp']),
+    BlueprintGroup('snapshot', ['/api/snapshot'], ['src.routes.snapshot:snapshot_bp']),
+    BlueprintGroup('backtest', ['/api/backtest'], ['src.routes.backtest:backtest_bp'])
+]
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+configure(app)
+
+if LAZY_BLUEPRINTS:
+    app.wsgi_app = LazyBlueprints(app, ROUTE_GROUPS, configure)
+else:
+    for group in ROUTE_GROUPS:
+        register_group(app, group)
+
+    # Build the ticker search index up front so the first keystroke is fast
+    from src.services.symbol_search import get_symbol_index
+    get_symbol_index()
 
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(stock_prod_bp, url_prefix='/api')
+# Start with the cache and bar history of a snapshot (SNAPSHOT_PATH) written
+# by the last run or handed over from another instance
+if os.environ.get('SNAPSHOT_PATH'):
+    from src.services.snapshot import warm_start
+    warm_start()
 
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
+# Keep the most requested tickers warm during ASX trading hours (PREWARM_ENABLED=1)
+start_prewarm()
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from src.models.user import db
+
+PORTFOLIO_KINDS = ('portfolio', 'watchlist')
+
+
+class Portfolio(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    name = db.Column(db.String(80), nullable=False)
+    # A watchlist is a portfolio whose holdings carry no quantity
+    kind = db.Column(db.String(16), nullable=False, default='portfolio')
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    user = db.relationship('User', backref=db.backref('portfolios', cascade='all, delete-orphan'))
+    holdings = db.relationship(
+        'Holding', backref='portfolio', cascade='all, delete-orphan',
+        order_by='Holding.ticker', lazy='selectin'
+    )
+
+    def __repr__(self):
+        return f'<Portfolio {self.name}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'name': self.name,
+            'kind': self.kind,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'holdings': [holding.to_dict() for holding in self.holdings]
+        }
+
+
+class Holding(db.Model):
+    __table_args__ = (db.UniqueConstraint('portfolio_id', 'ticker'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    portfolio_id = db.Column(db.Integer, db.ForeignKey('portfolio.id', ondelete='CASCADE'), nullable=False, index=True)
+    # Normalized ASX ticker, e.g. CBA.AX
+    ticker = db.Column(db.String(16), nullable=False)
+    quantity = db.Column(db.Float, nullable=False, default=0.0)
+    # Average cost per share
+    cost_basis = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f'<Holding {self.ticker}>'
+
+    def to_dict(self):
+        return {
+            'ticker': self.ticker,
+            'quantity': self.quantity,
+            'cost_basis': self.cost_basis
+        }
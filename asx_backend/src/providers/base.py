@@ -0,0 +1,58 @@
+from datetime import datetime
+
+
+class ProviderError(Exception):
+    pass
+
+
+class DataProvider:
+    """
+    A source of ASX market data
+    Subclasses return the four analysis sections for a normalized ASX ticker
+    (e.g. "CBA.AX") and raise when they have nothing usable for it, so the
+    registry can fail over to the next provider.
+    """
+
+    name = None
+    data_source = None
+    note = None
+    # Whether calls may hedge and fail over to the other providers; off for
+    # providers that answer in-process and never fail
+    hedged = True
+
+    def analyze(self, asx_ticker):
+        """
+        Return {'profile': ..., 'quote': ..., 'financials': ..., 'sentiment': ...}
+        """
+        raise NotImplementedError
+
+    def quote(self, asx_ticker):
+        """
+        Return the latest quote dict (c, d, dp, h, l, o, pc, t)
+        """
+        return self.analyze(asx_ticker)['quote']
+
+    def history(self, asx_ticker):
+        """
+        Return the daily bar history as a PriceSeries
+        """
+        raise ProviderError(f"{self.name} has no price history for {asx_ticker}")
+
+
+def analysis_response(ticker, asx_ticker, sections, provider):
+    """
+    Shape provider sections into the /api/analyze response payload
+    """
+    response_data = {
+        'ticker': ticker.upper(),
+        'asx_ticker': asx_ticker,
+        'profile': sections['profile'],
+        'quote': sections['quote'],
+        'financials': sections['financials'],
+        'sentiment': sections['sentiment'],
+        'timestamp': datetime.now().isoformat(),
+        'data_source': provider.data_source
+    }
+    if provider.note:
+        response_data['note'] = provider.note
+    return response_data
@@ -0,0 +1,44 @@
+from src.providers.base import DataProvider
+from src.services.demo_data import demo_snapshot, demo_snapshots, demo_ohlcv
+from src.services.metrics import stage_span
+from src.services.tickers import base_ticker
+
+
+class DemoProvider(DataProvider):
+    """
+    Realistic-looking generated data; never fails, so it is the last resort
+    """
+
+    name = 'demo'
+    data_source = 'Demo Data (Production)'
+    note = 'This is demo data. For real data, integrate with Alpha Vantage, Yahoo Finance, or similar APIs.'
+    hedged = False
+
+    def analyze(self, asx_ticker):
+        # In a real production environment, you would integrate with:
+        # - Alpha Vantage API (free tier available)
+        # - Yahoo Finance unofficial API
+        # - Financial Modeling Prep API
+        # - IEX Cloud API
+        with stage_span('demo_data'):
+            return get_demo_data_for_ticker(base_ticker(asx_ticker))
+
+    def analyze_many(self, asx_tickers):
+        """
+        Sections for many tickers in one vectorized pass, in the given order
+        """
+        with stage_span('demo_data'):
+            return demo_snapshots([base_ticker(asx_ticker) for asx_ticker in asx_tickers])
+
+    def history(self, asx_ticker):
+        with stage_span('demo_data'):
+            return demo_ohlcv(base_ticker(asx_ticker))
+
+
+def get_demo_data_for_ticker(ticker):
+    """
+    Generate realistic demo data for different ASX tickers
+    Reproducible: the same ticker gives the same data (see DEMO_SEED and
+    DEMO_TICK_SECONDS in src/services/demo_data.py)
+    """
+    return demo_snapshot(ticker)
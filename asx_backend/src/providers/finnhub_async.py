@@ -0,0 +1,86 @@
+import asyncio
+import os
+
+from src.providers.base import ProviderError
+from src.services.cache import market_cache, cache_key
+from src.services.executor import UPSTREAM_TIMEOUT
+from src.services.metrics import upstream_span, upstream_timeouts
+from src.services.rate_limit import upstream_governor
+from src.services.singleflight import AsyncSingleFlight, flight_key
+
+FINNHUB_API_KEY = os.environ.get('FINNHUB_API_KEY', 'demo')
+FINNHUB_API_URL = os.environ.get('FINNHUB_API_URL', 'https://api.finnhub.io/api/v1')
+
+# REST path and query for each analysis section, as called by finnhub.Client
+SECTION_ENDPOINTS = {
+    'profile': ('/stock/profile2', lambda symbol: {'symbol': symbol}),
+    'quote': ('/quote', lambda symbol: {'symbol': symbol}),
+    'financials': ('/stock/metric', lambda symbol: {'symbol': symbol, 'metric': 'all'}),
+    'sentiment': ('/news-sentiment', lambda symbol: {'symbol': symbol}),
+}
+
+
+class AsyncFinnhubProvider:
+    """
+    Finnhub over the pooled asyncio HTTP client, for the ASGI app
+    Shares cache entries, quotas and metrics with the threaded FinnhubProvider;
+    a request waiting on Finnhub costs a coroutine rather than a thread.
+    """
+
+    name = 'finnhub'
+    data_source = 'Finnhub'
+    note = None
+    hedged = True
+
+    def __init__(self, http, api_key=FINNHUB_API_KEY, base_url=FINNHUB_API_URL):
+        self.http = http
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.flight = AsyncSingleFlight()
+
+    async def section(self, kind, asx_ticker):
+        path, params = SECTION_ENDPOINTS[kind]
+
+        async def request():
+            with upstream_span('finnhub', kind):
+                return await self.http.get_json(
+                    self.base_url + path,
+                    params=params(asx_ticker),
+                    headers={'X-Finnhub-Token': self.api_key}
+                )
+
+        async def fetch():
+            return await upstream_governor.call_async('finnhub', kind, request)
+
+        return await market_cache.get_or_fetch_async(
+            kind,
+            cache_key('finnhub', kind, asx_ticker),
+            lambda: self.flight.do(flight_key('finnhub', kind, asx_ticker), fetch)
+        )
+
+    async def _section_or_none(self, kind, asx_ticker, timeout):
+        try:
+            return await asyncio.wait_for(self.section(kind, asx_ticker), timeout)
+        except asyncio.TimeoutError:
+            upstream_timeouts.inc(section=kind)
+            print(f"Timed out fetching {kind} for {asx_ticker} after {timeout}s")
+        except Exception as e:
+            print(f"Error fetching {kind} for {asx_ticker}: {e}")
+        return None
+
+    async def analyze(self, asx_ticker, timeout=UPSTREAM_TIMEOUT):
+        kinds = list(SECTION_ENDPOINTS)
+        results = await asyncio.gather(*(self._section_or_none(kind, asx_ticker, timeout) for kind in kinds))
+        sections = dict(zip(kinds, results))
+
+        if all(section is None for section in sections.values()):
+            raise ProviderError(f"Finnhub returned no data for {asx_ticker}")
+        return {
+            'profile': sections['profile'] or {},
+            'quote': sections['quote'] or {},
+            'financials': sections['financials'] or {'metric': {}},
+            'sentiment': sections['sentiment'] or {}
+        }
+
+    async def quote(self, asx_ticker):
+        return await self.section('quote', asx_ticker)
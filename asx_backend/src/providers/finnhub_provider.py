@@ -0,0 +1,91 @@
+import os
+import threading
+
+import finnhub
+
+from src.providers.base import DataProvider, ProviderError
+from src.services.cache import market_cache, cache_key
+from src.services.executor import fan_out
+from src.services.http_session import use_pooled_session
+from src.services.metrics import upstream_span
+from src.services.rate_limit import upstream_governor
+from src.services.singleflight import upstream_flight, flight_key
+
+# For now, we'll use a demo API key. In production, set FINNHUB_API_KEY
+FINNHUB_API_KEY = os.environ.get('FINNHUB_API_KEY', 'demo')
+
+
+def cached_section(kind, asx_ticker, fetch):
+    """
+    Wrap a Finnhub call so it reads through the shared market data cache
+    Cache misses for the same section and ticker share one upstream request.
+    """
+    key = cache_key('finnhub', kind, asx_ticker)
+    flight = flight_key('finnhub', kind, asx_ticker)
+
+    def timed_fetch():
+        with upstream_span('finnhub', kind):
+            return fetch()
+
+    def governed_fetch():
+        return upstream_governor.call('finnhub', kind, timed_fetch)
+
+    return lambda: market_cache.get_or_fetch(kind, key, lambda: upstream_flight.do(flight, governed_fetch))
+
+
+class FinnhubProvider(DataProvider):
+    name = 'finnhub'
+    data_source = 'Finnhub'
+
+    def __init__(self, api_key=FINNHUB_API_KEY):
+        self.api_key = api_key
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        The finnhub.Client, built on first use so loading the provider is cheap
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    client = finnhub.Client(api_key=self.api_key)
+                    # Keep-alive connection pool, retries and timeouts for every section call
+                    use_pooled_session(client)
+                    self._client = client
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def analyze(self, asx_ticker):
+        client = self.client
+        # Fetch profile, quote, financials and sentiment concurrently so the
+        # call waits for the slowest upstream request rather than the sum.
+        # Each section is cached with its own freshness policy.
+        sections = fan_out({
+            'profile': (cached_section('profile', asx_ticker,
+                                       lambda: client.company_profile2(symbol=asx_ticker)), None),
+            'quote': (cached_section('quote', asx_ticker,
+                                     lambda: client.quote(asx_ticker)), None),
+            'financials': (cached_section('financials', asx_ticker,
+                                          lambda: client.company_basic_financials(asx_ticker, 'all')), None),
+            'sentiment': (cached_section('sentiment', asx_ticker,
+                                         lambda: client.news_sentiment(asx_ticker)), None)
+        }, asx_ticker)
+
+        # Partial failures come back as empty sections; only a total failure
+        # is an error worth failing over for
+        if all(section is None for section in sections.values()):
+            raise ProviderError(f"Finnhub returned no data for {asx_ticker}")
+        return {
+            'profile': sections['profile'] or {},
+            'quote': sections['quote'] or {},
+            'financials': sections['financials'] or {'metric': {}},
+            'sentiment': sections['sentiment'] or {}
+        }
+
+    def quote(self, asx_ticker):
+        return cached_section('quote', asx_ticker, lambda: self.client.quote(asx_ticker))()
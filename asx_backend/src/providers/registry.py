@@ -0,0 +1,307 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from src.providers.base import ProviderError, analysis_response
+from src.services.executor import submit_in_context
+from src.services.quote_board import board_quote
+from src.services.tickers import to_asx_ticker
+
+# Providers tried after the route's own provider, in order. Demo data is not
+# a fallback by default so real-data routes never silently serve it.
+PROVIDER_FAILOVER = [
+    name.strip() for name in os.environ.get('PROVIDER_FAILOVER', 'yahoo,finnhub').split(',')
+    if name.strip()
+]
+# A second provider is fired when the first is slower than its own p95
+HEDGE_ENABLED = os.environ.get('PROVIDER_HEDGING', '1') != '0'
+HEDGE_MIN_DELAY = float(os.environ.get('PROVIDER_HEDGE_MIN_DELAY', '0.25'))
+HEDGE_DEFAULT_DELAY = 1.0
+STATS_WINDOW = 200
+STATS_MIN_SAMPLES = 20
+# Providers failing more than this share of recent calls go to the back of the line
+UNHEALTHY_ERROR_RATE = 0.5
+
+PROVIDER_MAX_WORKERS = int(os.environ.get('PROVIDER_MAX_WORKERS', '32'))
+
+# Provider calls fan out onto the upstream executor themselves, so they run
+# on their own pool to avoid waiting on a pool they are occupying
+provider_executor = ThreadPoolExecutor(
+    max_workers=PROVIDER_MAX_WORKERS,
+    thread_name_prefix='provider'
+)
+
+
+class ProviderStats:
+    """
+    Rolling latency and error rate over the last STATS_WINDOW calls
+    """
+
+    def __init__(self, window=STATS_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self._samples.append((latency, ok))
+
+    def snapshot(self):
+        with self._lock:
+            samples = list(self._samples)
+        latencies = sorted(latency for latency, ok in samples if ok)
+        errors = sum(1 for _, ok in samples if not ok)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            'calls': len(samples),
+            'error_rate': errors / len(samples) if samples else 0.0,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+        }
+
+    def hedge_delay(self):
+        stats = self.snapshot()
+        if stats['calls'] < STATS_MIN_SAMPLES or stats['p95'] is None:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, stats['p95'])
+
+    def healthy(self):
+        stats = self.snapshot()
+        return stats['calls'] < STATS_MIN_SAMPLES or stats['error_rate'] <= UNHEALTHY_ERROR_RATE
+
+
+class ProviderRegistry:
+    """
+    Named data providers plus the policy for calling them
+    Calls start with the route's own provider, hedge to the next one when the
+    first is slower than its p95, and fail over down the list on errors.
+    `quote_source(asx_ticker, primary)` is asked for quotes first and returns
+    None to send the call to the providers.
+    """
+
+    def __init__(self, failover=None, quote_source=None):
+        self.providers = {}
+        # Coroutine versions of providers, used by call_async
+        self.async_providers = {}
+        self.stats = {}
+        self.failover = PROVIDER_FAILOVER if failover is None else failover
+        self.quote_source = quote_source
+
+    def register(self, provider):
+        self.providers[provider.name] = provider
+        self.stats[provider.name] = ProviderStats()
+
+    def register_async(self, provider):
+        """
+        Add a provider whose methods are coroutines; it shares the stats of
+        the threaded provider with the same name
+        """
+        self.async_providers[provider.name] = provider
+        self.stats.setdefault(provider.name, ProviderStats())
+
+    def get(self, name):
+        return self.providers.get(name)
+
+    def order_for(self, primary, available=None):
+        """
+        Providers to try for a call, primary first, unhealthy ones last
+        """
+        available = self.providers if available is None else available
+        provider = available.get(primary)
+        if provider is not None and not provider.hedged:
+            return [primary]
+        names = [primary] + [name for name in self.failover if name != primary]
+        names = [name for name in names if name in available]
+        healthy = [name for name in names if self.stats[name].healthy()]
+        return healthy + [name for name in names if name not in healthy]
+
+    def _timed(self, name, method, asx_ticker):
+        start = time.monotonic()
+        try:
+            result = getattr(self.providers[name], method)(asx_ticker)
+        except Exception:
+            self.stats[name].record(time.monotonic() - start, False)
+            raise
+        self.stats[name].record(time.monotonic() - start, True)
+        return result
+
+    def call(self, method, asx_ticker, primary):
+        """
+        Run `method` on the best available provider; returns (provider, result)
+        """
+        order = self.order_for(primary)
+        if not order:
+            raise ProviderError(f"No data provider available for {primary}")
+
+        pending = {}
+        errors = []
+
+        def launch():
+            # Returns how long to wait before hedging to the next provider
+            name = order.pop(0)
+            pending[submit_in_context(provider_executor, self._timed, name, method, asx_ticker)] = name
+            return self.stats[name].hedge_delay() if HEDGE_ENABLED and order else None
+
+        hedge_after = launch()
+
+        while pending:
+            done, _ = wait(list(pending), timeout=hedge_after, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primary is slower than usual: race it against the next provider
+                hedge_after = None
+                if order:
+                    launch()
+                continue
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    return self.providers[name], future.result()
+                except Exception as e:
+                    print(f"Error from provider {name} for {asx_ticker}: {e}")
+                    errors.append(f"{name}: {e}")
+                    # Fail over: replace the failed provider with the next one
+                    if order:
+                        hedge_after = launch()
+
+        raise ProviderError('; '.join(errors))
+
+    async def _timed_async(self, name, method, asx_ticker):
+        provider = self.async_providers.get(name)
+        if provider is None:
+            # No coroutine version: run the threaded provider on the pool
+            return await asyncio.wrap_future(
+                submit_in_context(provider_executor, self._timed, name, method, asx_ticker)
+            )
+        start = time.monotonic()
+        try:
+            result = await getattr(provider, method)(asx_ticker)
+        except Exception:
+            self.stats[name].record(time.monotonic() - start, False)
+            raise
+        self.stats[name].record(time.monotonic() - start, True)
+        return result
+
+    async def call_async(self, method, asx_ticker, primary):
+        """
+        call() for the event loop, with the same hedging and failover
+        Providers registered with register_async wait as coroutines; the
+        others run on the provider pool.
+        """
+        available = {**self.providers, **self.async_providers}
+        order = self.order_for(primary, available)
+        if not order:
+            raise ProviderError(f"No data provider available for {primary}")
+
+        pending = {}
+        errors = []
+
+        def launch():
+            name = order.pop(0)
+            task = asyncio.ensure_future(self._timed_async(name, method, asx_ticker))
+            # A hedged call that loses the race still finishes (and is timed)
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            pending[task] = name
+            return self.stats[name].hedge_delay() if HEDGE_ENABLED and order else None
+
+        hedge_after = launch()
+
+        while pending:
+            done, _ = await asyncio.wait(list(pending), timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                hedge_after = None
+                if order:
+                    launch()
+                continue
+            for task in done:
+                name = pending.pop(task)
+                try:
+                    return available[name], task.result()
+                except Exception as e:
+                    print(f"Error from provider {name} for {asx_ticker}: {e}")
+                    errors.append(f"{name}: {e}")
+                    if order:
+                        hedge_after = launch()
+
+        raise ProviderError('; '.join(errors))
+
+    def analyze(self, ticker, primary):
+        """
+        Build the full /api/analyze payload for a ticker
+        """
+        asx_ticker = to_asx_ticker(ticker)
+        provider, sections = self.call('analyze', asx_ticker, primary)
+        return analysis_response(ticker, asx_ticker, sections, provider)
+
+    async def analyze_async(self, ticker, primary):
+        asx_ticker = to_asx_ticker(ticker)
+        provider, sections = await self.call_async('analyze', asx_ticker, primary)
+        return analysis_response(ticker, asx_ticker, sections, provider)
+
+    def quote(self, ticker, primary):
+        asx_ticker = to_asx_ticker(ticker)
+        if self.quote_source is not None:
+            quote = self.quote_source(asx_ticker, primary)
+            if quote is not None:
+                return quote
+        provider, quote = self.call('quote', asx_ticker, primary)
+        return quote
+
+    def history(self, ticker, primary):
+        provider, series = self.call('history', to_asx_ticker(ticker), primary)
+        return series
+
+    def snapshot(self):
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def _load_providers(registry):
+    # Each provider is optional: a missing SDK or sandbox runtime only
+    # removes that provider from the registry
+    from src.providers.demo_provider import DemoProvider
+    registry.register(DemoProvider())
+
+    try:
+        from src.providers.finnhub_provider import FinnhubProvider
+        registry.register(FinnhubProvider())
+    except Exception as e:
+        print(f"Finnhub provider unavailable: {e}")
+
+    try:
+        from src.providers.yahoo_provider import YahooProvider
+        registry.register(YahooProvider())
+    except Exception as e:
+        print(f"Yahoo Finance provider unavailable: {e}")
+
+
+def get_provider_registry():
+    """
+    Return the process-wide registry, loading the providers on first use
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                # With a shared quote board (QUOTE_BOARD) workers read what
+                # the fetcher process keeps current instead of calling upstream
+                registry = ProviderRegistry(quote_source=board_quote)
+                _load_providers(registry)
+                _registry = registry
+    return _registry
+
+
+def loaded_provider_registry():
+    """
+    The process-wide registry if something has loaded it, else None
+    """
+    return _registry
@@ -0,0 +1,312 @@
+import os
+import sys
+import threading
+from datetime import datetime
+
+from src.providers.base import DataProvider, ProviderError
+from src.services.analytics import PriceSeries, compute_metrics, SECONDS_PER_DAY
+from src.services.bar_store import get_bar_store, tail_range
+from src.services.cache import market_cache, cache_key
+from src.services.executor import upstream_executor, submit_in_context, UPSTREAM_TIMEOUT
+from src.services.http_session import use_pooled_session
+from src.services.live_metrics import LIVE_METRICS, metric_states
+from src.services.metrics import upstream_span, stage_span
+from src.services.rate_limit import upstream_governor
+from src.services.singleflight import upstream_flight, flight_key
+from src.services.tickers import base_ticker
+
+sys.path.append('/opt/.manus/.sandbox-runtime')
+from data_api import ApiClient
+
+# Yahoo Finance API client, built on first use by get_yahoo_client()
+yahoo_client = None
+_client_lock = threading.Lock()
+
+# S&P/ASX 200, the benchmark for beta
+BENCHMARK_INDEX = '^AXJO'
+
+# Chart range requested the first time a ticker is seen; later requests only
+# fetch the bars since the last one in the bar store
+HISTORY_BACKFILL_RANGE = os.environ.get('HISTORY_BACKFILL_RANGE', '1y')
+
+
+def chart_result(response):
+    if not response or 'chart' not in response or not response['chart']['result']:
+        return None
+    return response['chart']['result'][0]
+
+
+def get_yahoo_client():
+    global yahoo_client
+    if yahoo_client is None:
+        with _client_lock:
+            if yahoo_client is None:
+                client = ApiClient()
+                # Pool its connections too when the sandbox client is built on requests
+                use_pooled_session(client)
+                yahoo_client = client
+    return yahoo_client
+
+
+def call_chart_api(chart_query):
+    client = get_yahoo_client()
+    with upstream_span('yahoo', 'chart'):
+        return client.call_api('YahooFinance/get_stock_chart', query=chart_query)
+
+
+def chart_query(symbol, chart_range):
+    return {
+        'symbol': symbol,
+        'region': 'AU',
+        'interval': '1d',
+        'range': chart_range,
+        'includeAdjustedClose': True,
+        'events': 'div,split'
+    }
+
+
+def store_chart(symbol, result):
+    """
+    Merge a fresh chart into the bar store
+    A chart whose adjusted closes were re-based by a new dividend or split is
+    not merged into the old rows; the symbol's full stored range is fetched
+    again and replaces them.
+    """
+    store = get_bar_store()
+    series = PriceSeries.from_chart(result)
+    if not store.rebased(symbol, series):
+        store.merge(symbol, series)
+        return
+    query = chart_query(symbol, tail_range(store.first_timestamp(symbol)))
+    full = chart_result(upstream_governor.call('yahoo', 'chart', lambda: call_chart_api(query)))
+    if full is None:
+        raise ProviderError(f"No data found re-fetching re-based history for {symbol}")
+    store.replace(symbol, PriceSeries.from_chart(full))
+
+
+def fetch_chart(symbol, chart_range='1y'):
+    """
+    Fetch daily bars for a symbol through the shared cache
+    Concurrent misses for the same chart share one upstream request, and
+    every fresh upstream response is merged into the local bar store.
+    """
+    query = chart_query(symbol, chart_range)
+
+    def fetch():
+        response = upstream_governor.call('yahoo', 'chart', lambda: call_chart_api(query))
+        result = chart_result(response)
+        if result is not None:
+            try:
+                store_chart(symbol, result)
+            except Exception as e:
+                print(f"Error storing bars for {symbol}: {e}")
+        return response
+
+    return market_cache.get_or_fetch(
+        'chart',
+        cache_key('yahoo', 'chart', f"{symbol}:{chart_range}"),
+        lambda: upstream_flight.do(
+            flight_key('yahoo', 'YahooFinance/get_stock_chart', symbol, query),
+            fetch
+        )
+    )
+
+
+def fetch_history(symbol):
+    """
+    Return the latest chart result and the full stored bar history for a symbol
+    Once a symbol has history in the bar store only the missing tail is
+    requested upstream; the first request backfills HISTORY_BACKFILL_RANGE.
+    """
+    try:
+        last_timestamp = get_bar_store().last_timestamp(symbol)
+    except Exception as e:
+        print(f"Error reading bar store for {symbol}: {e}")
+        last_timestamp = None
+    chart_range = HISTORY_BACKFILL_RANGE if last_timestamp is None else tail_range(last_timestamp)
+
+    result = chart_result(fetch_chart(symbol, chart_range))
+    if result is None:
+        raise ProviderError(f"No data found for {symbol}")
+
+    try:
+        series = get_bar_store().load(symbol)
+    except Exception as e:
+        print(f"Error loading stored bars for {symbol}: {e}")
+        series = PriceSeries([], [], [], [], [], [])
+    if len(series) == 0:
+        series = PriceSeries.from_chart(result)
+    return result, series
+
+
+def fetch_metric_state(symbol):
+    """
+    Return the latest chart result and the symbol's live metric state
+    The first request builds the state from the stored history; after that
+    only the chart tail since its last bar is fetched and applied, so the
+    work per request does not grow with the length of the history.
+    """
+    state = metric_states.get(symbol)
+    if state is not None:
+        result = chart_result(fetch_chart(symbol, tail_range(state.last_timestamp)))
+        if result is None:
+            raise ProviderError(f"No data found for {symbol}")
+        with state.lock:
+            if state.update(PriceSeries.from_chart(result)):
+                return result, state
+    result, series = fetch_history(symbol)
+    return result, metric_states.build(symbol, series)
+
+
+def previous_close(meta, series):
+    """
+    Close of the session before the latest quote
+    chartPreviousClose is the close before the chart window, which moves with
+    the requested range, so prefer meta.previousClose and then the stored bars.
+    """
+    if meta.get('previousClose'):
+        return meta['previousClose']
+    if len(series):
+        market_day = meta.get('regularMarketTime', 0) // SECONDS_PER_DAY
+        if series.timestamps[-1] // SECONDS_PER_DAY >= market_day and len(series) > 1:
+            return float(series.close[-2])
+        return float(series.close[-1])
+    return meta.get('chartPreviousClose', meta.get('regularMarketPrice', 0))
+
+
+def quote_from_chart(meta, series):
+    """
+    Build the quote section from chart meta and the bar history
+    """
+    current_price = meta.get('regularMarketPrice', 0)
+    chart_previous_close = previous_close(meta, series)
+
+    # Calculate daily change
+    daily_change = current_price - chart_previous_close
+    daily_change_percent = (daily_change / chart_previous_close * 100) if chart_previous_close > 0 else 0
+
+    return {
+        'c': current_price,  # current price
+        'd': daily_change,  # change
+        'dp': daily_change_percent,  # percent change
+        'h': meta.get('regularMarketDayHigh', current_price),  # high
+        'l': meta.get('regularMarketDayLow', current_price),  # low
+        'o': float(series.open[-1]) if len(series) else current_price,  # open
+        'pc': chart_previous_close,  # previous close
+        't': meta.get('regularMarketTime', int(datetime.now().timestamp()))
+    }
+
+
+class YahooProvider(DataProvider):
+    name = 'yahoo'
+    data_source = 'Yahoo Finance'
+
+    def analyze(self, asx_ticker):
+        """
+        Build the analysis sections for one ticker from the Yahoo chart data
+        Raises when Yahoo Finance has no data for the ticker
+        """
+        ticker = base_ticker(asx_ticker)
+
+        # Benchmark history for beta is fetched alongside the ticker's own history
+        if LIVE_METRICS:
+            index_future = submit_in_context(upstream_executor, fetch_metric_state, BENCHMARK_INDEX)
+            result, state = fetch_metric_state(asx_ticker)
+            with state.lock:
+                series = state.recent()
+        else:
+            index_future = submit_in_context(upstream_executor, fetch_history, BENCHMARK_INDEX)
+            result, series = fetch_history(asx_ticker)
+        meta = result['meta']
+
+        # Extract current price data
+        quote = quote_from_chart(meta, series)
+        current_price = quote['c']
+
+        try:
+            index_history = index_future.result(timeout=UPSTREAM_TIMEOUT)[1]
+        except Exception as e:
+            print(f"Error fetching benchmark {BENCHMARK_INDEX} for {asx_ticker}: {e}")
+            index_history = None
+        if LIVE_METRICS and index_history is not None:
+            # Copied under the index's own lock, never while holding this ticker's
+            with index_history.lock:
+                index_history = index_history.index_year()
+
+        # Derive the history-based metrics (volumes, returns, volatility,
+        # technicals): live state only recomputes what new bars or the new
+        # price affect, otherwise they come from the stored bars as arrays
+        with stage_span('history_metrics'):
+            if LIVE_METRICS:
+                with state.lock:
+                    history_metrics = state.metrics(price=current_price, index=index_history)
+            else:
+                history_metrics = compute_metrics(series, index_history, price=current_price)
+
+        # Structure the sections to match our frontend expectations
+        sections = {
+            'profile': {
+                'name': meta.get('longName', f"{ticker} Limited"),
+                'shortName': meta.get('shortName', ticker),
+                'country': 'AU',
+                'currency': meta.get('currency', 'AUD'),
+                'exchange': meta.get('exchangeName', 'ASX'),
+                'fullExchangeName': meta.get('fullExchangeName', 'Australian Securities Exchange'),
+                'instrumentType': meta.get('instrumentType', 'EQUITY'),
+                'timezone': meta.get('timezone', 'AEST'),
+                'firstTradeDate': meta.get('firstTradeDate'),
+                'marketCapitalization': 0,  # Not available in basic Yahoo Finance
+                'shareOutstanding': 0,  # Not available in basic Yahoo Finance
+                'logo': '',  # Not available in Yahoo Finance
+                'weburl': '',  # Not available in Yahoo Finance
+                'finnhubIndustry': 'N/A'
+            },
+            'quote': quote,
+            'financials': {
+                'metric': {
+                    '10DayAverageTradingVolume': history_metrics.get('10DayAverageTradingVolume', 0),
+                    '52WeekHigh': meta.get('fiftyTwoWeekHigh', history_metrics.get('52WeekHigh', current_price)),
+                    '52WeekLow': meta.get('fiftyTwoWeekLow', history_metrics.get('52WeekLow', current_price)),
+                    'beta': history_metrics.get('beta', 0),
+                    'dividendYieldIndicatedAnnual': history_metrics.get('dividendYieldIndicatedAnnual', 0),
+                    'epsInclExtraItemsTTM': 0,  # Not available in basic Yahoo Finance
+                    'marketCapitalization': 0,  # Not available in basic Yahoo Finance
+                    'peInclExtraTTM': 0,  # Not available in basic Yahoo Finance
+                    'pbAnnual': 0,  # Not available in basic Yahoo Finance
+                    'roaeTTM': 0,  # Not available in basic Yahoo Finance
+                    'roeTTM': 0,  # Not available in basic Yahoo Finance
+                    'regularMarketVolume': meta.get('regularMarketVolume', 0)
+                }
+            },
+            'sentiment': {
+                'buzz': {
+                    'articlesInLastWeek': 0,  # Not available in Yahoo Finance
+                    'buzz': 0,  # Not available in Yahoo Finance
+                    'weeklyAverage': 0  # Not available in Yahoo Finance
+                },
+                'companyNewsScore': 0,  # Not available in Yahoo Finance
+                'sectorAverageBullishPercent': 0,  # Not available in Yahoo Finance
+                'sectorAverageNewsScore': 0,  # Not available in Yahoo Finance
+                'sentiment': {
+                    'bearishPercent': 0,  # Not available in Yahoo Finance
+                    'bullishPercent': 0  # Not available in Yahoo Finance
+                },
+                'symbol': ticker
+            }
+        }
+
+        # Return and technical metrics that have no fixed slot above
+        metric = sections['financials']['metric']
+        for key, value in history_metrics.items():
+            metric.setdefault(key, value)
+
+        return sections
+
+    def quote(self, asx_ticker):
+        result = chart_result(fetch_chart(asx_ticker, '5d'))
+        if result is None:
+            raise ProviderError(f"No data found for {asx_ticker}")
+        return quote_from_chart(result['meta'], PriceSeries.from_chart(result))
+
+    def history(self, asx_ticker):
+        return fetch_history(asx_ticker)[1]
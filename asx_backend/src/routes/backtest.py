@@ -0,0 +1,77 @@
+from flask import Blueprint, jsonify, request
+from src.services.backtest import (
+    backtest, BacktestRequestError, STRATEGIES, REBALANCE_PERIODS, PROVIDERS, BACKTEST_PROVIDER
+)
+
+backtest_bp = Blueprint('backtest', __name__)
+
+def _number(options, name, default, kind=int):
+    try:
+        return kind(options.get(name, default))
+    except (TypeError, ValueError):
+        raise BacktestRequestError(f'{name} must be a number')
+
+@backtest_bp.route('/backtest', methods=['GET', 'POST'])
+def run_backtest():
+    """
+    Backtest a strategy over the ASX universe's daily history
+    GET  /api/backtest?strategy=momentum&years=10&top=20&rebalance=monthly&cost_bps=10
+    POST /api/backtest {"strategy": "sma_crossover", "params": {"fast": 50},
+                        "tickers": ["CBA", "BHP"], "sweep": {"slow": [100, 200]}}
+    Strategy parameters go in the query string for GET; sweeps need POST.
+    """
+    try:
+        if request.method == 'POST':
+            options = request.get_json(silent=True)
+            if not isinstance(options, dict):
+                raise BacktestRequestError('Request body must be a JSON object')
+            params = options.get('params') or {}
+            tickers = options.get('tickers')
+            sweep_values = options.get('sweep')
+            if not isinstance(params, dict) or (sweep_values is not None and not isinstance(sweep_values, dict)):
+                raise BacktestRequestError('params and sweep must be objects')
+            if tickers is not None and not isinstance(tickers, list):
+                raise BacktestRequestError('tickers must be a list')
+        else:
+            options = request.args
+            strategy = options.get('strategy', 'momentum')
+            defaults = STRATEGIES[strategy][1] if strategy in STRATEGIES else {}
+            params = {name: options[name] for name in defaults if name in options}
+            tickers = [t for t in options.get('tickers', '').split(',') if t.strip()] or None
+            sweep_values = None
+
+        result = backtest(
+            options.get('strategy', 'momentum'),
+            params,
+            tickers=tickers,
+            years=_number(options, 'years', 5),
+            period=options.get('rebalance', 'monthly'),
+            cost_bps=_number(options, 'cost_bps', 10.0, float),
+            provider=options.get('provider', BACKTEST_PROVIDER),
+            sweep_values=sweep_values
+        )
+
+    except BacktestRequestError as e:
+        return jsonify({
+            'error': 'Invalid backtest',
+            'message': str(e)
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to run backtest',
+            'message': str(e)
+        }), 500
+
+    return jsonify(result)
+
+@backtest_bp.route('/backtest/strategies', methods=['GET'])
+def backtest_strategies():
+    """
+    Strategies with their default parameters, rebalance periods and data sources
+    """
+    return jsonify({
+        'strategies': {name: defaults for name, (_, defaults) in STRATEGIES.items()},
+        'rebalance': list(REBALANCE_PERIODS),
+        'providers': list(PROVIDERS)
+    })
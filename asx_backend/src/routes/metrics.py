@@ -0,0 +1,16 @@
+from flask import Blueprint, Response
+from src.services.metrics import render_prometheus
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Request, upstream, cache and provider metrics in Prometheus text format
+    """
+    try:
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    except Exception as e:
+        print(f"Error rendering metrics: {e}")
+        return Response(f"# error rendering metrics: {e}\n", status=500, mimetype='text/plain')
@@ -0,0 +1,136 @@
+import math
+
+from flask import Blueprint, jsonify, request
+from src.models.user import User, db
+from src.models.portfolio import Portfolio, Holding, PORTFOLIO_KINDS
+from src.services.portfolio import value_portfolio, valuation_cache, PORTFOLIO_MAX_HOLDINGS
+from src.services.tickers import to_asx_ticker
+
+portfolio_bp = Blueprint('portfolio', __name__)
+
+class PortfolioRequestError(ValueError):
+    pass
+
+def parse_holding(data):
+    """
+    Validate one {"ticker", "quantity", "cost_basis"} entry
+    """
+    if not isinstance(data, dict) or not str(data.get('ticker') or '').strip():
+        raise PortfolioRequestError('Each holding needs a ticker')
+    try:
+        quantity = float(data.get('quantity') or 0)
+        cost_basis = float(data.get('cost_basis') or 0)
+    except (TypeError, ValueError):
+        raise PortfolioRequestError(f"Invalid quantity or cost_basis for {data['ticker']}")
+    if not (math.isfinite(quantity) and math.isfinite(cost_basis)) or quantity < 0 or cost_basis < 0:
+        raise PortfolioRequestError(f"quantity and cost_basis must be finite and not negative for {data['ticker']}")
+    return to_asx_ticker(str(data['ticker'])), quantity, cost_basis
+
+def invalid_request(e):
+    return jsonify({
+        'error': 'Invalid portfolio request',
+        'message': str(e)
+    }), 400
+
+@portfolio_bp.route('/users/<int:user_id>/portfolios', methods=['GET'])
+def get_portfolios(user_id):
+    user = User.query.get_or_404(user_id)
+    return jsonify([portfolio.to_dict() for portfolio in user.portfolios])
+
+@portfolio_bp.route('/users/<int:user_id>/portfolios', methods=['POST'])
+def create_portfolio(user_id):
+    """
+    Create a portfolio or watchlist, optionally with its holdings
+    {"name": ..., "kind": "portfolio"|"watchlist", "holdings": [{"ticker", "quantity", "cost_basis"}]}
+    """
+    User.query.get_or_404(user_id)
+    data = request.get_json(silent=True)
+    try:
+        if not isinstance(data, dict):
+            raise PortfolioRequestError('Request body must be a JSON object')
+        kind = data.get('kind', 'portfolio')
+        if kind not in PORTFOLIO_KINDS:
+            raise PortfolioRequestError(f"kind must be one of {', '.join(PORTFOLIO_KINDS)}")
+        if not str(data.get('name') or '').strip():
+            raise PortfolioRequestError('A portfolio needs a name')
+        if not isinstance(data.get('holdings') or [], list):
+            raise PortfolioRequestError('holdings must be a list')
+        holdings = {}
+        for entry in data.get('holdings') or []:
+            ticker, quantity, cost_basis = parse_holding(entry)
+            holdings[ticker] = Holding(ticker=ticker, quantity=quantity, cost_basis=cost_basis)
+        if len(holdings) > PORTFOLIO_MAX_HOLDINGS:
+            raise PortfolioRequestError(f'At most {PORTFOLIO_MAX_HOLDINGS} holdings per portfolio')
+    except PortfolioRequestError as e:
+        return invalid_request(e)
+
+    portfolio = Portfolio(user_id=user_id, name=data['name'].strip(), kind=kind, holdings=list(holdings.values()))
+    db.session.add(portfolio)
+    db.session.commit()
+    return jsonify(portfolio.to_dict()), 201
+
+@portfolio_bp.route('/portfolios/<int:portfolio_id>', methods=['GET'])
+def get_portfolio(portfolio_id):
+    portfolio = Portfolio.query.get_or_404(portfolio_id)
+    return jsonify(portfolio.to_dict())
+
+@portfolio_bp.route('/portfolios/<int:portfolio_id>', methods=['DELETE'])
+def delete_portfolio(portfolio_id):
+    portfolio = Portfolio.query.get_or_404(portfolio_id)
+    db.session.delete(portfolio)
+    db.session.commit()
+    valuation_cache.invalidate(portfolio_id)
+    return '', 204
+
+@portfolio_bp.route('/portfolios/<int:portfolio_id>/holdings', methods=['PUT'])
+def upsert_holding(portfolio_id):
+    """
+    Add a holding, or replace the quantity and cost basis of an existing one
+    """
+    portfolio = Portfolio.query.get_or_404(portfolio_id)
+    try:
+        ticker, quantity, cost_basis = parse_holding(request.get_json(silent=True))
+        holding = next((h for h in portfolio.holdings if h.ticker == ticker), None)
+        if holding is None and len(portfolio.holdings) >= PORTFOLIO_MAX_HOLDINGS:
+            raise PortfolioRequestError(f'At most {PORTFOLIO_MAX_HOLDINGS} holdings per portfolio')
+    except PortfolioRequestError as e:
+        return invalid_request(e)
+
+    if holding is None:
+        holding = Holding(ticker=ticker)
+        portfolio.holdings.append(holding)
+    holding.quantity = quantity
+    holding.cost_basis = cost_basis
+    db.session.commit()
+    return jsonify(portfolio.to_dict())
+
+@portfolio_bp.route('/portfolios/<int:portfolio_id>/holdings/<ticker>', methods=['DELETE'])
+def delete_holding(portfolio_id, ticker):
+    portfolio = Portfolio.query.get_or_404(portfolio_id)
+    asx_ticker = to_asx_ticker(ticker)
+    holding = next((h for h in portfolio.holdings if h.ticker == asx_ticker), None)
+    if holding is None:
+        return jsonify({
+            'error': 'Holding not found',
+            'message': f'{asx_ticker} is not in portfolio {portfolio_id}'
+        }), 404
+    portfolio.holdings.remove(holding)
+    db.session.commit()
+    return '', 204
+
+@portfolio_bp.route('/portfolios/<int:portfolio_id>/valuation', methods=['GET'])
+def portfolio_valuation(portfolio_id):
+    """
+    Value a whole portfolio in one request
+    Market value, P&L and weight per holding, portfolio totals, and
+    volatility and return correlations over the shared price history
+    """
+    portfolio = Portfolio.query.get_or_404(portfolio_id)
+    try:
+        return jsonify(value_portfolio(portfolio))
+
+    except Exception as e:
+        return jsonify({
+            'error': f'Failed to value portfolio {portfolio_id}',
+            'message': str(e)
+        }), 500
@@ -0,0 +1,61 @@
+from flask import Blueprint, jsonify, request
+from src.providers.base import ProviderError
+from src.providers.registry import get_provider_registry
+from src.services.quote_board import QUOTE_BOARD_PROVIDER, get_quote_board
+from src.services.tickers import to_asx_ticker
+
+quotes_bp = Blueprint('quotes', __name__)
+
+QUOTES_MAX_TICKERS = 200
+
+@quotes_bp.route('/quote/<ticker>', methods=['GET'])
+def get_quote(ticker):
+    """
+    Latest quote (c, d, dp, h, l, o, pc, t) for one ticker
+    Read from the shared quote board when the app runs with one (QUOTE_BOARD)
+    """
+    asx_ticker = to_asx_ticker(ticker)
+    try:
+        quote = get_provider_registry().quote(asx_ticker, primary=QUOTE_BOARD_PROVIDER)
+
+    except Exception as e:
+        return jsonify({
+            'error': f'Failed to fetch quote for {ticker}',
+            'message': str(e)
+        }), 503 if isinstance(e, ProviderError) else 500
+
+    return jsonify({'ticker': ticker.upper(), 'asx_ticker': asx_ticker, 'quote': quote})
+
+@quotes_bp.route('/quotes', methods=['GET'])
+def get_quotes():
+    """
+    Latest quotes for ?tickers=CBA,BHP; tickers that fail are listed in `errors`
+    """
+    tickers = list(dict.fromkeys(to_asx_ticker(t) for t in request.args.get('tickers', '').split(',') if t.strip()))
+    if not tickers:
+        return jsonify({
+            'error': 'Invalid quotes request',
+            'message': 'No tickers supplied'
+        }), 400
+    if len(tickers) > QUOTES_MAX_TICKERS:
+        return jsonify({
+            'error': 'Invalid quotes request',
+            'message': f'At most {QUOTES_MAX_TICKERS} tickers per request'
+        }), 400
+
+    registry = get_provider_registry()
+    quotes = {}
+    errors = {}
+    for asx_ticker in tickers:
+        try:
+            quotes[asx_ticker] = registry.quote(asx_ticker, primary=QUOTE_BOARD_PROVIDER)
+        except Exception as e:
+            errors[asx_ticker] = str(e)
+
+    board = get_quote_board()
+    return jsonify({
+        'quotes': quotes,
+        'errors': errors,
+        'count': len(quotes),
+        'source': 'quote_board' if board is not None and board.fetcher_alive() else QUOTE_BOARD_PROVIDER
+    })
@@ -0,0 +1,79 @@
+import time
+from flask import Blueprint, jsonify, request
+from src.services.screener import screener, parse_conditions, ScreenRequestError, FIELD_ALIASES, SCREENER_MAX_RESULTS
+
+screener_bp = Blueprint('screener', __name__)
+
+def _list_arg(name):
+    values = []
+    for value in request.args.getlist(name):
+        values.extend(v.strip() for v in value.split(',') if v.strip())
+    return values
+
+def _not_ready():
+    return jsonify({
+        'error': 'Screener is not ready',
+        'message': 'The market snapshot is still being built; retry shortly'
+    }), 503, {'Retry-After': '5'}
+
+@screener_bp.route('/screen', methods=['GET'])
+def screen_stocks():
+    """
+    Screen the whole ASX universe in one request
+    ?filter=pe<15,dividend_yield>5&sector=Banking&sort=-dividend_yield&limit=20
+    Optional ?fields=pe,price limits the metrics returned per row
+    """
+    start = time.perf_counter()
+    try:
+        conditions = parse_conditions(request.args.getlist('filter'))
+        try:
+            limit = min(max(int(request.args.get('limit', 50)), 1), SCREENER_MAX_RESULTS)
+        except ValueError:
+            raise ScreenRequestError('limit must be an integer')
+        snapshot = screener.snapshot()
+        if snapshot is None:
+            return _not_ready()
+        total, results = snapshot.screen(
+            conditions,
+            sectors=_list_arg('sector'),
+            sort=request.args.get('sort'),
+            limit=limit,
+            fields=_list_arg('fields')
+        )
+
+    except ScreenRequestError as e:
+        return jsonify({
+            'error': 'Invalid screen',
+            'message': str(e)
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to screen stocks',
+            'message': str(e)
+        }), 500
+
+    return jsonify({
+        'filters': [{'field': field, 'op': op, 'value': value} for field, op, value in conditions],
+        'total': total,
+        'count': len(results),
+        'results': results,
+        'universe': len(snapshot),
+        'snapshot_time': snapshot.built_at.isoformat(),
+        'data_source': snapshot.provider,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+    })
+
+@screener_bp.route('/screen/fields', methods=['GET'])
+def screen_fields():
+    """
+    Fields, aliases and sectors the screener accepts
+    """
+    snapshot = screener.snapshot()
+    if snapshot is None:
+        return _not_ready()
+    return jsonify({
+        'fields': sorted(snapshot.columns),
+        'aliases': FIELD_ALIASES,
+        'sectors': snapshot.sector_names
+    })
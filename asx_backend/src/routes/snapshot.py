@@ -0,0 +1,45 @@
+import hmac
+from datetime import datetime
+from flask import Blueprint, Response, jsonify, request
+from src.services.snapshot import export_cache, SNAPSHOT_TOKEN
+
+snapshot_bp = Blueprint('snapshot', __name__)
+
+def _authorized():
+    supplied = request.headers.get('Authorization', '')
+    return supplied.startswith('Bearer ') and hmac.compare_digest(supplied[len('Bearer '):].encode(), SNAPSHOT_TOKEN.encode())
+
+@snapshot_bp.route('/snapshot', methods=['GET'])
+def download_snapshot():
+    """
+    Current market state (cache entries and bar history) as a binary snapshot
+    Save it and point another instance's SNAPSHOT_PATH at it to start warm.
+    Only served when SNAPSHOT_TOKEN is set, to requests bearing that token.
+    """
+    if not SNAPSHOT_TOKEN:
+        return jsonify({
+            'error': 'Snapshot export is disabled',
+            'message': 'Set SNAPSHOT_TOKEN to enable it'
+        }), 404
+    if not _authorized():
+        return jsonify({
+            'error': 'Unauthorized',
+            'message': 'Send the snapshot token as "Authorization: Bearer <token>"'
+        }), 401, {'WWW-Authenticate': 'Bearer'}
+
+    try:
+        # Exports are reused for SNAPSHOT_EXPORT_TTL seconds
+        data = export_cache.get()
+
+    except Exception as e:
+        print(f"Error exporting snapshot: {e}")
+        return jsonify({
+            'error': 'Failed to export snapshot',
+            'message': str(e)
+        }), 500
+
+    filename = f"asx-snapshot-{datetime.now().strftime('%Y%m%d-%H%M%S')}.snap"
+    return Response(data, mimetype='application/octet-stream', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store'
+    })
@@ -1,14 +1,14 @@
 from flask import Blueprint, jsonify, request
-import finnhub
 import os
 from datetime import datetime, timedelta
+from src.providers.registry import get_provider_registry
+from src.services.metrics import upstream_span
+from src.services.prewarm import ticker_heat
+from src.services.rate_limit import upstream_governor
+from src.services.response_cache import cached_analysis_response
 
 stock_bp = Blueprint('stock', __name__)
 
-# Initialize Finnhub client
-# For now, we'll use a demo API key. In production, this should be an environment variable
-finnhub_client = finnhub.Client(api_key="demo")
-
 @stock_bp.route('/analyze/<ticker>', methods=['GET'])
 def analyze_stock(ticker):
     """
@@ -16,54 +16,13 @@ def analyze_stock(ticker):
     Returns comprehensive analysis including company profile, financials, and sentiment
     """
     try:
-        # Convert ticker to ASX format (add .AX suffix if not present)
-        asx_ticker = ticker.upper()
-        if not asx_ticker.endswith('.AX'):
-            asx_ticker += '.AX'
-        
-        # Fetch company profile
-        try:
-            profile = finnhub_client.company_profile2(symbol=asx_ticker)
-        except Exception as e:
-            print(f"Error fetching profile for {asx_ticker}: {e}")
-            profile = {}
-        
-        # Fetch current quote
-        try:
-            quote = finnhub_client.quote(asx_ticker)
-        except Exception as e:
-            print(f"Error fetching quote for {asx_ticker}: {e}")
-            quote = {}
-        
-        # Fetch basic financials
-        try:
-            financials = finnhub_client.company_basic_financials(asx_ticker, 'all')
-        except Exception as e:
-            print(f"Error fetching financials for {asx_ticker}: {e}")
-            financials = {'metric': {}}
-        
-        # Fetch news sentiment
-        try:
-            # Get sentiment for the past week
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=7)
-            sentiment = finnhub_client.news_sentiment(asx_ticker)
-        except Exception as e:
-            print(f"Error fetching sentiment for {asx_ticker}: {e}")
-            sentiment = {}
-        
-        # Structure the response
-        response_data = {
-            'ticker': ticker.upper(),
-            'asx_ticker': asx_ticker,
-            'profile': profile,
-            'quote': quote,
-            'financials': financials,
-            'sentiment': sentiment,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        return jsonify(response_data)
+        response = cached_analysis_response(
+            ('finnhub', ticker.upper()),
+            lambda: get_provider_registry().analyze(ticker, primary='finnhub')
+        )
+        # Only tickers that resolved count towards pre-warming
+        ticker_heat.record(ticker)
+        return response
     
     except Exception as e:
         return jsonify({
@@ -78,7 +37,14 @@ def search_stocks(query):
     """
     try:
         # Use Finnhub symbol lookup
-        results = finnhub_client.symbol_lookup(query)
+        finnhub_provider = get_provider_registry().get('finnhub')
+        if finnhub_provider is None:
+            raise Exception('Finnhub provider is not available')
+        def lookup():
+            with upstream_span('finnhub', 'symbol_lookup'):
+                return finnhub_provider.client.symbol_lookup(query)
+
+        results = upstream_governor.call('finnhub', 'symbol_lookup', lookup)
         
         # Filter for ASX stocks only
         asx_results = []
@@ -0,0 +1,46 @@
+from flask import Blueprint, Response, jsonify, request
+import os
+from src.providers.registry import get_provider_registry
+from src.services.quote_stream import QuoteHub, sse_events, STREAM_MAX_TICKERS
+
+stream_bp = Blueprint('stream', __name__)
+
+# Provider the shared pollers ask first; failover applies as for /analyze
+STREAM_PROVIDER = os.environ.get('STREAM_PROVIDER', 'demo')
+
+quote_hub = QuoteHub(lambda asx_ticker: get_provider_registry().quote(asx_ticker, primary=STREAM_PROVIDER))
+
+@stream_bp.route('/stream/quotes', methods=['GET'])
+def stream_quotes():
+    """
+    Server-sent events with quote deltas (c, d, dp, h, l, t) for ?tickers=CBA,BHP
+    The first event per ticker carries every field; later ones only what changed.
+    """
+    tickers = [t for t in request.args.get('tickers', '').split(',') if t.strip()]
+    if not tickers:
+        return jsonify({
+            'error': 'Invalid stream request',
+            'message': 'No tickers supplied'
+        }), 400
+    if len(tickers) > STREAM_MAX_TICKERS:
+        return jsonify({
+            'error': 'Invalid stream request',
+            'message': f'At most {STREAM_MAX_TICKERS} tickers per stream'
+        }), 400
+
+    return Response(
+        sse_events(quote_hub, tickers),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@stream_bp.route('/stream/quotes/<ticker>', methods=['GET'])
+def stream_quote(ticker):
+    """
+    Server-sent quote deltas for a single ticker
+    """
+    return Response(
+        sse_events(quote_hub, [ticker]),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
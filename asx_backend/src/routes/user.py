@@ -1,22 +1,172 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, url_for
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from src.models.user import User, db
 
 user_bp = Blueprint('user', __name__)
 
+USERS_PAGE_SIZE = 100
+USERS_MAX_PAGE_SIZE = 1000
+USERS_BATCH_MAX = 1000
+# SQLite allows 999 bound parameters per statement in older builds
+LOOKUP_CHUNK = 500
+
+def validate_user(data):
+    """
+    Return (username, email) from a request row or raise ValueError
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Expected an object with username and email')
+    username = data.get('username')
+    email = data.get('email')
+    if not isinstance(username, str) or not username.strip():
+        raise ValueError('username is required')
+    if not isinstance(email, str) or not email.strip():
+        raise ValueError('email is required')
+    username, email = username.strip(), email.strip()
+    if len(username) > User.username.type.length:
+        raise ValueError(f'username is longer than {User.username.type.length} characters')
+    if len(email) > User.email.type.length:
+        raise ValueError(f'email is longer than {User.email.type.length} characters')
+    return username, email
+
+def existing_values(column, values):
+    """
+    The subset of `values` already stored in a unique column (index lookups)
+    """
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        chunk = values[start:start + LOOKUP_CHUNK]
+        found.update(db.session.scalars(select(column).where(column.in_(chunk))))
+    return found
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    """
+    List users in id order
+    Without parameters every user is returned, as before paging existed.
+    With ?limit=N (default 100, max 1000) and/or ?cursor=<X-Next-Cursor of
+    the previous page> one page is returned; the header is absent on the
+    last page.
+    """
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        rows = db.session.execute(select(User.id, User.username, User.email).order_by(User.id)).all()
+        return jsonify([{'id': row.id, 'username': row.username, 'email': row.email} for row in rows])
+
+    try:
+        limit = min(max(int(request.args.get('limit', USERS_PAGE_SIZE)), 1), USERS_MAX_PAGE_SIZE)
+        cursor = int(request.args.get('cursor', 0))
+    except ValueError:
+        return jsonify({
+            'error': 'Invalid pagination parameters',
+            'message': 'limit and cursor must be integers'
+        }), 400
+
+    # Plain column rows: a keyset range scan on the primary key, no ORM objects
+    rows = db.session.execute(
+        select(User.id, User.username, User.email)
+        .where(User.id > cursor)
+        .order_by(User.id)
+        .limit(limit + 1)
+    ).all()
+    users = [{'id': row.id, 'username': row.username, 'email': row.email} for row in rows[:limit]]
+
+    response = jsonify(users)
+    if len(rows) > limit:
+        next_cursor = users[-1]['id']
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+        response.headers['Link'] = f'<{url_for(".get_users", limit=limit, cursor=next_cursor)}>; rel="next"'
+    return response
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
-    
-    data = request.json
-    user = User(username=data['username'], email=data['email'])
+
+    data = request.get_json(silent=True)
+    try:
+        username, email = validate_user(data)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid user',
+            'message': str(e)
+        }), 400
+    user = User(username=username, email=email)
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({
+            'error': 'User already exists',
+            'message': f'username {username} or email {email} is taken'
+        }), 409
     return jsonify(user.to_dict()), 201
 
+@user_bp.route('/users/batch', methods=['POST'])
+def create_users_batch():
+    """
+    Create many users in one transaction
+    Accepts {"users": [{"username", "email"}, ...]} (or the bare list). Valid
+    rows are inserted together; invalid or duplicate rows are reported by
+    index in `errors` and skipped.
+    """
+    data = request.get_json(silent=True)
+    rows = data.get('users') if isinstance(data, dict) else data
+    if not isinstance(rows, list) or not rows:
+        return jsonify({
+            'error': 'Invalid batch request',
+            'message': 'Send {"users": [{"username": ..., "email": ...}, ...]}'
+        }), 400
+    if len(rows) > USERS_BATCH_MAX:
+        return jsonify({
+            'error': 'Invalid batch request',
+            'message': f'At most {USERS_BATCH_MAX} users per batch'
+        }), 400
+
+    errors = []
+    candidates = []
+    for index, row in enumerate(rows):
+        try:
+            candidates.append((index, *validate_user(row)))
+        except ValueError as e:
+            errors.append({'index': index, 'message': str(e)})
+
+    taken_usernames = existing_values(User.username, {c[1] for c in candidates})
+    taken_emails = existing_values(User.email, {c[2] for c in candidates})
+    valid = []
+    for index, username, email in candidates:
+        if username in taken_usernames:
+            errors.append({'index': index, 'message': f'username {username} is taken'})
+        elif email in taken_emails:
+            errors.append({'index': index, 'message': f'email {email} is taken'})
+        else:
+            # Later rows may not reuse a name or email claimed earlier in the batch
+            taken_usernames.add(username)
+            taken_emails.add(email)
+            valid.append({'username': username, 'email': email})
+
+    created = []
+    if valid:
+        try:
+            # One executemany INSERT ... RETURNING for the whole batch
+            created = db.session.execute(
+                insert(User).returning(User.id, User.username, User.email), valid
+            ).all()
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            return jsonify({
+                'error': 'Batch conflicts with users created concurrently',
+                'message': str(e.orig)
+            }), 409
+
+    errors.sort(key=lambda error: error['index'])
+    return jsonify({
+        'created': [{'id': row.id, 'username': row.username, 'email': row.email} for row in created],
+        'errors': errors,
+        'count': len(created)
+    }), 201 if created else 400
+
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
@@ -25,10 +175,27 @@ def get_user(user_id):
 @user_bp.route('/users/<int:user_id>', methods=['PUT'])
 def update_user(user_id):
     user = User.query.get_or_404(user_id)
-    data = request.json
-    user.username = data.get('username', user.username)
-    user.email = data.get('email', user.email)
-    db.session.commit()
+    data = request.get_json(silent=True)
+    try:
+        # Fields left out of the body keep their current values
+        if not isinstance(data, dict):
+            raise ValueError('Expected an object with username and/or email')
+        username, email = validate_user({'username': user.username, 'email': user.email, **data})
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid user',
+            'message': str(e)
+        }), 400
+    user.username = username
+    user.email = email
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({
+            'error': 'User already exists',
+            'message': f'username {username} or email {email} is taken'
+        }), 409
     return jsonify(user.to_dict())
 
 @user_bp.route('/users/<int:user_id>', methods=['DELETE'])
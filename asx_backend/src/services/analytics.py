@@ -0,0 +1,364 @@
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+SECONDS_PER_DAY = 86400
+
+
+def _column(values, dtype=np.float64):
+    # None entries (halted or missing bars) become NaN in a single conversion
+    return np.asarray(values if values is not None else [], dtype=dtype)
+
+
+class PriceSeries:
+    """
+    Columnar view of a daily OHLCV history
+    Built once per chart payload; every metric below works on these arrays.
+    """
+
+    def __init__(self, timestamps, open_, high, low, close, volume, adjclose=None,
+                 dividend_timestamps=None, dividend_amounts=None):
+        self.timestamps = _column(timestamps, np.int64)
+        self.open = _column(open_)
+        self.high = _column(high)
+        self.low = _column(low)
+        self.close = _column(close)
+        self.volume = _column(volume)
+        self.adjclose = _column(adjclose) if adjclose is not None and len(adjclose) else self.close
+        self.dividend_timestamps = _column(dividend_timestamps, np.int64)
+        self.dividend_amounts = _column(dividend_amounts)
+
+    @classmethod
+    def from_chart(cls, result):
+        """
+        Build a series from one Yahoo `chart.result` entry, dropping empty bars
+        """
+        indicators = result.get('indicators', {})
+        quote = (indicators.get('quote') or [{}])[0]
+        adjclose = (indicators.get('adjclose') or [{}])[0].get('adjclose')
+        dividends = (result.get('events') or {}).get('dividends') or {}
+
+        series = cls(
+            result.get('timestamp') or [],
+            quote.get('open'),
+            quote.get('high'),
+            quote.get('low'),
+            quote.get('close'),
+            quote.get('volume'),
+            adjclose,
+            [d.get('date', 0) for d in dividends.values()],
+            [d.get('amount', 0) for d in dividends.values()]
+        )
+        return series.valid()
+
+    def valid(self):
+        """
+        Return a copy without bars whose close is missing
+        """
+        n = len(self.timestamps)
+        if len(self.close) != n:
+            return PriceSeries([], [], [], [], [], [])
+        mask = ~np.isnan(self.close)
+        if mask.all():
+            return self
+        return PriceSeries(
+            self.timestamps[mask], self.open[mask], self.high[mask], self.low[mask],
+            self.close[mask], self.volume[mask], self.adjclose[mask],
+            self.dividend_timestamps, self.dividend_amounts
+        )
+
+    def tail(self, bars):
+        """
+        Return the last `bars` rows as a new series
+        """
+        s = slice(-bars, None) if bars else slice(None)
+        return PriceSeries(
+            self.timestamps[s], self.open[s], self.high[s], self.low[s],
+            self.close[s], self.volume[s], self.adjclose[s],
+            self.dividend_timestamps, self.dividend_amounts
+        )
+
+    def __len__(self):
+        return len(self.close)
+
+
+def rolling_mean(values, window):
+    """
+    Simple moving average over `window` bars (length n - window + 1)
+    """
+    if window <= 0 or len(values) < window:
+        return np.empty(0)
+    csum = np.cumsum(np.insert(values, 0, 0.0))
+    return (csum[window:] - csum[:-window]) / window
+
+
+def ema(values, span=None, alpha=None):
+    """
+    Exponentially weighted moving average (bias-adjusted, like pandas adjust=True)
+    Computed as one convolution with the decay kernel truncated once weights
+    fall below 1e-12, so there is no per-element Python recursion.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return values
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    if decay <= 0:
+        return values.copy()
+    kernel_len = int(min(n, np.ceil(np.log(1e-12) / np.log(decay)) + 1))
+    weights = decay ** np.arange(kernel_len)
+    numerator = np.convolve(values, weights)[:n]
+    denominator = np.cumsum(weights)[np.minimum(np.arange(n), kernel_len - 1)]
+    return numerator / denominator
+
+
+def wilder(values, period):
+    """
+    Wilder's moving average: the mean of the first `period` values, then
+    each value moves the average 1 / period of the way towards it
+    One value per input from the period-th on; the recursion is evaluated as
+    one convolution, like ema.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < period:
+        return np.empty(0)
+    seed = values[:period].mean()
+    rest = values[period:]
+    decay = 1.0 - 1.0 / period
+    if len(rest) == 0 or decay <= 0:
+        return np.concatenate(([seed], rest))
+    kernel_len = int(min(len(rest), np.ceil(np.log(1e-12) / np.log(decay)) + 1))
+    weighted = np.convolve(rest, decay ** np.arange(kernel_len))[:len(rest)]
+    return np.concatenate(([seed], seed * decay ** np.arange(1, len(rest) + 1) + weighted / period))
+
+
+def log_returns(close):
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < 2:
+        return np.empty(0)
+    return np.diff(np.log(close))
+
+
+def volatility(close, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Annualised standard deviation of daily log returns
+    """
+    returns = log_returns(close)
+    if len(returns) < 2:
+        return 0.0
+    return float(np.std(returns, ddof=1) * np.sqrt(periods_per_year))
+
+
+def drawdown(close):
+    """
+    Drawdown from the running peak at every bar (0 at new highs, negative below)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) == 0:
+        return close
+    return close / np.maximum.accumulate(close) - 1.0
+
+
+def max_drawdown(close):
+    dd = drawdown(close)
+    return float(dd.min()) if len(dd) else 0.0
+
+
+def rsi(close, period=14):
+    """
+    Relative strength index with Wilder smoothing: average gains and losses
+    start as the simple mean of the first `period` moves
+    One value per bar from bar `period` on.
+    """
+    deltas = np.diff(np.asarray(close, dtype=np.float64))
+    if len(deltas) < period:
+        return np.empty(0)
+    gains = wilder(np.clip(deltas, 0, None), period)
+    losses = wilder(np.clip(-deltas, 0, None), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gains / losses
+        out = 100.0 - 100.0 / (1.0 + rs)
+    # No losses in the window means maximum strength
+    out[losses == 0] = 100.0
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD line, signal line and histogram
+    """
+    close = np.asarray(close, dtype=np.float64)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def vwap(high, low, close, volume, window=None):
+    """
+    Volume-weighted average of the typical price, optionally over the last `window` bars
+    """
+    typical = (np.asarray(high) + np.asarray(low) + np.asarray(close)) / 3.0
+    volume = np.nan_to_num(np.asarray(volume, dtype=np.float64))
+    typical = np.where(np.isnan(typical), np.asarray(close), typical)
+    if window:
+        typical, volume = typical[-window:], volume[-window:]
+    total = volume.sum()
+    return float((typical * volume).sum() / total) if total > 0 else 0.0
+
+
+def beta(asset_timestamps, asset_close, index_timestamps, index_close):
+    """
+    Beta of daily returns against an index, aligned on trading day
+    """
+    asset_days = np.asarray(asset_timestamps, dtype=np.int64) // SECONDS_PER_DAY
+    index_days = np.asarray(index_timestamps, dtype=np.int64) // SECONDS_PER_DAY
+    _, asset_idx, index_idx = np.intersect1d(asset_days, index_days, return_indices=True)
+    if len(asset_idx) < 3:
+        return 0.0
+    asset_returns = log_returns(np.asarray(asset_close)[asset_idx])
+    index_returns = log_returns(np.asarray(index_close)[index_idx])
+    mask = np.isfinite(asset_returns) & np.isfinite(index_returns)
+    asset_returns, index_returns = asset_returns[mask], index_returns[mask]
+    if len(index_returns) < 2:
+        return 0.0
+    variance = np.var(index_returns, ddof=1)
+    if variance == 0:
+        return 0.0
+    return float(np.cov(asset_returns, index_returns, ddof=1)[0, 1] / variance)
+
+
+def align_closes(series_list, max_bars=None):
+    """
+    Adjusted closes of several series on the trading days they all share
+    Returns (days, closes) where closes has one column per series, in order.
+    """
+    if not series_list:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0))
+    day_columns = [series.timestamps // SECONDS_PER_DAY for series in series_list]
+    days = day_columns[0]
+    for other in day_columns[1:]:
+        days = np.intersect1d(days, other)
+    if max_bars is not None:
+        days = days[-max_bars:]
+    # Bars are sorted by time; take each series' last bar on every shared day
+    columns = [
+        series.adjclose[np.searchsorted(series_days, days, side='right') - 1]
+        for series, series_days in zip(series_list, day_columns)
+    ]
+    return days, np.column_stack(columns) if len(days) else np.empty((0, len(series_list)))
+
+
+def portfolio_risk(closes, weights, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Annualised volatility of a weighted portfolio and of each asset, plus the
+    correlation matrix of daily log returns
+    closes is (bars x assets) as returned by align_closes; returns None when
+    fewer than two usable return rows remain.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if closes.ndim != 2 or len(closes) < 3:
+        return None
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(closes), axis=0)
+    returns = returns[np.all(np.isfinite(returns), axis=1)]
+    if len(returns) < 2:
+        return None
+
+    covariance = np.atleast_2d(np.cov(returns, rowvar=False, ddof=1))
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.outer(std, std)
+    # Flat series have no defined correlation; treat them as uncorrelated
+    correlation = np.where(np.isfinite(correlation), correlation, 0.0)
+    np.fill_diagonal(correlation, 1.0)
+
+    variance = float(weights @ covariance @ weights)
+    return {
+        'volatility': float(np.sqrt(max(variance, 0.0) * periods_per_year)),
+        'asset_volatility': std * np.sqrt(periods_per_year),
+        'correlation': np.clip(correlation, -1.0, 1.0),
+        'observations': len(returns)
+    }
+
+
+def period_return(close, bars):
+    """
+    Percent price return over the last `bars` bars
+    A history a few bars short of the period (holidays, halts) still counts.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) - 1 >= bars * 0.95:
+        bars = min(bars, len(close) - 1)
+    if len(close) <= bars or close[-bars - 1] == 0:
+        return 0.0
+    return float((close[-1] / close[-bars - 1] - 1.0) * 100.0)
+
+
+def trailing_dividend_yield(series, price, days=365):
+    """
+    Sum of dividends paid in the last `days` as a percent of `price`
+    """
+    if len(series.dividend_amounts) == 0 or not price or len(series.timestamps) == 0:
+        return 0.0
+    cutoff = series.timestamps[-1] - days * SECONDS_PER_DAY
+    paid = series.dividend_amounts[series.dividend_timestamps >= cutoff].sum()
+    return float(paid / price * 100.0)
+
+
+def _round(value, digits=4):
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else 0.0
+
+
+def compute_metrics(series, index_series=None, price=None):
+    """
+    Derive `financials.metric` fields from a price series
+    Keys follow the Finnhub basic-financials naming where one exists.
+    """
+    if len(series) == 0:
+        return {}
+
+    year = series.tail(TRADING_DAYS_PER_YEAR)
+    close = year.close
+    price = price or float(close[-1])
+
+    high_idx = int(np.nanargmax(year.high)) if not np.isnan(year.high).all() else int(np.argmax(close))
+    low_idx = int(np.nanargmin(year.low)) if not np.isnan(year.low).all() else int(np.argmin(close))
+    volume = np.nan_to_num(series.volume)
+    rsi_values = rsi(series.close)
+    macd_line, macd_signal, macd_hist = macd(series.close)
+    sma50 = rolling_mean(series.close, 50)
+    sma200 = rolling_mean(series.close, 200)
+
+    metrics = {
+        '10DayAverageTradingVolume': _round(volume[-10:].mean(), 2),
+        '3MonthAverageTradingVolume': _round(volume[-63:].mean(), 2),
+        '52WeekHigh': _round(np.nanmax(year.high) if not np.isnan(year.high).all() else close.max(), 4),
+        '52WeekLow': _round(np.nanmin(year.low) if not np.isnan(year.low).all() else close.min(), 4),
+        '52WeekHighDate': int(year.timestamps[high_idx]),
+        '52WeekLowDate': int(year.timestamps[low_idx]),
+        '13WeekPriceReturnDaily': _round(period_return(series.adjclose, 63)),
+        '26WeekPriceReturnDaily': _round(period_return(series.adjclose, 126)),
+        '52WeekPriceReturnDaily': _round(period_return(series.adjclose, TRADING_DAYS_PER_YEAR)),
+        '3MonthADReturnStd': _round(volatility(series.adjclose[-64:]) * 100.0),
+        'volatility52Week': _round(volatility(year.adjclose) * 100.0),
+        'maxDrawdown52Week': _round(max_drawdown(year.adjclose) * 100.0),
+        'dividendYieldIndicatedAnnual': _round(trailing_dividend_yield(series, price)),
+        'rsi14': _round(rsi_values[-1]) if len(rsi_values) else 0.0,
+        'macd': _round(macd_line[-1]),
+        'macdSignal': _round(macd_signal[-1]),
+        'macdHistogram': _round(macd_hist[-1]),
+        'vwap20Day': _round(vwap(series.high, series.low, series.close, series.volume, window=20)),
+        'sma50': _round(sma50[-1]) if len(sma50) else 0.0,
+        'sma200': _round(sma200[-1]) if len(sma200) else 0.0,
+    }
+
+    if index_series is not None and len(index_series):
+        index_year = index_series.tail(TRADING_DAYS_PER_YEAR + 1)
+        metrics['beta'] = _round(beta(
+            year.timestamps, year.adjclose, index_year.timestamps, index_year.adjclose
+        ))
+
+    return metrics
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import httpx
+
+ASYNC_HTTP_MAX_PER_HOST = int(os.environ.get('ASYNC_HTTP_MAX_PER_HOST', '100'))
+ASYNC_HTTP_CONNECT_TIMEOUT = float(os.environ.get('ASYNC_HTTP_CONNECT_TIMEOUT', '3'))
+ASYNC_HTTP_READ_TIMEOUT = float(os.environ.get('ASYNC_HTTP_READ_TIMEOUT', '8'))
+# Largest response body read, after decompression
+ASYNC_HTTP_MAX_BODY = int(os.environ.get('ASYNC_HTTP_MAX_BODY', str(8 * 2 ** 20)))
+# Idle keep-alive connections older than this are closed rather than reused
+ASYNC_HTTP_KEEPALIVE = 30.0
+USER_AGENT = 'asx-stock-analyzer'
+
+
+class AsyncHTTPError(Exception):
+    """
+    A failed request; status_code is 0 when no response arrived
+    `response` carries the status and headers the way requests' errors do,
+    so the governor can read Retry-After from a 429.
+    """
+
+    def __init__(self, status_code, message, headers=None):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers if headers is not None else {})
+
+
+class AsyncHTTPClient:
+    """
+    HTTP client for asyncio (httpx) with a keep-alive pool and a cap per host
+    At most `max_per_host` requests run against one host at a time; the rest
+    wait on the event loop, not on threads. Bodies over `max_body` bytes are
+    refused. Must be used from the event loop it was first used on.
+    """
+
+    def __init__(self, max_per_host=ASYNC_HTTP_MAX_PER_HOST,
+                 connect_timeout=ASYNC_HTTP_CONNECT_TIMEOUT, read_timeout=ASYNC_HTTP_READ_TIMEOUT,
+                 max_body=ASYNC_HTTP_MAX_BODY):
+        self.max_per_host = max_per_host
+        self.max_body = max_body
+        self._client = httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=None,
+                                keepalive_expiry=ASYNC_HTTP_KEEPALIVE)
+        )
+        self._limits = {}
+        self.stats = {'requests': 0}
+
+    async def request(self, method, url, params=None, headers=None):
+        """
+        Send a request and return (status, headers, body bytes)
+        """
+        host = httpx.URL(url).host
+        limit = self._limits.get(host)
+        if limit is None:
+            limit = self._limits[host] = asyncio.Semaphore(self.max_per_host)
+
+        async with limit:
+            self.stats['requests'] += 1
+            try:
+                async with self._client.stream(method, url, params=params, headers=headers) as response:
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                        if len(body) > self.max_body:
+                            raise AsyncHTTPError(
+                                response.status_code, f"Response from {host} is over {self.max_body} bytes",
+                                response.headers
+                            )
+                    return response.status_code, response.headers, bytes(body)
+            except httpx.TimeoutException as e:
+                raise asyncio.TimeoutError(f"Request to {host} timed out: {e}")
+            except httpx.HTTPError as e:
+                raise AsyncHTTPError(0, f"Request to {host} failed: {e}")
+
+    async def get_json(self, url, params=None, headers=None):
+        status, response_headers, body = await self.request('GET', url, params=params, headers=headers)
+        if status >= 400:
+            raise AsyncHTTPError(status, body[:200].decode('utf-8', 'replace'), response_headers)
+        return json.loads(body) if body else None
+
+    async def close(self):
+        await self._client.aclose()
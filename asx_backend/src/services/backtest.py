@@ -0,0 +1,612 @@
+import itertools
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import numpy as np
+
+from src.services.analytics import SECONDS_PER_DAY, TRADING_DAYS_PER_YEAR
+from src.services.metrics import stage_span
+from src.services.tickers import base_ticker, to_asx_ticker
+
+# Where price history comes from: 'demo' generates it, 'yahoo' reads the
+# daily bars the Yahoo chart route has stored (see HISTORY_BACKFILL_RANGE)
+BACKTEST_PROVIDER = os.environ.get('BACKTEST_PROVIDER', 'demo')
+BACKTEST_MAX_TICKERS = int(os.environ.get('BACKTEST_MAX_TICKERS', '500'))
+BACKTEST_MAX_YEARS = int(os.environ.get('BACKTEST_MAX_YEARS', '20'))
+# Worker processes for parameter sweeps; 0 or 1 runs them in the request thread
+BACKTEST_PROCESSES = int(os.environ.get('BACKTEST_PROCESSES', '0'))
+BACKTEST_MAX_SWEEP = int(os.environ.get('BACKTEST_MAX_SWEEP', '64'))
+# Seconds a loaded price panel is reused by later backtests over the same universe
+BACKTEST_PANEL_TTL = float(os.environ.get('BACKTEST_PANEL_TTL', '300'))
+BACKTEST_PANEL_CACHE_ENTRIES = 8
+# Extra bars loaded before the test period so long signals are defined from its start
+WARMUP_BARS = TRADING_DAYS_PER_YEAR + 10
+# Points in the returned equity curves
+EQUITY_POINTS = 260
+
+PROVIDERS = ('demo', 'yahoo')
+REBALANCE_PERIODS = ('daily', 'weekly', 'monthly', 'quarterly')
+
+
+class BacktestRequestError(ValueError):
+    pass
+
+
+class PricePanel:
+    """
+    Daily closes and dividends of many tickers on one calendar of trading days
+    Arrays are (days x tickers). A ticker's closes are NaN before its first
+    bar and carried forward over days it did not trade; dividends are the
+    cash paid per share on each ex-date.
+    """
+
+    def __init__(self, tickers, days, close, dividends):
+        self.tickers = list(tickers)
+        self.days = days
+        self.close = close
+        self.dividends = dividends
+        # Derived arrays shared by every strategy and sweep run on the panel
+        self._returns = None
+        self._log_growth = None
+        self._close_prefix = None
+
+    @classmethod
+    def from_series(cls, series_by_ticker, bars=None):
+        tickers = [ticker for ticker, series in series_by_ticker.items() if len(series)]
+        if not tickers:
+            return cls([], np.empty(0, dtype=np.int64), np.empty((0, 0)), np.empty((0, 0)))
+        day_columns = [series_by_ticker[ticker].timestamps // SECONDS_PER_DAY for ticker in tickers]
+        days = np.unique(np.concatenate(day_columns))
+        if bars is not None:
+            days = days[-bars:]
+
+        close = np.full((len(days), len(tickers)), np.nan)
+        dividends = np.zeros((len(days), len(tickers)))
+        for j, (ticker, series_days) in enumerate(zip(tickers, day_columns)):
+            series = series_by_ticker[ticker]
+            rows = np.searchsorted(days, series_days)
+            inside = (series_days >= days[0]) & (rows < len(days))
+            close[rows[inside], j] = series.close[inside]
+            # An ex-date on a non-trading day counts on the next trading day
+            ex_days = series.dividend_timestamps // SECONDS_PER_DAY
+            ex_rows = np.searchsorted(days, ex_days)
+            paid = (ex_days >= days[0]) & (ex_rows < len(days))
+            np.add.at(dividends[:, j], ex_rows[paid], series.dividend_amounts[paid])
+        return cls(tickers, days, forward_fill(close), dividends)
+
+    def __len__(self):
+        return len(self.days)
+
+    def returns(self):
+        """
+        Daily total returns (price move plus dividends), 0 where not listed
+        """
+        if self._returns is None:
+            returns = np.zeros_like(self.close)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns[1:] = (self.close[1:] + self.dividends[1:]) / self.close[:-1] - 1.0
+            returns[~np.isfinite(returns)] = 0.0
+            self._returns = returns
+        return self._returns
+
+    def log_growth(self):
+        """
+        Cumulative log total return of each ticker
+        """
+        if self._log_growth is None:
+            self._log_growth = np.cumsum(np.log1p(self.returns()), axis=0)
+        return self._log_growth
+
+    def close_prefix(self):
+        if self._close_prefix is None:
+            self._close_prefix = prefix_sums(self.close)
+        return self._close_prefix
+
+    def listed(self):
+        return ~np.isnan(self.close)
+
+
+def forward_fill(values):
+    """
+    Carry the last non-NaN value down each column; leading NaNs stay
+    """
+    valid = ~np.isnan(values)
+    rows = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])[None, :]]
+
+
+def prefix_sums(values):
+    """
+    Running sums of each column and of its non-NaN count, with a leading zero row
+    """
+    sums = np.zeros((len(values) + 1, values.shape[1]))
+    seen = np.zeros((len(values) + 1, values.shape[1]))
+    np.cumsum(np.nan_to_num(values), axis=0, out=sums[1:])
+    np.cumsum(~np.isnan(values), axis=0, out=seen[1:])
+    return sums, seen
+
+
+def rolling_sum(values, window, prefix=None):
+    """
+    Sum over the trailing `window` rows of each column, NaN until `window`
+    non-NaN values have been seen
+    """
+    sums, seen = prefix_sums(values) if prefix is None else prefix
+    out = np.full(values.shape, np.nan)
+    if window <= len(values):
+        window_sums = sums[window:] - sums[:-window]
+        complete = (seen[window:] - seen[:-window]) == window
+        out[window - 1:] = np.where(complete, window_sums, np.nan)
+    return out
+
+
+def _lagged(values, bars):
+    out = np.full(values.shape, np.nan)
+    if bars < len(values):
+        out[bars:] = values[:len(values) - bars]
+    return out
+
+
+def _equal_weights(mask):
+    counts = mask.sum(axis=1, keepdims=True)
+    return np.divide(mask, counts, out=np.zeros(mask.shape), where=counts > 0)
+
+
+def _top(scores, count):
+    """
+    Mask of the `count` highest finite scores on every row
+    """
+    ranked = np.where(np.isfinite(scores), scores, -np.inf)
+    if count <= 0 or count >= scores.shape[1]:
+        return np.isfinite(scores)
+    mask = np.zeros(scores.shape, dtype=bool)
+    best = np.argpartition(-ranked, count - 1, axis=1)[:, :count]
+    np.put_along_axis(mask, best, True, axis=1)
+    return mask & np.isfinite(scores)
+
+
+def sma_crossover(panel, fast=50, slow=200):
+    """
+    Equal weight in every ticker whose fast moving average is above its slow one
+    """
+    if fast >= slow:
+        raise BacktestRequestError('fast must be shorter than slow')
+    with np.errstate(invalid='ignore'):
+        prefix = panel.close_prefix()
+        above = rolling_sum(panel.close, fast, prefix) / fast > rolling_sum(panel.close, slow, prefix) / slow
+    return _equal_weights(above)
+
+
+def momentum(panel, lookback=252, skip=21, top=20):
+    """
+    Equal weight in the `top` tickers by return from `lookback` to `skip` bars ago
+    """
+    if skip >= lookback:
+        raise BacktestRequestError('skip must be shorter than lookback')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = _lagged(panel.close, skip) / _lagged(panel.close, lookback) - 1.0
+    return _equal_weights(_top(scores, top))
+
+
+def dividend_tilt(panel, window=252, top=0):
+    """
+    Weights proportional to trailing dividend yield, optionally only the `top` yielders
+    Tickers without a full window of history or without dividends get none.
+    """
+    paid = rolling_sum(np.where(panel.listed(), panel.dividends, np.nan), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        yields = np.where(paid > 0, paid / panel.close, np.nan)
+    yields = np.where(_top(yields, top), yields, 0.0)
+    totals = yields.sum(axis=1, keepdims=True)
+    return np.divide(yields, totals, out=np.zeros(yields.shape), where=totals > 0)
+
+
+def equal_weight(panel):
+    """
+    Every listed ticker at the same weight
+    """
+    return _equal_weights(panel.listed())
+
+
+# name: (signal function, default parameters)
+STRATEGIES = {
+    'sma_crossover': (sma_crossover, {'fast': 50, 'slow': 200}),
+    'momentum': (momentum, {'lookback': 252, 'skip': 21, 'top': 20}),
+    'dividend_tilt': (dividend_tilt, {'window': 252, 'top': 0}),
+    'equal_weight': (equal_weight, {}),
+}
+
+
+def strategy_params(strategy, params):
+    """
+    The strategy's defaults overridden by `params`, as positive integers
+    """
+    if strategy not in STRATEGIES:
+        raise BacktestRequestError(f"Unknown strategy {strategy}; choose from {', '.join(STRATEGIES)}")
+    defaults = STRATEGIES[strategy][1]
+    unknown = sorted(set(params) - set(defaults))
+    if unknown:
+        raise BacktestRequestError(f"Unknown parameter {unknown[0]} for {strategy}")
+    merged = dict(defaults)
+    for name, value in params.items():
+        try:
+            merged[name] = int(value)
+        except (TypeError, ValueError):
+            raise BacktestRequestError(f"{name} must be an integer")
+        if merged[name] < 0 or (merged[name] == 0 and name != 'top'):
+            raise BacktestRequestError(f"{name} must be positive")
+    return merged
+
+
+def rebalance_rows(days, period):
+    """
+    Rows on which the portfolio is rebalanced: the last trading day of each period
+    """
+    if period not in REBALANCE_PERIODS:
+        raise BacktestRequestError(f"Unknown rebalance period {period}; choose from {', '.join(REBALANCE_PERIODS)}")
+    if period == 'daily':
+        return np.arange(len(days) - 1)
+    if period == 'weekly':
+        # Day 0 (1970-01-01) was a Thursday; weeks start on Monday
+        keys = (days + 3) // 7
+    else:
+        keys = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        if period == 'quarterly':
+            keys = keys // 3
+    return np.flatnonzero(np.diff(keys))
+
+
+def simulate(panel, weights, period='monthly', cost_bps=0.0):
+    """
+    Daily returns of a portfolio rebalanced to `weights` on each rebalance row
+    Weights are set at a rebalance day's close and earn the following days'
+    returns, drifting with prices until the next rebalance; whatever is not
+    invested is held as cash at 0%. Trading costs are cost_bps of turnover.
+    Returns start after the first rebalance that takes a position; None when
+    there is none.
+    """
+    rows = rebalance_rows(panel.days, period)
+    invested = rows[weights[rows].sum(axis=1) > 0]
+    if len(invested) == 0:
+        return None
+    rows = rows[rows >= invested[0]]
+    target = weights[rows]
+
+    # Growth of each ticker since the last rebalance, from cumulative log returns
+    log_growth = panel.log_growth()
+    days = np.arange(rows[0] + 1, len(panel))
+    segment = np.searchsorted(rows, days, side='left') - 1
+    growth = np.exp(log_growth[days] - log_growth[rows[segment]])
+    cash = 1.0 - target.sum(axis=1)
+    value = np.einsum('ij,ij->i', target[segment], growth) + cash[segment]
+
+    # Value per unit held at the previous close; 1 on the day after a rebalance
+    previous = np.concatenate(([1.0], value[:-1]))
+    previous[np.isin(days - 1, rows)] = 1.0
+    daily = value / previous - 1.0
+
+    # Turnover against the weights each holding period drifted to
+    end_growth = np.exp(log_growth[rows[1:]] - log_growth[rows[:-1]])
+    end_value = np.einsum('ij,ij->i', target[:-1], end_growth) + cash[:-1]
+    drifted = target[:-1] * end_growth / end_value[:, None]
+    turnover = np.concatenate((
+        [np.abs(target[0]).sum()],
+        np.abs(target[1:] - drifted).sum(axis=1)
+    ))
+    # Costs come off the first day each new allocation is held
+    first_days = rows - rows[0]
+    charged = first_days < len(days)
+    daily[first_days[charged]] = (1.0 + daily[first_days[charged]]) * (1.0 - turnover[charged] * cost_bps / 10000.0) - 1.0
+    return {
+        'start': int(rows[0]),
+        'days': days,
+        'returns': daily,
+        'turnover': turnover,
+        'rebalances': len(rows),
+        'weights': target[-1]
+    }
+
+
+def performance(returns, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Summary statistics of a series of daily returns
+    """
+    if len(returns) == 0:
+        return None
+    equity = np.cumprod(1.0 + returns)
+    years = len(returns) / periods_per_year
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    peaks = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+    return {
+        'total_return': round(float(equity[-1] - 1.0) * 100, 4),
+        'cagr': round(float(equity[-1] ** (1.0 / years) - 1.0) * 100, 4) if equity[-1] > 0 else -100.0,
+        'volatility': round(float(std * np.sqrt(periods_per_year)) * 100, 4),
+        'sharpe': round(float(returns.mean() / std * np.sqrt(periods_per_year)), 4) if std > 0 else 0.0,
+        'max_drawdown': round(float((equity / peaks - 1.0).min()) * 100, 4),
+        'best_day': round(float(returns.max()) * 100, 4),
+        'worst_day': round(float(returns.min()) * 100, 4),
+        'days': len(returns),
+        'years': round(years, 2)
+    }
+
+
+def _date(day):
+    return str(np.datetime64(int(day), 'D'))
+
+
+def run_backtest(panel, strategy, params=None, period='monthly', cost_bps=0.0, start_row=0):
+    """
+    Backtest one strategy on a panel; None when it never takes a position
+    Statistics cover the days after the first rebalance on or after
+    `start_row` at which the strategy holds anything.
+    """
+    fn, _ = STRATEGIES[strategy]
+    params = strategy_params(strategy, params or {})
+    weights = fn(panel, **params)
+    weights[:start_row] = 0.0
+    result = simulate(panel, weights, period, cost_bps)
+    if result is None:
+        return None
+    result['params'] = params
+    result['stats'] = performance(result['returns'])
+    result['stats']['rebalances'] = result['rebalances']
+    result['stats']['average_turnover'] = round(float(result['turnover'].mean()) * 100, 4)
+    return result
+
+
+def _equity_points(days, *return_series):
+    """
+    Equity curves sampled down to about EQUITY_POINTS points, always keeping the last day
+    """
+    step = max(1, -(-len(days) // EQUITY_POINTS))
+    picks = np.unique(np.append(np.arange(0, len(days), step), len(days) - 1))
+    curves = [np.cumprod(1.0 + r)[picks] for r in return_series]
+    return [
+        dict({'date': _date(days[i])}, **{name: round(float(curve[k]), 6) for name, curve in zip(('strategy', 'benchmark'), curves)})
+        for k, i in enumerate(picks)
+    ]
+
+
+def report(panel, result, benchmark):
+    """
+    JSON-ready summary of a backtest against the equal-weight benchmark
+    """
+    holdings = [
+        {'ticker': panel.tickers[j], 'weight': round(float(result['weights'][j]), 6)}
+        for j in np.argsort(-result['weights']) if result['weights'][j] > 0
+    ]
+    return {
+        'params': result['params'],
+        'start': _date(panel.days[result['start']]),
+        'end': _date(panel.days[-1]),
+        'stats': result['stats'],
+        'benchmark': benchmark['stats'] if benchmark else None,
+        'equity': _equity_points(
+            panel.days[result['days']], result['returns'],
+            *([benchmark['returns']] if benchmark else [])
+        ),
+        'holdings': holdings
+    }
+
+
+def parameter_grid(strategy, sweep):
+    """
+    Every combination of the swept values, each merged over the defaults
+    """
+    names = sorted(sweep)
+    values = []
+    for name in names:
+        options = sweep[name] if isinstance(sweep[name], (list, tuple)) else [sweep[name]]
+        if not options:
+            raise BacktestRequestError(f"sweep {name} has no values")
+        values.append(options)
+    combinations = 1
+    for options in values:
+        combinations *= len(options)
+    if combinations > BACKTEST_MAX_SWEEP:
+        raise BacktestRequestError(f"Sweep has {combinations} combinations; the limit is {BACKTEST_MAX_SWEEP}")
+    return [strategy_params(strategy, dict(zip(names, combo))) for combo in itertools.product(*values)]
+
+
+_sweep_pool = None
+_sweep_pool_lock = threading.Lock()
+
+
+def _reset_sweep_pool():
+    # A pool created before a fork (gunicorn --preload) belongs to the parent
+    global _sweep_pool, _sweep_pool_lock
+    _sweep_pool = None
+    _sweep_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_sweep_pool)
+
+
+def get_sweep_pool(processes=BACKTEST_PROCESSES):
+    """
+    Worker processes shared by every sweep, started on first use
+    Workers are spawned rather than forked: forking a threaded web worker
+    copies its locks in whatever state other threads hold them.
+    """
+    global _sweep_pool
+    with _sweep_pool_lock:
+        if _sweep_pool is None:
+            _sweep_pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _sweep_pool
+
+
+def shutdown_sweep_pool(pool=None):
+    """
+    Stop the sweep workers (only if they are still `pool`, when given)
+    """
+    global _sweep_pool
+    with _sweep_pool_lock:
+        if pool is None:
+            pool = _sweep_pool
+        if pool is None or _sweep_pool is not pool:
+            return
+        _sweep_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _sweep_one(strategy, params, period, cost_bps, start_row, panel):
+    try:
+        result = run_backtest(panel, strategy, params, period, cost_bps, start_row)
+    except BacktestRequestError as e:
+        return {'params': params, 'stats': None, 'error': str(e)}
+    return {'params': params, 'stats': result['stats'] if result else None}
+
+
+def _sweep_chunk(panel, args):
+    return [_sweep_one(*a, panel=panel) for a in args]
+
+
+def sweep(panel, strategy, grid, period='monthly', cost_bps=0.0, start_row=0, processes=BACKTEST_PROCESSES):
+    """
+    Statistics of every parameter set in `grid`, best Sharpe ratio first
+    With processes > 1 the runs are split into one chunk per worker of the
+    shared sweep pool, so the panel is sent once per chunk.
+    """
+    args = [(strategy, params, period, cost_bps, start_row) for params in grid]
+    if processes > 1 and len(grid) > 1:
+        chunks = min(processes, len(grid))
+        pool = get_sweep_pool(processes)
+        try:
+            done = list(pool.map(_sweep_chunk, [panel] * chunks, [args[i::chunks] for i in range(chunks)]))
+        except BrokenProcessPool:
+            # A worker died; the next sweep starts a fresh pool
+            shutdown_sweep_pool(pool)
+            raise
+        results = [None] * len(args)
+        for i, chunk in enumerate(done):
+            results[i::chunks] = chunk
+    else:
+        results = [_sweep_one(*a, panel=panel) for a in args]
+    return sorted(results, key=lambda r: -r['stats']['sharpe'] if r['stats'] else np.inf)
+
+
+def default_universe():
+    from src.services.symbol_search import get_symbol_index
+    return [s['symbol'] for s in get_symbol_index().securities][:BACKTEST_MAX_TICKERS]
+
+
+def load_series(asx_tickers, provider, bars):
+    """
+    {asx_ticker: PriceSeries} of up to `bars` daily bars; tickers without history are left out
+    """
+    if provider == 'demo':
+        from src.services.demo_data import demo_ohlcv
+        return {asx_ticker: demo_ohlcv(base_ticker(asx_ticker), bars) for asx_ticker in asx_tickers}
+
+    from src.services.bar_store import get_bar_store
+    store = get_bar_store()
+    since = int(time.time()) - int(bars * 7 / 5 + 10) * SECONDS_PER_DAY
+    series = {}
+    for asx_ticker in asx_tickers:
+        stored = store.load(asx_ticker, since=since)
+        if len(stored):
+            series[asx_ticker] = stored
+    return series
+
+
+class PanelCache:
+    """
+    Recently loaded panels by (provider, tickers, bars), kept for BACKTEST_PANEL_TTL
+    """
+
+    def __init__(self, ttl=BACKTEST_PANEL_TTL, max_entries=BACKTEST_PANEL_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, provider, asx_tickers, bars):
+        key = (provider, tuple(asx_tickers), bars)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[1]
+        with stage_span('backtest_load'):
+            panel = PricePanel.from_series(load_series(asx_tickers, provider, bars), bars)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), panel)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return panel
+
+
+panel_cache = PanelCache()
+
+
+def backtest(strategy, params=None, tickers=None, years=5, period='monthly', cost_bps=10.0,
+             provider=BACKTEST_PROVIDER, sweep_values=None):
+    """
+    Backtest a strategy over `years` of daily history for a universe of tickers
+    The default universe is every listed security. With sweep_values (e.g.
+    {'fast': [20, 50], 'slow': [100, 200]}) every combination is run and the
+    best by Sharpe ratio is reported in full.
+    """
+    start = time.perf_counter()
+    if provider not in PROVIDERS:
+        raise BacktestRequestError(f"Unknown provider {provider}; choose from {', '.join(PROVIDERS)}")
+    if not 1 <= years <= BACKTEST_MAX_YEARS:
+        raise BacktestRequestError(f"years must be between 1 and {BACKTEST_MAX_YEARS}")
+    if not math.isfinite(cost_bps) or cost_bps < 0:
+        raise BacktestRequestError('cost_bps must be a finite number, not negative')
+    params = strategy_params(strategy, params or {})
+    grid = parameter_grid(strategy, sweep_values) if sweep_values else None
+    if period not in REBALANCE_PERIODS:
+        raise BacktestRequestError(f"Unknown rebalance period {period}; choose from {', '.join(REBALANCE_PERIODS)}")
+
+    asx_tickers = list(dict.fromkeys(to_asx_ticker(t) for t in tickers)) if tickers else default_universe()
+    if len(asx_tickers) > BACKTEST_MAX_TICKERS:
+        raise BacktestRequestError(f"At most {BACKTEST_MAX_TICKERS} tickers per backtest")
+    test_bars = years * TRADING_DAYS_PER_YEAR
+    panel = panel_cache.get(provider, asx_tickers, test_bars + WARMUP_BARS)
+    missing = [t for t in asx_tickers if t not in set(panel.tickers)]
+    if len(panel) < 2:
+        raise BacktestRequestError(f"No price history for these tickers from {provider}")
+    start_row = max(0, len(panel) - test_bars - 1)
+
+    with stage_span('backtest_run'):
+        swept = None
+        if grid:
+            swept = sweep(panel, strategy, grid, period, cost_bps, start_row)
+            if swept[0]['stats']:
+                params = swept[0]['params']
+        result = run_backtest(panel, strategy, params, period, cost_bps, start_row)
+        # Equal weight over the same days as the strategy
+        benchmark = run_backtest(
+            panel, 'equal_weight', {}, period, cost_bps,
+            result['start'] if result is not None else start_row
+        )
+
+    summary = report(panel, result, benchmark) if result is not None else {
+        'params': params, 'stats': None, 'benchmark': benchmark['stats'] if benchmark else None,
+        'equity': [], 'holdings': []
+    }
+    summary.update({
+        'strategy': strategy,
+        'rebalance': period,
+        'cost_bps': cost_bps,
+        'years': years,
+        'universe': len(panel.tickers),
+        'missing': missing,
+        'data_source': provider,
+        'timestamp': datetime.now().isoformat(),
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+    })
+    if swept is not None:
+        summary['sweep'] = swept
+    return summary
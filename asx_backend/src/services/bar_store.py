@@ -0,0 +1,230 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from src.services.analytics import PriceSeries, SECONDS_PER_DAY
+
+DEFAULT_BAR_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'bars.db')
+BAR_STORE_PATH = os.environ.get('BAR_STORE_PATH', DEFAULT_BAR_STORE_PATH)
+
+# Yahoo chart ranges, smallest first, with the number of days each covers
+CHART_RANGES = [
+    ('5d', 5), ('1mo', 31), ('3mo', 92), ('6mo', 183),
+    ('1y', 366), ('2y', 731), ('5y', 1827), ('10y', 3653), ('max', None)
+]
+
+_BAR_COLUMNS = ('ts', 'open', 'high', 'low', 'close', 'adjclose', 'volume')
+
+
+def tail_range(last_timestamp, now=None):
+    """
+    Smallest chart range that reaches back past `last_timestamp`
+    The last stored bar is always re-fetched, since it may have been written
+    while the session was still trading.
+    """
+    now = now or time.time()
+    gap_days = (now - last_timestamp) / SECONDS_PER_DAY + 1
+    for name, days in CHART_RANGES:
+        if days is None or days >= gap_days:
+            return name
+    return 'max'
+
+
+class BarStore:
+    """
+    Local daily OHLCV history per ticker, stored in SQLite
+    Rows are keyed by (symbol, ts) in a WITHOUT ROWID table so a ticker's bars
+    sit together on disk and come back in time order from one range scan.
+    """
+
+    def __init__(self, path=BAR_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS bars ('
+            'symbol TEXT NOT NULL, ts INTEGER NOT NULL, '
+            'open REAL, high REAL, low REAL, close REAL, adjclose REAL, volume REAL, '
+            'PRIMARY KEY (symbol, ts)) WITHOUT ROWID'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS dividends ('
+            'symbol TEXT NOT NULL, ts INTEGER NOT NULL, amount REAL NOT NULL, '
+            'PRIMARY KEY (symbol, ts)) WITHOUT ROWID'
+        )
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def last_timestamp(self, symbol):
+        row = self._connection().execute(
+            'SELECT MAX(ts) FROM bars WHERE symbol = ?', (symbol,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def first_timestamp(self, symbol):
+        row = self._connection().execute(
+            'SELECT MIN(ts) FROM bars WHERE symbol = ?', (symbol,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def rebased(self, symbol, series):
+        """
+        Whether `series` is on a different adjustment basis from the stored bars
+        Yahoo re-bases the adjusted (and, for splits, raw) closes of every bar
+        before an ex-date, so a chart with a dividend the store has not seen,
+        or with other closes for stored days, cannot be merged into the old
+        rows. The last stored day is skipped since it may have been written
+        mid-session.
+        """
+        if len(series) == 0:
+            return False
+        conn = self._connection()
+        first, last = conn.execute(
+            'SELECT MIN(ts), MAX(ts) FROM bars WHERE symbol = ?', (symbol,)
+        ).fetchone()
+        if first is None:
+            return False
+
+        known = {ts for ts, in conn.execute('SELECT ts FROM dividends WHERE symbol = ?', (symbol,))}
+        if any(int(ts) >= first and int(ts) not in known for ts in series.dividend_timestamps):
+            return True
+
+        last_day = last // SECONDS_PER_DAY
+        rows = conn.execute(
+            'SELECT ts, close, adjclose FROM bars WHERE symbol = ? AND ts >= ? AND ts < ? ORDER BY ts',
+            (symbol, int(series.timestamps[0]) - SECONDS_PER_DAY, last_day * SECONDS_PER_DAY)
+        ).fetchall()
+        if not rows:
+            return False
+        stored = np.array(rows, dtype=np.float64)
+        stored_days = stored[:, 0].astype(np.int64) // SECONDS_PER_DAY
+        days = series.timestamps // SECONDS_PER_DAY
+        positions = np.minimum(np.searchsorted(days, stored_days), len(days) - 1)
+        found = days[positions] == stored_days
+        chart = np.column_stack([series.close, series.adjclose])[positions[found]]
+        return not np.allclose(chart, stored[found, 1:], rtol=1e-6, atol=0, equal_nan=True)
+
+    @staticmethod
+    def _rows(items):
+        bar_rows = []
+        dividend_rows = []
+        for symbol, series in items:
+            if len(series) == 0:
+                continue
+            rows = np.column_stack([
+                series.timestamps, series.open, series.high, series.low,
+                series.close, series.adjclose, series.volume
+            ]).tolist()
+            bar_rows.extend((symbol, int(r[0]), *r[1:]) for r in rows)
+            dividend_rows.extend(
+                (symbol, int(ts), float(amount)) for ts, amount
+                in zip(series.dividend_timestamps, series.dividend_amounts)
+            )
+        return bar_rows, dividend_rows
+
+    @staticmethod
+    def _write(conn, bar_rows, dividend_rows):
+        conn.executemany(
+            'INSERT OR REPLACE INTO bars (symbol, ts, open, high, low, close, adjclose, volume) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            bar_rows
+        )
+        if dividend_rows:
+            conn.executemany(
+                'INSERT OR REPLACE INTO dividends (symbol, ts, amount) VALUES (?, ?, ?)',
+                dividend_rows
+            )
+
+    def merge(self, symbol, series):
+        """
+        Upsert the bars (and dividends) of a PriceSeries
+        Callers check rebased() first: merging a re-based chart would leave
+        the older rows on the old adjustment basis.
+        """
+        return self.merge_many([(symbol, series)])
+
+    def merge_many(self, items):
+        """
+        Upsert several (symbol, PriceSeries) pairs in one transaction
+        """
+        bar_rows, dividend_rows = self._rows(items)
+        if not bar_rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            self._write(conn, bar_rows, dividend_rows)
+        return len(bar_rows)
+
+    def replace(self, symbol, series):
+        """
+        Replace a symbol's whole history (after its adjusted closes were re-based)
+        """
+        bar_rows, dividend_rows = self._rows([(symbol, series)])
+        if not bar_rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM bars WHERE symbol = ?', (symbol,))
+            conn.execute('DELETE FROM dividends WHERE symbol = ?', (symbol,))
+            self._write(conn, bar_rows, dividend_rows)
+        return len(bar_rows)
+
+    def last_timestamps(self):
+        """
+        {symbol: timestamp of its last stored bar}
+        """
+        return dict(self._connection().execute('SELECT symbol, MAX(ts) FROM bars GROUP BY symbol'))
+
+    def load(self, symbol, since=None):
+        """
+        Return the stored history for `symbol` as a PriceSeries
+        """
+        conn = self._connection()
+        rows = conn.execute(
+            'SELECT ts, open, high, low, close, adjclose, volume FROM bars '
+            'WHERE symbol = ? AND ts >= ? ORDER BY ts',
+            (symbol, since or 0)
+        ).fetchall()
+        dividends = conn.execute(
+            'SELECT ts, amount FROM dividends WHERE symbol = ? ORDER BY ts', (symbol,)
+        ).fetchall()
+
+        # One conversion to a 2-D float array, then slice out the columns
+        bars = np.array(rows, dtype=np.float64).reshape(-1, len(_BAR_COLUMNS))
+        divs = np.array(dividends, dtype=np.float64).reshape(-1, 2)
+        return PriceSeries(
+            bars[:, 0].astype(np.int64), bars[:, 1], bars[:, 2], bars[:, 3],
+            bars[:, 4], bars[:, 6], bars[:, 5],
+            divs[:, 0].astype(np.int64), divs[:, 1]
+        )
+
+    def symbols(self):
+        return [r[0] for r in self._connection().execute('SELECT DISTINCT symbol FROM bars')]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bar_store():
+    """
+    Return the process-wide bar store, opening it on first use
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BarStore()
+    return _store
@@ -0,0 +1,134 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from flask import Response, jsonify, request
+
+from src.services.prewarm import ticker_heat
+from src.services.rate_limit import upstream_priority, BATCH
+from src.services.tickers import to_asx_ticker, base_ticker
+
+BATCH_MAX_TICKERS = int(os.environ.get('BATCH_MAX_TICKERS', '200'))
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '8'))
+
+# Batch jobs get their own pool: per-ticker analysis may itself fan out onto
+# the upstream executor, and sharing one pool could starve those sub-calls.
+batch_executor = ThreadPoolExecutor(
+    max_workers=BATCH_MAX_WORKERS,
+    thread_name_prefix='batch'
+)
+
+
+class BatchRequestError(ValueError):
+    pass
+
+
+def parse_batch_tickers():
+    """
+    Read the ticker list from a JSON body ({"tickers": [...]}) or ?tickers=CBA,BHP
+    Returns normalized ASX tickers, de-duplicated in request order.
+    """
+    raw = []
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise BatchRequestError('Request body must be a JSON object')
+        raw = data.get('tickers', [])
+        if isinstance(raw, str):
+            raw = raw.split(',')
+        if not isinstance(raw, list):
+            raise BatchRequestError('tickers must be a list or a comma-separated string')
+    else:
+        raw = request.args.get('tickers', '').split(',')
+
+    tickers = []
+    for ticker in raw:
+        if not isinstance(ticker, str) or not ticker.strip():
+            continue
+        asx_ticker = to_asx_ticker(ticker)
+        if asx_ticker not in tickers:
+            tickers.append(asx_ticker)
+
+    if not tickers:
+        raise BatchRequestError('No tickers supplied')
+    if len(tickers) > BATCH_MAX_TICKERS:
+        raise BatchRequestError(f'At most {BATCH_MAX_TICKERS} tickers per batch')
+    return tickers
+
+
+def _analyze_as_batch(analyze, ticker):
+    # Batch work queues behind interactive requests for upstream quota
+    with upstream_priority(BATCH):
+        result = analyze(ticker)
+    ticker_heat.record(ticker)
+    return result
+
+
+def run_batch(asx_tickers, analyze):
+    """
+    Analyze tickers concurrently, yielding (asx_ticker, data, error) as each finishes
+    `analyze` is called with the bare ticker code and returns the response dict.
+    """
+    futures = {
+        batch_executor.submit(_analyze_as_batch, analyze, base_ticker(asx_ticker)): asx_ticker
+        for asx_ticker in asx_tickers
+    }
+    for future in as_completed(futures):
+        asx_ticker = futures[future]
+        try:
+            yield asx_ticker, future.result(), None
+        except Exception as e:
+            yield asx_ticker, None, {
+                'error': f'Failed to analyze stock {base_ticker(asx_ticker)}',
+                'message': str(e),
+                'asx_ticker': asx_ticker
+            }
+
+
+def wants_stream():
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+
+def batch_response(analyze):
+    """
+    Shared handler body for the /analyze/batch routes
+    Returns one combined payload, or NDJSON lines as results finish when the
+    client asks for a stream (?stream=1 or Accept: application/x-ndjson).
+    """
+    try:
+        asx_tickers = parse_batch_tickers()
+    except BatchRequestError as e:
+        return jsonify({
+            'error': 'Invalid batch request',
+            'message': str(e)
+        }), 400
+
+    if wants_stream():
+        def generate():
+            for asx_ticker, data, error in run_batch(asx_tickers, analyze):
+                if error is None:
+                    line = {'asx_ticker': asx_ticker, 'ok': True, 'data': data}
+                else:
+                    line = {'asx_ticker': asx_ticker, 'ok': False, 'error': error}
+                yield json.dumps(line) + '\n'
+
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    results = {}
+    errors = {}
+    for asx_ticker, data, error in run_batch(asx_tickers, analyze):
+        if error is None:
+            results[asx_ticker] = data
+        else:
+            errors[asx_ticker] = error
+
+    return jsonify({
+        'tickers': asx_tickers,
+        'results': results,
+        'errors': errors,
+        'count': len(results),
+        'timestamp': datetime.now().isoformat()
+    })
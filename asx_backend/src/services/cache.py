@@ -0,0 +1,316 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.services.executor import upstream_executor
+from src.services.rate_limit import upstream_priority, BACKGROUND
+
+# Freshness policy per data kind as (fresh_ttl, stale_ttl) in seconds.
+# Within fresh_ttl an entry is served as-is; for a further stale_ttl it is
+# still served, but a background refresh is kicked off (stale-while-revalidate).
+CACHE_POLICIES = {
+    'profile': (24 * 3600, 7 * 24 * 3600),    # company profile barely changes
+    'financials': (6 * 3600, 24 * 3600),      # fundamentals update daily
+    'sentiment': (30 * 60, 6 * 3600),         # news sentiment drifts slowly
+    'chart': (60, 5 * 60),                    # daily bars plus live meta
+    'quote': (10, 50),                        # quotes move every few seconds
+}
+DEFAULT_POLICY = (60, 5 * 60)
+
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '2048'))
+# Optional on-disk tier shared by every worker on the host
+CACHE_DB_PATH = os.environ.get('CACHE_DB_PATH')
+
+
+class MemoryTier:
+    """
+    In-process LRU tier holding (value, stored_at) pairs
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def items(self):
+        """
+        (key, (value, stored_at)) pairs, least recently used first
+        """
+        with self._lock:
+            return list(self._entries.items())
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """
+    On-disk tier shared between processes; values are stored as JSON
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS market_cache ('
+            'key TEXT PRIMARY KEY, kind TEXT NOT NULL, '
+            'stored_at REAL NOT NULL, value TEXT NOT NULL)'
+        )
+        conn.commit()
+
+    def _connection(self):
+        # sqlite3 connections are not shareable across threads, keep one each
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value, stored_at FROM market_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, kind, value, stored_at):
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO market_cache (key, kind, stored_at, value) VALUES (?, ?, ?, ?)',
+            (key, kind, stored_at, json.dumps(value))
+        )
+        conn.commit()
+
+    def delete(self, key):
+        conn = self._connection()
+        conn.execute('DELETE FROM market_cache WHERE key = ?', (key,))
+        conn.commit()
+
+
+class TieredCache:
+    """
+    Read-through cache for upstream market data
+    Lookups go memory -> SQLite -> upstream. Cached values are shared between
+    requests and must be treated as read-only by callers.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, db_path=CACHE_DB_PATH, policies=None):
+        self.memory = MemoryTier(max_entries)
+        self.disk = None
+        if db_path:
+            try:
+                self.disk = SQLiteTier(db_path)
+            except Exception as e:
+                print(f"Error opening cache database {db_path}: {e}")
+        self.policies = policies or CACHE_POLICIES
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def policy(self, kind):
+        return self.policies.get(kind, DEFAULT_POLICY)
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _lookup(self, key):
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self._load(key)
+        return entry
+
+    def _load(self, key):
+        # Promote a disk entry into memory
+        try:
+            entry = self.disk.get(key)
+        except Exception as e:
+            print(f"Error reading cache entry {key}: {e}")
+            return None
+        if entry is not None:
+            self.memory.set(key, entry[0], entry[1])
+        return entry
+
+    def get(self, kind, key):
+        """
+        Return a cached value that is still servable, or None
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        fresh_ttl, stale_ttl = self.policy(kind)
+        if time.time() - entry[1] > fresh_ttl + stale_ttl:
+            return None
+        return entry[0]
+
+    def set(self, kind, key, value, stored_at=None):
+        stored_at = stored_at or time.time()
+        self.memory.set(key, value, stored_at)
+        if self.disk is not None:
+            self._save(kind, key, value, stored_at)
+
+    async def set_async(self, kind, key, value, stored_at=None):
+        """
+        set() for coroutines: the SQLite write runs off the event loop
+        """
+        stored_at = stored_at or time.time()
+        self.memory.set(key, value, stored_at)
+        if self.disk is not None:
+            await asyncio.to_thread(self._save, kind, key, value, stored_at)
+
+    def _save(self, kind, key, value, stored_at):
+        try:
+            self.disk.set(key, kind, value, stored_at)
+        except Exception as e:
+            print(f"Error writing cache entry {key}: {e}")
+
+    def invalidate(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def lookup(self, kind, key):
+        """
+        Return (value, state) for `key`, where state is 'fresh', 'stale' or None on a miss
+        """
+        return self._state(kind, self._lookup(key))
+
+    async def lookup_async(self, kind, key):
+        """
+        lookup() for coroutines: a memory miss reads SQLite off the event loop
+        """
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self._load, key)
+        return self._state(kind, entry)
+
+    def _state(self, kind, entry):
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            fresh_ttl, stale_ttl = self.policy(kind)
+            if age <= fresh_ttl:
+                self._count('hits')
+                return value, 'fresh'
+            if age <= fresh_ttl + stale_ttl:
+                self._count('stale_hits')
+                return value, 'stale'
+        self._count('misses')
+        return None, None
+
+    def get_or_fetch(self, kind, key, fetch):
+        """
+        Serve `key` from cache according to the policy for `kind`
+        Fresh entries are returned directly, stale ones are returned while a
+        background refresh runs, and missing or expired ones are fetched inline.
+        """
+        value, state = self.lookup(kind, key)
+        if state == 'stale':
+            self.refresh_async(kind, key, fetch)
+        if state is not None:
+            return value
+
+        value = fetch()
+        self.set(kind, key, value)
+        return value
+
+    async def get_or_fetch_async(self, kind, key, fetch):
+        """
+        get_or_fetch for coroutine fetches; stale refreshes run as event loop tasks
+        """
+        value, state = await self.lookup_async(kind, key)
+        if state == 'stale' and self._claim_refresh(key):
+            asyncio.get_running_loop().create_task(self._refresh_coroutine(kind, key, fetch))
+        if state is not None:
+            return value
+
+        value = await fetch()
+        await self.set_async(kind, key, value)
+        return value
+
+    def _claim_refresh(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def refresh_async(self, kind, key, fetch):
+        """
+        Re-fetch `key` in the background unless a refresh is already running
+        """
+        if self._claim_refresh(key):
+            upstream_executor.submit(self._refresh, kind, key, fetch)
+
+    async def _refresh_coroutine(self, kind, key, fetch):
+        try:
+            with upstream_priority(BACKGROUND):
+                value = await fetch()
+            await self.set_async(kind, key, value)
+            self._count('refreshes')
+        except Exception as e:
+            self._count('errors')
+            print(f"Error refreshing cache entry {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh(self, kind, key, fetch):
+        try:
+            with upstream_priority(BACKGROUND):
+                value = fetch()
+            self.set(kind, key, value)
+            self._count('refreshes')
+        except Exception as e:
+            self._count('errors')
+            print(f"Error refreshing cache entry {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+def cache_key(source, kind, symbol):
+    return f"{source}:{kind}:{symbol}"
+
+
+def cache_kind(key):
+    """
+    The data kind of a key built by cache_key
+    """
+    parts = key.split(':', 2)
+    return parts[1] if len(parts) > 1 else None
+
+
+# Shared by every data-source route in the process
+market_cache = TieredCache()
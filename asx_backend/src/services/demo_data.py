@@ -0,0 +1,330 @@
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from src.services.analytics import PriceSeries, SECONDS_PER_DAY
+
+# Change to get a different, equally reproducible demo market
+DEMO_SEED = int(os.environ.get('DEMO_SEED', '0'))
+# Quotes step to new values every DEMO_TICK_SECONDS; 0 keeps them fixed for
+# the day so every run (benchmarks, CI) sees identical data
+DEMO_TICK_SECONDS = float(os.environ.get('DEMO_TICK_SECONDS', '60'))
+# Trading days of generated history, about one year
+DEMO_HISTORY_DAYS = 260
+# Tickers whose generated sections are kept until the quote ticks
+DEMO_SNAPSHOT_CACHE_ENTRIES = 4096
+
+STOCK_PROFILES = {
+    'CBA': {
+        'name': 'Commonwealth Bank of Australia',
+        'shortName': 'CWLTH BANK FPO [CBA]',
+        'base_price': 166.17,
+        'sector': 'Banking',
+        'market_cap': 280000000000
+    },
+    'BHP': {
+        'name': 'BHP Group Limited',
+        'shortName': 'BHP GROUP LTD [BHP]',
+        'base_price': 42.85,
+        'sector': 'Mining',
+        'market_cap': 215000000000
+    },
+    'CSL': {
+        'name': 'CSL Limited',
+        'shortName': 'CSL LIMITED [CSL]',
+        'base_price': 285.50,
+        'sector': 'Healthcare',
+        'market_cap': 130000000000
+    },
+    'WBC': {
+        'name': 'Westpac Banking Corporation',
+        'shortName': 'WESTPAC BANK [WBC]',
+        'base_price': 28.45,
+        'sector': 'Banking',
+        'market_cap': 95000000000
+    },
+    'ANZ': {
+        'name': 'Australia and New Zealand Banking Group',
+        'shortName': 'ANZ GROUP HOLD [ANZ]',
+        'base_price': 31.20,
+        'sector': 'Banking',
+        'market_cap': 85000000000
+    }
+}
+
+# Fields drawn once per ticker (fundamentals) and once per tick (the quote)
+_STATIC_DRAWS = 18
+_TICK_DRAWS = 6
+_MARKET_KEY = 0x5A5A200
+_DIVIDEND_KEY = 0xD1D1D00
+# Dividends go ex on the first trading day of each of these calendar windows
+_DIVIDEND_PERIOD_DAYS = 182
+
+# Uniform ranges (low, width) of the fundamentals drawn per ticker, by draw:
+# beta, dividend yield, P/E, P/B, ROAE, ROE, buzz, weekly average buzz,
+# news score, sector news score
+_RATIO_DRAWS = [2, 3, 5, 6, 7, 8, 9, 10, 11, 13]
+_RATIO_LOW = np.array([0.5, 2.0, 12.0, 1.0, 8.0, 10.0, 0.5, 0.8, 0.3, 0.4])
+_RATIO_WIDTH = np.array([1.0, 4.0, 13.0, 2.0, 12.0, 15.0, 1.5, 0.7, 0.5, 0.3])
+# Sector bullish, bearish and bullish percentages
+_PERCENT_DRAWS = [12, 14, 15]
+_PERCENT_LOW = np.array([40.0, 20.0, 40.0])
+_PERCENT_WIDTH = np.array([30.0, 20.0, 30.0])
+
+_U64 = np.uint64
+_MASK_53 = 2.0 ** -53
+
+
+def _mix(x):
+    """
+    splitmix64 finalizer over a uint64 array: a counter-based generator, so
+    any (ticker, field, day) value is drawn directly and identically whether
+    one ticker or ten thousand are generated
+    """
+    with np.errstate(over='ignore'):
+        z = x + _U64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> _U64(30))) * _U64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> _U64(27))) * _U64(0x94D049BB133111EB)
+    return z ^ (z >> _U64(31))
+
+
+def ticker_keys(tickers, seed=DEMO_SEED):
+    codes = np.fromiter((zlib.crc32(t.encode('utf-8')) for t in tickers), dtype=np.uint64, count=len(tickers))
+    return _mix(codes ^ (_U64(seed) << _U64(32)))
+
+
+def uniforms(keys, count):
+    """
+    (len(keys), count) floats in [0, 1), one row per key
+    """
+    with np.errstate(over='ignore'):
+        counters = keys[:, None] + np.arange(1, count + 1, dtype=np.uint64)[None, :] * _U64(0xD1B54A32D192ED03)
+    return (_mix(counters) >> _U64(11)).astype(np.float64) * _MASK_53
+
+
+def normals(keys):
+    """
+    One standard normal per key (Box-Muller)
+    """
+    u = uniforms(keys, 2)
+    return np.sqrt(-2.0 * np.log1p(-u[:, 0])) * np.cos(2.0 * np.pi * u[:, 1])
+
+
+def current_tick(now=None):
+    """
+    (tick number, quote timestamp) for the quote generation in effect
+    """
+    now = time.time() if now is None else now
+    if DEMO_TICK_SECONDS > 0:
+        tick = int(now // DEMO_TICK_SECONDS)
+        return tick, int(tick * DEMO_TICK_SECONDS)
+    return 0, int(now - now % SECONDS_PER_DAY)
+
+
+def profile_for(ticker, u=None):
+    """
+    Static profile of a ticker; unlisted tickers get a generated price and size
+    """
+    profile = STOCK_PROFILES.get(ticker)
+    if profile is not None:
+        return profile
+    if u is None:
+        u = uniforms(ticker_keys([ticker]), _STATIC_DRAWS)[0]
+    return {
+        'name': f'{ticker} Limited',
+        'shortName': f'{ticker} [ASX]',
+        # Log-uniform: most ASX stocks trade at a few dollars, a few in the hundreds
+        'base_price': round(float(np.exp(np.log(0.5) + u[16] * np.log(400))), 2),
+        'sector': 'General',
+        'market_cap': int(np.exp(np.log(5e7) + u[17] * np.log(2000)))
+    }
+
+
+def demo_snapshots(tickers, now=None):
+    """
+    Analysis sections (profile, quote, financials, sentiment) for many tickers
+    Every draw for every ticker is made in a few array operations; the only
+    per-ticker Python work is assembling the result dicts.
+    """
+    tickers = [t.upper() for t in tickers]
+    n = len(tickers)
+    if n == 0:
+        return []
+    tick, quote_time = current_tick(now)
+    keys = ticker_keys(tickers)
+    s = uniforms(keys, _STATIC_DRAWS)
+    q = uniforms(_mix(keys ^ _U64(tick)), _TICK_DRAWS)
+    profiles = [profile_for(ticker, s[i]) for i, ticker in enumerate(tickers)]
+
+    base_price = np.array([p['base_price'] for p in profiles])
+    market_cap = np.array([p['market_cap'] for p in profiles], dtype=np.float64)
+    daily_change_percent = -3.0 + 6.0 * q[:, 0]
+    daily_change = base_price * daily_change_percent / 100
+    current = base_price + daily_change
+
+    # Columns are stacked by rounding so each group is one round and one
+    # tolist() whatever the number of tickers
+    prices = np.round(np.column_stack((
+        current,
+        daily_change,
+        daily_change_percent,
+        current + q[:, 1] * current * 0.02,                # high
+        current - q[:, 2] * current * 0.02,                # low
+        current + (2.0 * q[:, 3] - 1.0) * current * 0.01,  # open
+        base_price,                                        # previous close
+        current * (1.1 + 0.4 * s[:, 0]),                   # 52-week high
+        current * (0.6 + 0.3 * s[:, 1]),                   # 52-week low
+        current / (12 + 13 * s[:, 4]),                     # EPS
+    )), 2).tolist()
+    ratios = np.round(_RATIO_LOW + _RATIO_WIDTH * s[:, _RATIO_DRAWS], 2).tolist()
+    percents = np.round(_PERCENT_LOW + _PERCENT_WIDTH * s[:, _PERCENT_DRAWS], 1).tolist()
+    volume = 1000000 + np.floor(q[:, 4] * 9000001).astype(np.int64)
+    counts = np.column_stack((
+        volume,
+        (market_cap / current).astype(np.int64),           # shares outstanding
+        5 + np.floor(q[:, 5] * 46).astype(np.int64),       # articles last week
+    )).tolist()
+
+    snapshots = []
+    for i, ticker in enumerate(tickers):
+        profile = profiles[i]
+        c, d, dp, h, l, o, pc, high_52w, low_52w, eps = prices[i]
+        beta, dividend_yield, pe, pb, roae, roe, buzz, weekly_average, news_score, sector_news = ratios[i]
+        sector_bullish, bearish, bullish = percents[i]
+        volume, shares, articles = counts[i]
+        snapshots.append({
+            'profile': {
+                'name': profile['name'],
+                'shortName': profile['shortName'],
+                'country': 'AU',
+                'currency': 'AUD',
+                'exchange': 'ASX',
+                'fullExchangeName': 'Australian Securities Exchange',
+                'instrumentType': 'EQUITY',
+                'timezone': 'AEST',
+                'marketCapitalization': profile['market_cap'],
+                'shareOutstanding': shares,
+                'logo': '',
+                'weburl': '',
+                'finnhubIndustry': profile['sector']
+            },
+            'quote': {
+                'c': c,  # current price
+                'd': d,  # change
+                'dp': dp,  # percent change
+                'h': h,  # high
+                'l': l,  # low
+                'o': o,  # open
+                'pc': pc,  # previous close
+                't': quote_time
+            },
+            'financials': {
+                'metric': {
+                    '10DayAverageTradingVolume': volume * 0.8,
+                    '52WeekHigh': high_52w,
+                    '52WeekLow': low_52w,
+                    'beta': beta,
+                    'dividendYieldIndicatedAnnual': dividend_yield,
+                    'epsInclExtraItemsTTM': eps,
+                    'marketCapitalization': profile['market_cap'],
+                    'peInclExtraTTM': pe,
+                    'pbAnnual': pb,
+                    'roaeTTM': roae,
+                    'roeTTM': roe,
+                    'regularMarketVolume': volume
+                }
+            },
+            'sentiment': {
+                'buzz': {
+                    'articlesInLastWeek': articles,
+                    'buzz': buzz,
+                    'weeklyAverage': weekly_average
+                },
+                'companyNewsScore': news_score,
+                'sectorAverageBullishPercent': sector_bullish,
+                'sectorAverageNewsScore': sector_news,
+                'sentiment': {
+                    'bearishPercent': bearish,
+                    'bullishPercent': bullish
+                },
+                'symbol': ticker
+            }
+        })
+    return snapshots
+
+
+_snapshot_cache = OrderedDict()
+_snapshot_lock = threading.Lock()
+
+
+def demo_snapshot(ticker, now=None):
+    """
+    Sections for one ticker, regenerated only when the quote ticks
+    Every value follows from the ticker and the current tick, so between
+    ticks the same sections are returned; treat them as read-only.
+    """
+    ticker = ticker.upper()
+    tick = current_tick(now)
+    with _snapshot_lock:
+        entry = _snapshot_cache.get(ticker)
+        if entry is not None and entry[0] == tick:
+            _snapshot_cache.move_to_end(ticker)
+            return entry[1]
+    snapshot = demo_snapshots([ticker], now)[0]
+    with _snapshot_lock:
+        _snapshot_cache[ticker] = (tick, snapshot)
+        _snapshot_cache.move_to_end(ticker)
+        while len(_snapshot_cache) > DEMO_SNAPSHOT_CACHE_ENTRIES:
+            _snapshot_cache.popitem(last=False)
+    return snapshot
+
+
+def demo_ohlcv(ticker, days=DEMO_HISTORY_DAYS, last_price=None, end=None):
+    """
+    Daily bars for the `days` trading days up to `end` (default today)
+    Each day's move is the market factor shared by all tickers, scaled by the
+    ticker's beta, plus the ticker's own noise. Both are keyed by calendar
+    day, so a day's bar is the same in every series that contains it. The
+    path is scaled to finish at last_price (default: the current quote).
+    Dividends go ex twice a year at half the ticker's dividend yield.
+    """
+    ticker = ticker.upper()
+    end = np.datetime64(end if end is not None else datetime.now().date(), 'D')
+    dates = np.arange(end - (days * 7 // 5 + 10), end + 1, dtype='datetime64[D]')
+    dates = dates[np.is_busday(dates)][-days:]
+    day_numbers = dates.astype(np.int64).astype(np.uint64)
+
+    key = ticker_keys([ticker])[0]
+    s = uniforms(np.array([key]), _STATIC_DRAWS)[0]
+    beta = 0.5 + s[2]
+    market = 0.0003 + 0.009 * normals(_mix(day_numbers ^ _U64(_MARKET_KEY ^ DEMO_SEED)))
+    with np.errstate(over='ignore'):
+        own_keys = _mix(day_numbers * _U64(0x9E3779B97F4A7C15) ^ key)
+    own = uniforms(own_keys, 5)
+    returns = beta * market + 0.012 * normals(own_keys)
+
+    if last_price is None:
+        last_price = demo_snapshot(ticker)['quote']['c']
+    path = np.cumsum(returns)
+    close = last_price * np.exp(path - path[-1])
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + 0.003 * (2 * own[:, 0] - 1))
+    spread = 0.008 * own[:, 1]
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = 1000000 + np.floor(own[:, 2] * 9000000)
+    timestamps = dates.astype('datetime64[s]').astype(np.int64)
+
+    # Same yield as the quote's dividendYieldIndicatedAnnual
+    dividend_yield = (_RATIO_LOW[1] + _RATIO_WIDTH[1] * s[_RATIO_DRAWS[1]]) / 100
+    phase = int(uniforms(np.array([key ^ _U64(_DIVIDEND_KEY)]), 1)[0, 0] * _DIVIDEND_PERIOD_DAYS)
+    windows = (day_numbers.astype(np.int64) + phase) // _DIVIDEND_PERIOD_DAYS
+    ex = np.flatnonzero(np.diff(windows)) + 1
+    return PriceSeries(
+        timestamps, open_, high, low, close, volume,
+        dividend_timestamps=timestamps[ex], dividend_amounts=close[ex] * dividend_yield / 2
+    )
@@ -0,0 +1,53 @@
+import os
+import time
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from src.services.metrics import upstream_timeouts
+
+# Shared, bounded pool for upstream calls. Every route fans out onto this one
+# pool so the number of concurrent upstream requests stays capped per process.
+UPSTREAM_MAX_WORKERS = int(os.environ.get('UPSTREAM_MAX_WORKERS', '16'))
+UPSTREAM_TIMEOUT = float(os.environ.get('UPSTREAM_TIMEOUT', '8'))
+
+upstream_executor = ThreadPoolExecutor(
+    max_workers=UPSTREAM_MAX_WORKERS,
+    thread_name_prefix='upstream'
+)
+
+
+def submit_in_context(executor, fn, *args):
+    """
+    Submit to an executor with the caller's context (e.g. upstream priority)
+    """
+    return executor.submit(copy_context().run, fn, *args)
+
+
+def fan_out(calls, label, timeout=UPSTREAM_TIMEOUT):
+    """
+    Run several upstream calls concurrently on the shared executor
+    calls maps a section name to (fn, default). Each call gets `timeout`
+    seconds from submission; a call that raises or times out falls back to
+    its default so one slow upstream never fails the whole response.
+    """
+    deadline = time.monotonic() + timeout
+    futures = {
+        name: submit_in_context(upstream_executor, fn)
+        for name, (fn, default) in calls.items()
+    }
+
+    results = {}
+    for name, future in futures.items():
+        default = calls[name][1]
+        try:
+            results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            upstream_timeouts.inc(section=name)
+            print(f"Timed out fetching {name} for {label} after {timeout}s")
+            results[name] = default
+        except Exception as e:
+            print(f"Error fetching {name} for {label}: {e}")
+            results[name] = default
+
+    return results
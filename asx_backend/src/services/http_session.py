@@ -0,0 +1,83 @@
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.services.executor import UPSTREAM_MAX_WORKERS
+
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '3.05'))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', '8'))
+# Retries of idempotent requests after connection errors and 5xx responses.
+# 429s are left to the rate-limit governor, which slows the whole bucket.
+HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', '2'))
+HTTP_BACKOFF_FACTOR = 0.3
+HTTP_BACKOFF_JITTER = 0.3
+RETRY_STATUSES = (500, 502, 503, 504)
+# Distinct hosts kept in the pool and keep-alive connections per host; one
+# per upstream worker so concurrent calls never queue for a connection
+HTTP_POOL_HOSTS = 10
+HTTP_POOL_PER_HOST = int(os.environ.get('HTTP_POOL_PER_HOST', str(UPSTREAM_MAX_WORKERS)))
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+class UpstreamAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with pooled keep-alive connections, retries and a default timeout
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=HTTP_RETRIES, **kwargs):
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            # A read timeout already spent most of the caller's deadline
+            read=min(1, retries),
+            status=retries,
+            allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+            status_forcelist=RETRY_STATUSES,
+            backoff_factor=HTTP_BACKOFF_FACTOR,
+            backoff_jitter=HTTP_BACKOFF_JITTER,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        super().__init__(
+            pool_connections=HTTP_POOL_HOSTS,
+            pool_maxsize=HTTP_POOL_PER_HOST,
+            max_retries=retry,
+            **kwargs
+        )
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout or self.timeout, **kwargs)
+
+
+def mount_upstream_adapters(session, timeout=DEFAULT_TIMEOUT):
+    """
+    Route a session's http(s) traffic through pooled, retrying adapters
+    Headers, params and auth already set on the session are kept.
+    """
+    adapter = UpstreamAdapter(timeout=timeout)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # requests already asks for gzip/deflate and decodes it; keep it explicit
+    session.headers.setdefault('Accept-Encoding', 'gzip, deflate')
+    return session
+
+
+def use_pooled_session(client, timeout=DEFAULT_TIMEOUT):
+    """
+    Put a third-party API client's requests session on pooled adapters
+    Works for clients that keep a requests.Session as `session` or
+    `_session` (finnhub.Client does); returns False for anything else.
+    """
+    for attr in ('_session', 'session'):
+        session = getattr(client, attr, None)
+        if isinstance(session, requests.Session):
+            mount_upstream_adapters(session, timeout)
+            # finnhub.Client passes its own per-call timeout
+            if hasattr(client, 'DEFAULT_TIMEOUT'):
+                client.DEFAULT_TIMEOUT = timeout
+            return True
+    return False
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+from src.services.metrics import stage_span
+
+# orjson is optional: several times faster than the standard library encoder
+# for the nested analyze payloads, and it understands NumPy scalars/arrays
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+        # Dates and dataclasses go through Flask's default so both encoders agree
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+def _default(obj):
+    # NumPy values the way orjson's OPT_SERIALIZE_NUMPY writes them
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+
+# Standard library fallback; one shared encoder skips per-call setup. Text
+# is written as UTF-8 rather than \u escapes, as orjson does, so both give
+# the same bytes (and ETags) except for floats in exponent form and NaN.
+_encoder = json.JSONEncoder(default=_default, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+PROFILE_BLOCK_MAX_ENTRIES = 4096
+# Stands in for the profile while the rest of a payload is encoded
+PROFILE_PLACEHOLDER = '\x00profile'
+
+
+def dumps_bytes(obj):
+    """
+    Compact, key-sorted JSON as UTF-8 bytes (the shape jsonify produces)
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=ORJSON_OPTIONS)
+    return _encoder.encode(obj).encode('utf-8')
+
+
+def loads_bytes(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed
+    Serialization time is recorded as the json_serialize stage.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with stage_span('json_serialize'):
+            if orjson is None or kwargs:
+                return super().dumps(obj, **kwargs)
+            return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Indented output for debugging
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        with stage_span('json_serialize'):
+            body = dumps_bytes(obj) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class ProfileBlocks:
+    """
+    Pre-encoded profile sections per ticker
+    A profile rarely changes between requests, so its encoded bytes are kept
+    and reused for as long as the section is equal to the one encoded.
+    """
+
+    def __init__(self, max_entries=PROFILE_BLOCK_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def encode(self, asx_ticker, profile):
+        with self._lock:
+            entry = self._blocks.get(asx_ticker)
+            if entry is not None and entry[0] == profile:
+                self._blocks.move_to_end(asx_ticker)
+                self.stats['hits'] += 1
+                return entry[1]
+        encoded = dumps_bytes(profile)
+        with self._lock:
+            # Keep a copy: callers may go on to mutate their dict
+            self._blocks[asx_ticker] = (dict(profile), encoded)
+            self._blocks.move_to_end(asx_ticker)
+            while len(self._blocks) > self.max_entries:
+                self._blocks.popitem(last=False)
+            self.stats['misses'] += 1
+        return encoded
+
+
+profile_blocks = ProfileBlocks()
+
+
+def _encode_spliced(payload):
+    profile = payload.get('profile')
+    if not isinstance(profile, dict) or not payload.get('asx_ticker'):
+        return dumps_bytes(payload)
+    body = dumps_bytes(dict(payload, profile=PROFILE_PLACEHOLDER))
+    block = profile_blocks.encode(payload['asx_ticker'], profile)
+    return body.replace(dumps_bytes(PROFILE_PLACEHOLDER), block, 1)
+
+
+def encode_analysis(payload):
+    """
+    Encode an analyze payload; returns (body bytes, etag)
+    The output is identical to jsonify. The ETag covers everything but the
+    generation timestamp, so an unchanged analysis keeps its ETag across
+    rebuilds and clients can revalidate with If-None-Match.
+    """
+    with stage_span('json_serialize'):
+        if orjson is not None:
+            # orjson encodes a profile about as fast as it can be compared
+            # against the pre-encoded one, so splicing would not pay
+            body = dumps_bytes(payload)
+        else:
+            body = _encode_spliced(payload)
+    tagged = body
+    if payload.get('timestamp') is not None:
+        tagged = body.replace(b'"timestamp":' + dumps_bytes(payload['timestamp']), b'', 1)
+    etag = hashlib.blake2b(tagged, digest_size=12).hexdigest()
+    return body + b'\n', etag
@@ -0,0 +1,93 @@
+import importlib
+import threading
+import time
+
+from flask import Flask
+
+
+class BlueprintGroup:
+    """
+    Blueprints loaded together, the URL prefixes they serve and an optional
+    setup(app) run once they are registered (e.g. database init)
+    Targets are 'module:attribute' strings so nothing is imported up front.
+    """
+
+    def __init__(self, name, prefixes, blueprints, setup=None, url_prefix='/api'):
+        self.name = name
+        self.prefixes = tuple(prefixes)
+        self.blueprints = list(blueprints)
+        self.setup = setup
+        self.url_prefix = url_prefix
+
+    def matches(self, path):
+        return any(path == prefix or path.startswith(prefix + '/') for prefix in self.prefixes)
+
+
+def load_blueprint(target):
+    module, _, attribute = target.partition(':')
+    return getattr(importlib.import_module(module), attribute)
+
+
+def register_group(app, group):
+    for target in group.blueprints:
+        app.register_blueprint(load_blueprint(target), url_prefix=group.url_prefix)
+    if group.setup is not None:
+        group.setup(app)
+
+
+class LazyBlueprints:
+    """
+    WSGI middleware that registers blueprint groups on first request
+    Flask does not allow blueprints to be added to an app once it has served
+    a request, so each group gets its own small Flask app, configured like
+    the main one by `configure(app)` and built the first time one of its
+    URLs is requested. A group's modules, and everything they import
+    (SQLAlchemy for users, NumPy for the screener), stay unloaded until
+    then. Paths no group claims go to the wrapped app.
+    """
+
+    def __init__(self, app, groups, configure):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.groups = list(groups)
+        self.configure = configure
+        self.apps = {}
+        self.load_seconds = {}
+        self._lock = threading.Lock()
+
+    def group_for(self, path):
+        for group in self.groups:
+            if group.matches(path):
+                return group
+        return None
+
+    def app_for(self, group):
+        app = self.apps.get(group.name)
+        if app is None:
+            with self._lock:
+                app = self.apps.get(group.name)
+                if app is None:
+                    app = self.build(group)
+                    self.apps[group.name] = app
+        return app
+
+    def build(self, group):
+        start = time.perf_counter()
+        app = Flask(self.app.import_name, static_folder=None)
+        app.config.update(self.app.config)
+        self.configure(app)
+        register_group(app, group)
+        self.load_seconds[group.name] = time.perf_counter() - start
+        return app
+
+    def load_all(self):
+        """
+        Build every group now (warm instances, tests, url_map inspection)
+        """
+        return [self.app_for(group) for group in self.groups]
+
+    def __call__(self, environ, start_response):
+        group = self.group_for(environ.get('PATH_INFO', ''))
+        if group is None:
+            return self.wsgi_app(environ, start_response)
+        return self.app_for(group).wsgi_app(environ, start_response)
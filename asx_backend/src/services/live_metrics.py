@@ -0,0 +1,630 @@
+import itertools
+import math
+import os
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from src.services.analytics import (
+    PriceSeries, SECONDS_PER_DAY, TRADING_DAYS_PER_YEAR, beta, ema, max_drawdown
+)
+
+# Keep derived metrics up to date bar by bar instead of recomputing them from
+# the whole stored history on every request
+LIVE_METRICS = os.environ.get('LIVE_METRICS', '1') == '1'
+LIVE_METRICS_MAX_TICKERS = int(os.environ.get('LIVE_METRICS_MAX_TICKERS', '1024'))
+
+# Events a metric can depend on
+BAR = 'bar'
+PRICE = 'price'
+DIVIDEND = 'dividend'
+INDEX = 'index'
+
+DIVIDEND_DAYS = 365
+RSI_PERIOD = 14
+
+# Bar versions are unique across states, so a rebuilt index state is never
+# taken for the one it replaced
+_bar_versions = itertools.count(1)
+
+
+def _round(value, digits=4):
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else 0.0
+
+
+class AdjustedEma:
+    """
+    Bias-adjusted exponential moving average updated one value at a time
+    Matches analytics.ema (pandas adjust=True): a decayed sum of values over
+    a decayed count of them. replace() revises the latest value.
+    """
+
+    def __init__(self, alpha):
+        self.decay = 1.0 - alpha
+        self.numerator = self.denominator = 0.0
+        self._previous = (0.0, 0.0)
+
+    def seed(self, values):
+        """
+        Start from a whole history in one vectorized pass
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        if len(values) > 1:
+            self.push_all(values[:-1])
+        self.push(float(values[-1]))
+
+    def push_all(self, values):
+        weights = self.decay ** np.arange(len(values) - 1, -1, -1)
+        scale = self.decay ** len(values)
+        self.numerator = self.numerator * scale + float(values @ weights)
+        self.denominator = self.denominator * scale + float(weights.sum())
+
+    def push(self, value):
+        self._previous = (self.numerator, self.denominator)
+        self.numerator = value + self.decay * self.numerator
+        self.denominator = 1.0 + self.decay * self.denominator
+
+    def replace(self, value):
+        numerator, denominator = self._previous
+        self.numerator = value + self.decay * numerator
+        self.denominator = 1.0 + self.decay * denominator
+
+    @property
+    def value(self):
+        return self.numerator / self.denominator if self.denominator else 0.0
+
+
+class WilderAverage:
+    """
+    Wilder's moving average updated one value at a time
+    Matches analytics.wilder: a plain mean of the first `period` values,
+    then each value moves it 1 / period of the way. replace() revises the
+    latest value.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.decay = 1.0 - 1.0 / period
+        self.count = 0
+        self.value = 0.0
+        self._previous = (0, 0.0)
+
+    def seed(self, values):
+        """
+        Start from a whole history in one vectorized pass
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.push_all(values[:-1])
+        self.push(float(values[-1]))
+
+    def push_all(self, values):
+        filling = min(max(self.period - self.count, 0), len(values))
+        for value in values[:filling].tolist():
+            self._add(value)
+        rest = values[filling:]
+        if len(rest):
+            weights = self.decay ** np.arange(len(rest) - 1, -1, -1)
+            self.value = self.value * self.decay ** len(rest) + float(rest @ weights) / self.period
+            self.count += len(rest)
+
+    def _add(self, value):
+        self.count += 1
+        if self.count <= self.period:
+            self.value += (value - self.value) / self.count
+        else:
+            self.value = self.decay * self.value + value / self.period
+
+    def push(self, value):
+        self._previous = (self.count, self.value)
+        self._add(value)
+
+    def replace(self, value):
+        self.count, self.value = self._previous
+        self._add(value)
+
+
+class RollingWindow:
+    """
+    The last `window` values with their running sum and sum of squares
+    Sums are rebuilt from the buffer once per `window` pushes so rounding
+    error cannot build up.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = self.squares = 0.0
+        self._pushes = 0
+
+    def push(self, value):
+        if len(self.values) == self.window:
+            dropped = self.values[0]
+            self.total -= dropped
+            self.squares -= dropped * dropped
+        self.values.append(value)
+        self.total += value
+        self.squares += value * value
+        self._pushes += 1
+        if self._pushes >= self.window:
+            self._resum()
+
+    def replace(self, value):
+        dropped = self.values[-1]
+        self.values[-1] = value
+        self.total += value - dropped
+        self.squares += value * value - dropped * dropped
+
+    def _resum(self):
+        self._pushes = 0
+        self.total = math.fsum(self.values)
+        self.squares = math.fsum(v * v for v in self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def mean(self):
+        return self.total / len(self.values) if self.values else 0.0
+
+    def std(self):
+        """
+        Sample standard deviation (ddof=1)
+        """
+        n = len(self.values)
+        if n < 2:
+            return 0.0
+        return math.sqrt(max(self.squares - self.total * self.total / n, 0.0) / (n - 1))
+
+
+class RollingExtreme:
+    """
+    Highest (or lowest) of the last `window` values and its position
+    A monotonic deque of earlier values plus the latest one, which stays
+    outside the deque so it can be replaced. Ties keep the earliest value,
+    like np.argmax. NaN values are skipped.
+    """
+
+    def __init__(self, window, largest=True):
+        self.window = window
+        self.sign = 1.0 if largest else -1.0
+        self.earlier = deque()
+        self.last = None
+        self.count = 0
+
+    def push(self, value):
+        if self.last is not None:
+            last = self.last[1]
+            if not math.isnan(last):
+                key = self.sign * last
+                while self.earlier and self.sign * self.earlier[-1][1] < key:
+                    self.earlier.pop()
+                self.earlier.append(self.last)
+        self.last = (self.count, value)
+        self.count += 1
+        while self.earlier and self.earlier[0][0] <= self.count - 1 - self.window:
+            self.earlier.popleft()
+
+    def replace(self, value):
+        self.last = (self.last[0], value)
+
+    def best(self):
+        """
+        (position, value) of the extreme, or None when every value is NaN
+        """
+        candidate = self.earlier[0] if self.earlier else None
+        if self.last is not None and not math.isnan(self.last[1]):
+            if candidate is None or self.sign * self.last[1] > self.sign * candidate[1]:
+                candidate = self.last
+        return candidate
+
+
+class BarRing:
+    """
+    The last `maxlen` bars as rows of one float64 array
+    Rows are (ts, open, high, low, close, adjclose, volume); indexing is
+    from the end only, bars[-1] being the latest.
+    """
+
+    def __init__(self, maxlen):
+        self.maxlen = maxlen
+        self.rows = np.empty((maxlen, 7))
+        self.end = 0
+
+    def __len__(self):
+        return min(self.end, self.maxlen)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < 0:
+            raise IndexError('bar index out of range')
+        return tuple(self.rows[(self.end + i) % self.maxlen].tolist())
+
+    def __setitem__(self, i, bar):
+        self.rows[(self.end + i) % self.maxlen] = bar
+
+    def append(self, bar):
+        self.rows[self.end % self.maxlen] = bar
+        self.end += 1
+
+    def tail(self, bars):
+        """
+        The last `bars` rows in order, as a new array
+        """
+        bars = min(bars, len(self))
+        return self.rows[np.arange(self.end - bars, self.end) % self.maxlen]
+
+
+class IndexYear:
+    """
+    Copy of an index state's last year of adjusted closes, taken under its
+    lock, for the beta of other tickers
+    """
+
+    def __init__(self, version, timestamps, adjclose):
+        self.version = version
+        self.timestamps = timestamps
+        self.adjclose = adjclose
+
+
+def _same_bar(bar, kept):
+    return all(a == b or (a != a and b != b) for a, b in zip(bar, kept))
+
+
+class TickerMetrics:
+    """
+    Derived history metrics of one ticker, updated as bars, prices and
+    dividends arrive
+    Accumulators take each event in O(1); a metric is only recomputed when
+    an event it depends on (METRICS) has happened since it was last read.
+    The values match analytics.compute_metrics over the same bars.
+    """
+
+    def __init__(self):
+        # Held by callers around update() and metrics(); other states read
+        # this one only through an IndexYear copy
+        self.lock = threading.Lock()
+        # (ts, open, high, low, close, adjclose, volume) of the last year and a day
+        self.bars = BarRing(TRADING_DAYS_PER_YEAR + 1)
+        self.count = 0
+        self.volume_10 = RollingWindow(10)
+        self.volume_63 = RollingWindow(63)
+        self.sma_50 = RollingWindow(50)
+        self.sma_200 = RollingWindow(200)
+        self.returns_63 = RollingWindow(63)
+        self.returns_year = RollingWindow(TRADING_DAYS_PER_YEAR - 1)
+        self.vwap_volume = RollingWindow(20)
+        self.vwap_value = RollingWindow(20)
+        self.highs = RollingExtreme(TRADING_DAYS_PER_YEAR)
+        self.lows = RollingExtreme(TRADING_DAYS_PER_YEAR, largest=False)
+        self.close_highs = RollingExtreme(TRADING_DAYS_PER_YEAR)
+        self.close_lows = RollingExtreme(TRADING_DAYS_PER_YEAR, largest=False)
+        self.ema_fast = AdjustedEma(2.0 / 13.0)
+        self.ema_slow = AdjustedEma(2.0 / 27.0)
+        self.macd_signal = AdjustedEma(2.0 / 10.0)
+        self.gains = WilderAverage(RSI_PERIOD)
+        self.losses = WilderAverage(RSI_PERIOD)
+        self.dividends = {}
+        self.price = None
+        self.index = None
+        self._index_version = None
+        self.bar_version = 0
+        self.values = {}
+        self.dirty = set(METRICS)
+
+    @classmethod
+    def from_series(cls, series):
+        state = cls()
+        state.seed(series)
+        return state
+
+    @property
+    def last_timestamp(self):
+        return int(self.bars[-1][0]) if self.bars else None
+
+    def seed(self, series):
+        """
+        Start from a whole history: the exponential averages in one
+        vectorized pass each, the windows from the last year of bars
+        """
+        n = len(series)
+        if n == 0:
+            return
+        # All but the last bar go into the averages at once; the last one is
+        # pushed like any later bar so that it can be replaced
+        close = series.close[:-1]
+        self.ema_fast.seed(close)
+        self.ema_slow.seed(close)
+        self.macd_signal.seed(ema(close, 12) - ema(close, 26))
+        deltas = np.diff(close)
+        self.gains.seed(np.clip(deltas, 0, None))
+        self.losses.seed(np.clip(-deltas, 0, None))
+
+        self.count = max(0, n - self.bars.maxlen)
+        for i in range(self.count, n):
+            self.push_bar(
+                series.timestamps[i], series.open[i], series.high[i], series.low[i],
+                series.close[i], series.adjclose[i], series.volume[i], averages=i == n - 1
+            )
+        for ts, amount in zip(series.dividend_timestamps, series.dividend_amounts):
+            self.add_dividend(ts, amount)
+
+    def _mark(self, event):
+        self.dirty.update(DEPENDENTS[event])
+
+    def push_bar(self, ts, open_, high, low, close, adjclose, volume, averages=True):
+        """
+        Add a bar; a bar on the same trading day as the last one replaces it
+        Replacing the last bar with an identical one changes nothing.
+        """
+        bar = (int(ts), float(open_), float(high), float(low), float(close), float(adjclose), float(volume))
+        replace = bool(self.bars) and bar[0] // SECONDS_PER_DAY == int(self.bars[-1][0]) // SECONDS_PER_DAY
+        if replace and _same_bar(bar, self.bars[-1]):
+            return
+        if replace:
+            previous = self.bars[-2] if len(self.bars) > 1 else None
+            self.bars[-1] = bar
+            update = 'replace'
+        else:
+            previous = self.bars[-1] if self.bars else None
+            self.bars.append(bar)
+            self.count += 1
+            update = 'push'
+
+        volume = 0.0 if math.isnan(bar[6]) else bar[6]
+        typical = (bar[2] + bar[3] + bar[4]) / 3.0
+        if math.isnan(typical):
+            typical = bar[4]
+        for accumulator, value in (
+            (self.volume_10, volume), (self.volume_63, volume),
+            (self.sma_50, bar[4]), (self.sma_200, bar[4]),
+            (self.vwap_volume, volume), (self.vwap_value, typical * volume),
+            (self.highs, bar[2]), (self.lows, bar[3]),
+            (self.close_highs, bar[4]), (self.close_lows, bar[4]),
+        ):
+            getattr(accumulator, update)(value)
+        if previous is not None:
+            log_return = math.log(bar[5] / previous[5]) if previous[5] > 0 and bar[5] > 0 else float('nan')
+            getattr(self.returns_63, update)(log_return)
+            getattr(self.returns_year, update)(log_return)
+
+        if averages:
+            getattr(self.ema_fast, update)(bar[4])
+            getattr(self.ema_slow, update)(bar[4])
+            getattr(self.macd_signal, update)(self.ema_fast.value - self.ema_slow.value)
+            if previous is not None:
+                delta = bar[4] - previous[4]
+                getattr(self.gains, update)(max(delta, 0.0))
+                getattr(self.losses, update)(max(-delta, 0.0))
+        self.bar_version = next(_bar_versions)
+        self._mark(BAR)
+
+    def add_dividend(self, ts, amount):
+        ts, amount = int(ts), float(amount)
+        if self.dividends.get(ts) != amount:
+            self.dividends[ts] = amount
+            self._mark(DIVIDEND)
+
+    def set_price(self, price):
+        if price != self.price:
+            self.price = price
+            self._mark(PRICE)
+
+    def set_index(self, index):
+        version = index.version if index is not None else None
+        if version != self._index_version:
+            self.index = index
+            self._index_version = version
+            self._mark(INDEX)
+
+    def update(self, series):
+        """
+        Apply the bars and dividends of a chart from the last stored bar on
+        Returns False when the state needs rebuilding from the full history:
+        the chart starts after the state's last bar, so bars in between may
+        be missing, or it revises earlier bars (adjusted closes after a
+        dividend or split).
+        """
+        if len(series) == 0:
+            return True
+        rows = range(len(series))
+        if self.bars:
+            last_day = self.last_timestamp // SECONDS_PER_DAY
+            days = series.timestamps // SECONDS_PER_DAY
+            if days[0] > last_day or self._revised(series, days, last_day):
+                return False
+            rows = np.flatnonzero(days >= last_day)
+        for i in rows:
+            self.push_bar(
+                series.timestamps[i], series.open[i], series.high[i], series.low[i],
+                series.close[i], series.adjclose[i], series.volume[i]
+            )
+        for ts, amount in zip(series.dividend_timestamps, series.dividend_amounts):
+            self.add_dividend(ts, amount)
+        return True
+
+    def _revised(self, series, days, last_day):
+        """
+        Whether the chart's bars before the latest one differ from those kept,
+        or it carries a dividend not seen before (which re-bases them)
+        """
+        first = series.timestamps[0]
+        if any(ts >= first and ts not in self.dividends for ts in series.dividend_timestamps):
+            return True
+        earlier = np.flatnonzero(days < last_day)
+        if len(earlier) == 0:
+            return False
+        kept = self.bars.tail(len(self.bars))
+        kept_days = kept[:, 0].astype(np.int64) // SECONDS_PER_DAY
+        positions = np.searchsorted(kept_days, days[earlier])
+        found = positions < len(kept)
+        positions, earlier = positions[found], earlier[found]
+        found = kept_days[positions] == days[earlier]
+        positions, earlier = positions[found], earlier[found]
+        chart = np.column_stack([
+            series.open, series.high, series.low, series.close, series.adjclose, series.volume
+        ])[earlier]
+        return not np.allclose(chart, kept[positions, 1:], rtol=1e-9, atol=0, equal_nan=True)
+
+    def recent(self, bars=2):
+        """
+        The last few bars as a PriceSeries
+        """
+        rows = self.bars.tail(bars)
+        return PriceSeries(rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3], rows[:, 4], rows[:, 6], rows[:, 5])
+
+    def year(self, bars=TRADING_DAYS_PER_YEAR):
+        """
+        (timestamps, adjclose) of the last `bars` bars
+        """
+        rows = self.bars.tail(bars)
+        return rows[:, 0].astype(np.int64), rows[:, 5]
+
+    def index_year(self):
+        """
+        IndexYear of this state, for other states' metrics(index=...)
+        Call with the lock held.
+        """
+        return IndexYear(self.bar_version, *self.year(TRADING_DAYS_PER_YEAR + 1))
+
+    def metrics(self, price=None, index=None):
+        """
+        The compute_metrics fields, recomputing only those whose inputs
+        changed since the last read; `index` is an IndexYear
+        """
+        if not self.bars:
+            return {}
+        self.set_price(price or self.bars[-1][4])
+        self.set_index(index)
+        for name in self.dirty:
+            value = METRICS[name][1](self)
+            if value is None:
+                self.values.pop(name, None)
+            else:
+                self.values[name] = value
+        self.dirty.clear()
+        return dict(self.values)
+
+    def extreme(self, extreme, fallback):
+        """
+        (bar, value) of the year's high or low, by close when no bar has one
+        """
+        best = extreme.best()
+        if best is None:
+            extreme = fallback
+            best = extreme.best()
+        position, value = best
+        return self.bars[position - extreme.count], value
+
+    def period_return(self, bars):
+        """
+        analytics.period_return over the adjusted closes
+        """
+        if self.count - 1 >= bars * 0.95:
+            bars = min(bars, self.count - 1)
+        if self.count <= bars:
+            return 0.0
+        start = self.bars[-bars - 1][5]
+        return (self.bars[-1][5] / start - 1.0) * 100.0 if start != 0 else 0.0
+
+    def rsi(self):
+        if self.count - 1 < RSI_PERIOD:
+            return 0.0
+        losses = self.losses.value
+        if losses == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.gains.value / losses)
+
+    def dividend_yield(self):
+        cutoff = self.last_timestamp - DIVIDEND_DAYS * SECONDS_PER_DAY
+        for ts in [ts for ts in self.dividends if ts < cutoff]:
+            del self.dividends[ts]
+        if not self.dividends or not self.price:
+            return 0.0
+        return math.fsum(self.dividends.values()) / self.price * 100.0
+
+    def beta(self):
+        if self.index is None or not len(self.index.timestamps):
+            return None
+        timestamps, adjclose = self.year()
+        return _round(beta(timestamps, adjclose, self.index.timestamps, self.index.adjclose))
+
+    def vwap(self):
+        total = self.vwap_volume.total
+        return self.vwap_value.total / total if total > 0 else 0.0
+
+    def macd(self):
+        return self.ema_fast.value - self.ema_slow.value
+
+
+def _annualised(window):
+    return window.std() * math.sqrt(TRADING_DAYS_PER_YEAR) * 100.0
+
+
+# name: (events it depends on, value from a TickerMetrics)
+METRICS = {
+    '10DayAverageTradingVolume': ((BAR,), lambda s: _round(s.volume_10.mean(), 2)),
+    '3MonthAverageTradingVolume': ((BAR,), lambda s: _round(s.volume_63.mean(), 2)),
+    '52WeekHigh': ((BAR,), lambda s: _round(s.extreme(s.highs, s.close_highs)[1])),
+    '52WeekLow': ((BAR,), lambda s: _round(s.extreme(s.lows, s.close_lows)[1])),
+    '52WeekHighDate': ((BAR,), lambda s: int(s.extreme(s.highs, s.close_highs)[0][0])),
+    '52WeekLowDate': ((BAR,), lambda s: int(s.extreme(s.lows, s.close_lows)[0][0])),
+    '13WeekPriceReturnDaily': ((BAR,), lambda s: _round(s.period_return(63))),
+    '26WeekPriceReturnDaily': ((BAR,), lambda s: _round(s.period_return(126))),
+    '52WeekPriceReturnDaily': ((BAR,), lambda s: _round(s.period_return(TRADING_DAYS_PER_YEAR))),
+    '3MonthADReturnStd': ((BAR,), lambda s: _round(_annualised(s.returns_63))),
+    'volatility52Week': ((BAR,), lambda s: _round(_annualised(s.returns_year))),
+    # Bounded by the year of bars kept, however long the history
+    'maxDrawdown52Week': ((BAR,), lambda s: _round(max_drawdown(s.year()[1]) * 100.0)),
+    'dividendYieldIndicatedAnnual': ((BAR, PRICE, DIVIDEND), lambda s: _round(s.dividend_yield())),
+    'rsi14': ((BAR,), lambda s: _round(s.rsi())),
+    'macd': ((BAR,), lambda s: _round(s.macd())),
+    'macdSignal': ((BAR,), lambda s: _round(s.macd_signal.value)),
+    'macdHistogram': ((BAR,), lambda s: _round(s.macd() - s.macd_signal.value)),
+    'vwap20Day': ((BAR,), lambda s: _round(s.vwap())),
+    'sma50': ((BAR,), lambda s: _round(s.sma_50.mean()) if s.count >= 50 else 0.0),
+    'sma200': ((BAR,), lambda s: _round(s.sma_200.mean()) if s.count >= 200 else 0.0),
+    'beta': ((BAR, INDEX), lambda s: s.beta()),
+}
+
+DEPENDENTS = {
+    event: {name for name, (events, _) in METRICS.items() if event in events}
+    for event in (BAR, PRICE, DIVIDEND, INDEX)
+}
+
+
+class MetricStates:
+    """
+    TickerMetrics per symbol, least recently used dropped past max_entries
+    """
+
+    def __init__(self, max_entries=LIVE_METRICS_MAX_TICKERS):
+        self.max_entries = max_entries
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, symbol):
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is not None:
+                self._states.move_to_end(symbol)
+            return state
+
+    def build(self, symbol, series):
+        state = TickerMetrics.from_series(series)
+        with self._lock:
+            self._states[symbol] = state
+            self._states.move_to_end(symbol)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+        return state
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+metric_states = MetricStates()
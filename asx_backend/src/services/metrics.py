@@ -0,0 +1,335 @@
+import bisect
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import g, request
+
+# Latency buckets in seconds, from cache hits up to upstream timeouts
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Share of requests run under cProfile (0 disables profiling); a profile is
+# only kept when the request took longer than METRICS_SLOW_REQUEST seconds
+PROFILE_SAMPLE_RATE = float(os.environ.get('METRICS_PROFILE_SAMPLE', '0'))
+SLOW_REQUEST_SECONDS = float(os.environ.get('METRICS_SLOW_REQUEST', '1.0'))
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'profiles')
+PROFILE_DIR = os.environ.get('METRICS_PROFILE_DIR', DEFAULT_PROFILE_DIR)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_items(items))
+        return lines
+
+    def _render_items(self, items):
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}' for key, value in items]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram in the Prometheus exposition format
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket (non-cumulative) counts + the +Inf bucket, then sum
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _render_items(self, items):
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}')
+            labels = _format_labels(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+request_latency = Histogram(
+    'asx_http_request_duration_seconds', 'Time spent handling HTTP requests', ('method', 'route', 'status')
+)
+request_errors = Counter(
+    'asx_http_request_errors_total', 'HTTP requests answered with a 5xx status', ('method', 'route')
+)
+requests_in_flight = Gauge('asx_http_requests_in_flight', 'HTTP requests currently being handled')
+upstream_latency = Histogram(
+    'asx_upstream_request_duration_seconds', 'Time spent in upstream market data calls', ('source', 'endpoint')
+)
+upstream_errors = Counter(
+    'asx_upstream_errors_total', 'Upstream market data calls that raised', ('source', 'endpoint')
+)
+upstream_timeouts = Counter(
+    'asx_upstream_timeouts_total', 'Fanned-out upstream calls abandoned at the deadline', ('section',)
+)
+rate_limit_wait = Histogram(
+    'asx_rate_limit_wait_seconds', 'Time upstream calls waited for quota',
+    ('provider', 'endpoint_class', 'priority')
+)
+rate_limit_events = Counter(
+    'asx_rate_limit_events_total', 'Upstream calls throttled with a 429 or rejected for lack of quota',
+    ('provider', 'endpoint_class', 'event')
+)
+stage_latency = Histogram(
+    'asx_stage_duration_seconds', 'Time spent in in-process stages such as response shaping', ('stage',)
+)
+profiles_written = Counter('asx_slow_request_profiles_total', 'cProfile dumps written for slow requests', ('route',))
+
+METRICS = [
+    request_latency, request_errors, requests_in_flight,
+    upstream_latency, upstream_errors, upstream_timeouts,
+    rate_limit_wait, rate_limit_events, stage_latency, profiles_written
+]
+
+
+@contextmanager
+def upstream_span(source, endpoint):
+    """
+    Time one upstream call; exceptions are counted and re-raised
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        upstream_errors.inc(source=source, endpoint=endpoint)
+        raise
+    finally:
+        upstream_latency.observe(time.perf_counter() - start, source=source, endpoint=endpoint)
+
+
+@contextmanager
+def stage_span(stage):
+    """
+    Time an in-process stage of request handling
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency.observe(time.perf_counter() - start, stage=stage)
+
+
+# cProfile can only run one profiler per process at a time
+_profile_lock = threading.Lock()
+
+
+def _route_label():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    requests_in_flight.inc()
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE and _profile_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            _profile_lock.release()
+        else:
+            g.metrics_profiler = profiler
+
+
+def _after_request(response):
+    start = g.get('metrics_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    route = _route_label()
+    request_latency.observe(elapsed, method=request.method, route=route, status=response.status_code)
+    if response.status_code >= 500:
+        request_errors.inc(method=request.method, route=route)
+    _finish_profile(route, elapsed)
+    return response
+
+
+def _teardown_request(error):
+    if g.pop('metrics_start', None) is None:
+        return
+    requests_in_flight.dec()
+    # Only left over if after_request never ran
+    _finish_profile(_route_label(), None)
+
+
+def _finish_profile(route, elapsed):
+    profiler = g.pop('metrics_profiler', None)
+    if profiler is None:
+        return
+    profiler.disable()
+    _profile_lock.release()
+    if elapsed is None or elapsed < SLOW_REQUEST_SECONDS:
+        return
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        slug = route.strip('/').replace('/', '_').replace('<', '').replace('>', '') or 'root'
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f'{stamp}-{slug}-{int(elapsed * 1000)}ms.prof'))
+        profiles_written.inc(route=route)
+    except Exception as e:
+        print(f"Error writing request profile for {route}: {e}")
+
+
+def init_metrics(app):
+    """
+    Record request latency, errors and in-flight requests for every route
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+
+def _collected_metrics():
+    """
+    Metrics read from the cache, single-flight and provider stats at scrape time
+    """
+    from src.providers.registry import loaded_provider_registry
+    from src.services.cache import market_cache
+    from src.services.prewarm import get_prewarm_scheduler
+    from src.services.rate_limit import upstream_governor
+    from src.services.response_cache import response_cache
+    from src.services.singleflight import upstream_flight
+
+    cache_events = Counter('asx_cache_events_total', 'Market data cache lookups and refreshes', ('event',))
+    for event, count in dict(market_cache.stats).items():
+        cache_events.inc(count, event=event)
+    stats = market_cache.stats
+    lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+    cache_ratio = Gauge('asx_cache_hit_ratio', 'Share of cache lookups served from cache (fresh or stale)')
+    cache_ratio.set((stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0)
+    cache_entries = Gauge('asx_cache_entries', 'Entries held in the in-memory cache tier')
+    cache_entries.set(len(market_cache.memory))
+
+    flights = Counter('asx_singleflight_calls_total', 'Upstream fetches run (leader) or joined (shared)', ('role',))
+    flights.inc(upstream_flight.stats['leaders'], role='leader')
+    flights.inc(upstream_flight.stats['shared'], role='shared')
+    flights_in_flight = Gauge('asx_singleflight_in_flight', 'Distinct upstream fetches in flight')
+    flights_in_flight.set(upstream_flight.in_flight())
+
+    quota_tokens = Gauge('asx_rate_limit_tokens', 'Upstream calls available now', ('bucket',))
+    quota_rate = Gauge('asx_rate_limit_rate_per_minute', 'Current refill rate (lowered after 429s)', ('bucket',))
+    quota_waiting = Gauge('asx_rate_limit_waiting', 'Upstream calls queued for quota', ('bucket',))
+    for bucket, snapshot in upstream_governor.snapshot().items():
+        quota_tokens.set(snapshot['tokens'], bucket=bucket)
+        quota_rate.set(snapshot['rate_per_minute'], bucket=bucket)
+        quota_waiting.set(snapshot['waiting'], bucket=bucket)
+
+    responses = Counter('asx_response_cache_total', 'Encoded analyze responses served or rebuilt', ('event',))
+    for event, count in dict(response_cache.stats).items():
+        responses.inc(count, event=event)
+
+    collected = [
+        cache_events, cache_ratio, cache_entries, flights, flights_in_flight,
+        quota_tokens, quota_rate, quota_waiting, responses
+    ]
+
+    scheduler = get_prewarm_scheduler()
+    if scheduler is not None:
+        prewarm_passes = Counter('asx_prewarm_passes_total', 'Completed pre-warming passes')
+        prewarm_passes.inc(scheduler.stats['passes'])
+        prewarm_tickers = Counter('asx_prewarm_tickers_total', 'Tickers pre-warmed, by outcome', ('outcome',))
+        prewarm_tickers.inc(scheduler.stats['warmed'], outcome='ok')
+        prewarm_tickers.inc(scheduler.stats['errors'], outcome='error')
+        collected += [prewarm_passes, prewarm_tickers]
+
+    # Only report providers once something has loaded them
+    registry = loaded_provider_registry()
+    if registry is not None:
+        provider_calls = Gauge('asx_provider_recent_calls', 'Calls in the rolling provider window', ('provider',))
+        provider_errors = Gauge('asx_provider_error_rate', 'Error rate over the rolling provider window', ('provider',))
+        provider_p95 = Gauge('asx_provider_p95_seconds', 'p95 latency over the rolling provider window', ('provider',))
+        for name, snapshot in registry.snapshot().items():
+            provider_calls.set(snapshot['calls'], provider=name)
+            provider_errors.set(snapshot['error_rate'], provider=name)
+            if snapshot['p95'] is not None:
+                provider_p95.set(snapshot['p95'], provider=name)
+        collected += [provider_calls, provider_errors, provider_p95]
+
+    return collected
+
+
+def render_prometheus():
+    """
+    Every metric in the Prometheus text exposition format (version 0.0.4)
+    """
+    lines = []
+    for metric in METRICS + _collected_metrics():
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,220 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+
+import numpy as np
+
+from src.providers.registry import get_provider_registry
+from src.services.analytics import align_closes, portfolio_risk, TRADING_DAYS_PER_YEAR
+from src.services.batch import batch_executor, BATCH_MAX_WORKERS
+from src.services.executor import submit_in_context, UPSTREAM_TIMEOUT
+from src.services.metrics import stage_span, upstream_timeouts
+from src.services.tickers import base_ticker
+
+PORTFOLIO_PROVIDER = os.environ.get('PORTFOLIO_PROVIDER', 'demo')
+PORTFOLIO_MAX_HOLDINGS = int(os.environ.get('PORTFOLIO_MAX_HOLDINGS', '100'))
+# One year of daily returns for volatility and correlation
+PORTFOLIO_HISTORY_BARS = TRADING_DAYS_PER_YEAR + 1
+VALUATION_CACHE_MAX_ENTRIES = 1024
+
+
+def gather(fn, asx_tickers, label, timeout=UPSTREAM_TIMEOUT):
+    """
+    Call fn(asx_ticker) for every ticker concurrently; returns (results, errors)
+    Runs on the batch pool because provider calls fan out further onto the
+    upstream pool. The caller's upstream priority carries over. Calls queue
+    for the pool's BATCH_MAX_WORKERS threads, so the deadline allows
+    `timeout` for each round of that many calls.
+    """
+    timeout *= max(1, math.ceil(len(asx_tickers) / BATCH_MAX_WORKERS))
+    deadline = time.monotonic() + timeout
+    futures = {asx_ticker: submit_in_context(batch_executor, fn, asx_ticker) for asx_ticker in asx_tickers}
+    results = {}
+    errors = {}
+    for asx_ticker, future in futures.items():
+        try:
+            results[asx_ticker] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            upstream_timeouts.inc(section=label)
+            errors[asx_ticker] = f'Timed out fetching {label} after {timeout}s'
+        except Exception as e:
+            print(f"Error fetching {label} for {asx_ticker}: {e}")
+            errors[asx_ticker] = str(e)
+    return results, errors
+
+
+class ValuationCache:
+    """
+    Last valuation per portfolio, reused while holdings and prices are unchanged
+    """
+
+    def __init__(self, max_entries=VALUATION_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, portfolio_id, signature):
+        with self._lock:
+            entry = self._entries.get(portfolio_id)
+            if entry is None or entry[0] != signature:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(portfolio_id)
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def set(self, portfolio_id, signature, valuation):
+        with self._lock:
+            self._entries[portfolio_id] = (signature, valuation)
+            self._entries.move_to_end(portfolio_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, portfolio_id):
+        with self._lock:
+            self._entries.pop(portfolio_id, None)
+
+
+valuation_cache = ValuationCache()
+
+
+def _number(value, digits=4):
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def value_portfolio(portfolio, provider=PORTFOLIO_PROVIDER):
+    """
+    Value every holding at the latest quote and measure portfolio risk
+    Quotes are fetched in one concurrent round; the result is cached until a
+    quote or a holding changes, so polling clients mostly skip the history
+    and matrix work.
+    """
+    holdings = portfolio.holdings
+    asx_tickers = [holding.ticker for holding in holdings]
+    registry = get_provider_registry()
+
+    quotes, errors = gather(lambda asx_ticker: registry.quote(asx_ticker, provider), asx_tickers, 'quote')
+    priced = [holding for holding in holdings if quotes.get(holding.ticker, {}).get('c')]
+
+    signature = (
+        tuple((h.ticker, h.quantity, h.cost_basis) for h in holdings),
+        tuple((h.ticker, quotes[h.ticker]['c']) for h in priced)
+    )
+    cached = valuation_cache.get(portfolio.id, signature)
+    if cached is not None:
+        return cached
+
+    with stage_span('portfolio_valuation'):
+        quantity = np.array([h.quantity for h in priced], dtype=np.float64)
+        cost_basis = np.array([h.cost_basis for h in priced], dtype=np.float64)
+        price = np.array([quotes[h.ticker]['c'] for h in priced], dtype=np.float64)
+        change = np.array([quotes[h.ticker].get('d') or 0.0 for h in priced], dtype=np.float64)
+
+        market_value = quantity * price
+        cost_value = quantity * cost_basis
+        pnl = market_value - cost_value
+        day_pnl = quantity * change
+        total_value = market_value.sum()
+        total_cost = cost_value.sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pnl_percent = np.where(cost_value > 0, pnl / cost_value * 100.0, np.nan)
+        # A watchlist (no quantities) is measured as an equal-weight basket
+        if total_value > 0:
+            weights = market_value / total_value
+        else:
+            weights = np.full(len(priced), 1.0 / len(priced)) if priced else np.empty(0)
+
+    histories, history_errors = gather(
+        lambda asx_ticker: registry.history(asx_ticker, provider),
+        [h.ticker for h in priced], 'history'
+    )
+    with stage_span('portfolio_risk'):
+        risk = _risk_section(priced, weights, histories)
+
+    rows = []
+    for i, holding in enumerate(priced):
+        quote = quotes[holding.ticker]
+        rows.append({
+            'ticker': base_ticker(holding.ticker),
+            'asx_ticker': holding.ticker,
+            'quantity': holding.quantity,
+            'cost_basis': holding.cost_basis,
+            'price': quote['c'],
+            'change': quote.get('d'),
+            'change_percent': quote.get('dp'),
+            'market_value': _number(market_value[i], 2),
+            'cost_value': _number(cost_value[i], 2),
+            'pnl': _number(pnl[i], 2),
+            'pnl_percent': _number(pnl_percent[i]),
+            'day_pnl': _number(day_pnl[i], 2),
+            'weight': _number(weights[i]),
+            'volatility': risk['asset_volatility'].get(holding.ticker) if risk is not None else None
+        })
+
+    day_start_value = total_value - day_pnl.sum()
+    if risk is not None:
+        risk = {key: value for key, value in risk.items() if key != 'asset_volatility'}
+    valuation = {
+        'portfolio': {
+            'id': portfolio.id,
+            'user_id': portfolio.user_id,
+            'name': portfolio.name,
+            'kind': portfolio.kind
+        },
+        'holdings': rows,
+        'totals': {
+            'market_value': _number(total_value, 2),
+            'cost_value': _number(total_cost, 2),
+            'pnl': _number(total_value - total_cost, 2),
+            'pnl_percent': _number((total_value - total_cost) / total_cost * 100.0) if total_cost > 0 else None,
+            'day_pnl': _number(day_pnl.sum(), 2),
+            'day_pnl_percent': _number(day_pnl.sum() / day_start_value * 100.0) if day_start_value > 0 else None
+        },
+        'risk': risk,
+        'errors': {
+            base_ticker(asx_ticker): message
+            for asx_ticker, message in {**errors, **history_errors}.items()
+        },
+        'timestamp': datetime.now().isoformat()
+    }
+    valuation_cache.set(portfolio.id, signature, valuation)
+    return valuation
+
+
+def _risk_section(priced, weights, histories):
+    """
+    Volatility and correlation over the price history all holdings share
+    Holdings without history are left out and the weights renormalised.
+    """
+    index = [i for i, holding in enumerate(priced) if histories.get(holding.ticker) is not None and len(histories[holding.ticker])]
+    if not index:
+        return None
+    tickers = [priced[i].ticker for i in index]
+    days, closes = align_closes([histories[ticker] for ticker in tickers], PORTFOLIO_HISTORY_BARS)
+    risk_weights = weights[index]
+    if risk_weights.sum() <= 0:
+        return None
+    metrics = portfolio_risk(closes, risk_weights / risk_weights.sum())
+    if metrics is None:
+        return None
+
+    return {
+        'volatility': _number(metrics['volatility']),
+        'asset_volatility': {
+            ticker: _number(value) for ticker, value in zip(tickers, metrics['asset_volatility'])
+        },
+        'correlation': {
+            'tickers': [base_ticker(ticker) for ticker in tickers],
+            'matrix': np.round(metrics['correlation'], 4).tolist()
+        },
+        'observations': metrics['observations'],
+        'start': str(np.datetime64(int(days[0]), 'D')),
+        'end': str(np.datetime64(int(days[-1]), 'D'))
+    }
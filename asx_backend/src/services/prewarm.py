@@ -0,0 +1,196 @@
+import heapq
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone, time as dt_time
+
+from src.services.rate_limit import upstream_priority, BACKGROUND
+from src.services.tickers import to_asx_ticker
+
+try:
+    from zoneinfo import ZoneInfo
+    ASX_TIMEZONE = ZoneInfo('Australia/Sydney')
+except Exception:
+    # No tz database: AEST without daylight saving is close enough to schedule by
+    ASX_TIMEZONE = timezone(timedelta(hours=10), 'AEST')
+
+PREWARM_ENABLED = os.environ.get('PREWARM_ENABLED', '0') == '1'
+PREWARM_PROVIDER = os.environ.get('PREWARM_PROVIDER', 'demo')
+PREWARM_TOP_N = int(os.environ.get('PREWARM_TOP_N', '20'))
+# Seconds between passes while the market is open. Below the quote cache's
+# fresh + stale window, so hot tickers are always served from cache.
+PREWARM_INTERVAL = float(os.environ.get('PREWARM_INTERVAL', '45'))
+# Request counts halve over this many seconds
+PREWARM_HALF_LIFE = float(os.environ.get('PREWARM_HALF_LIFE', '3600'))
+# Most tickers whose request counts are kept; the coldest are dropped past it
+PREWARM_MAX_TRACKED = int(os.environ.get('PREWARM_MAX_TRACKED', '2048'))
+
+# ASX normal trading (open auction at 10:00, closing auction done by 16:12),
+# with a warm-up window before the open. Public holidays are not modelled.
+PRE_OPEN = dt_time(9, 45)
+MARKET_OPEN = dt_time(10, 0)
+MARKET_CLOSE = dt_time(16, 15)
+# Longest sleep while closed, so daylight-saving changes are picked up
+MAX_IDLE_SLEEP = 900
+
+# Large caps warmed before any requests have been seen
+SEED_TICKERS = [
+    'CBA', 'BHP', 'CSL', 'WBC', 'ANZ', 'NAB', 'WOW', 'COL', 'TLS', 'RIO',
+    'FMG', 'MQG', 'TCL', 'WES', 'STO', 'WDS', 'GMG', 'ALL', 'QBE', 'REA'
+]
+SEED_WEIGHT = 0.5
+
+
+def market_phase(now=None):
+    """
+    'pre_open', 'open' or 'closed' for an aware datetime (default: now)
+    """
+    local = (now or datetime.now(timezone.utc)).astimezone(ASX_TIMEZONE)
+    if local.weekday() >= 5:
+        return 'closed'
+    clock = local.time()
+    if MARKET_OPEN <= clock < MARKET_CLOSE:
+        return 'open'
+    if PRE_OPEN <= clock < MARKET_OPEN:
+        return 'pre_open'
+    return 'closed'
+
+
+def seconds_until_pre_open(now=None):
+    """
+    Seconds from `now` until the next weekday's pre-open window starts
+    """
+    local = (now or datetime.now(timezone.utc)).astimezone(ASX_TIMEZONE)
+    day = local.date()
+    while True:
+        start = datetime.combine(day, PRE_OPEN, tzinfo=ASX_TIMEZONE)
+        if start.weekday() < 5 and start > local:
+            return (start - local).total_seconds()
+        day += timedelta(days=1)
+
+
+class TickerHeat:
+    """
+    Exponentially decayed request count per ticker
+    Each request adds 1 and scores halve every `half_life` seconds, so the
+    ranking follows what users are asking for now rather than all time.
+    At most `max_tracked` tickers are kept; past that the lowest scores go.
+    """
+
+    def __init__(self, half_life=PREWARM_HALF_LIFE, seeds=SEED_TICKERS, max_tracked=PREWARM_MAX_TRACKED):
+        self.decay = math.log(2) / half_life
+        self.max_tracked = max_tracked
+        # Scores are stored relative to a fixed epoch to avoid touching
+        # every entry on each update
+        self.epoch = time.monotonic()
+        self._scores = {}
+        self._lock = threading.Lock()
+        for ticker in seeds:
+            self._scores[to_asx_ticker(ticker)] = SEED_WEIGHT
+
+    def record(self, ticker, weight=1.0):
+        asx_ticker = to_asx_ticker(ticker)
+        boost = weight * math.exp(self.decay * (time.monotonic() - self.epoch))
+        with self._lock:
+            self._scores[asx_ticker] = self._scores.get(asx_ticker, 0.0) + boost
+            if boost > 1e100:
+                self._rebase()
+            if len(self._scores) > self.max_tracked:
+                self._prune()
+
+    def _rebase(self):
+        shift = math.exp(-self.decay * (time.monotonic() - self.epoch))
+        self._scores = {t: s * shift for t, s in self._scores.items() if s * shift > 1e-6}
+        self.epoch = time.monotonic()
+
+    def _prune(self):
+        # Down to 90% of the cap, so pruning runs once per many new tickers
+        keep = heapq.nlargest(max(1, int(self.max_tracked * 0.9)), self._scores.items(), key=lambda item: item[1])
+        self._scores = dict(keep)
+
+    def hottest(self, n):
+        """
+        The n most requested tickers with their current decayed scores
+        """
+        scale = math.exp(-self.decay * (time.monotonic() - self.epoch))
+        with self._lock:
+            ranked = sorted(self._scores.items(), key=lambda item: -item[1])[:n]
+        return [(asx_ticker, score * scale) for asx_ticker, score in ranked]
+
+
+class PrewarmScheduler:
+    """
+    Keeps the hottest tickers' quote and chart data warm while the ASX trades
+    Each pass re-analyzes the top N tickers at background priority; anything
+    past its fresh TTL is refreshed, so user requests land on warm entries.
+    Nothing runs overnight or on weekends.
+    """
+
+    def __init__(self, warm, heat, top_n=PREWARM_TOP_N, interval=PREWARM_INTERVAL):
+        self.warm = warm
+        self.heat = heat
+        self.top_n = top_n
+        self.interval = interval
+        self.stats = {'passes': 0, 'warmed': 0, 'errors': 0, 'last_pass': None}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='prewarm', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_pass(self):
+        with upstream_priority(BACKGROUND):
+            for asx_ticker, _ in self.heat.hottest(self.top_n):
+                if self._stop.is_set():
+                    break
+                try:
+                    self.warm(asx_ticker)
+                    self.stats['warmed'] += 1
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"Error prewarming {asx_ticker}: {e}")
+        self.stats['passes'] += 1
+        self.stats['last_pass'] = datetime.now().isoformat()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if market_phase() == 'closed':
+                self._stop.wait(min(MAX_IDLE_SLEEP, seconds_until_pre_open()))
+                continue
+            started = time.monotonic()
+            self.run_pass()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+# Request frequency is tracked whether or not the scheduler runs
+ticker_heat = TickerHeat()
+_scheduler = None
+
+
+def start_prewarm():
+    """
+    Start the process-wide scheduler when PREWARM_ENABLED=1
+    """
+    global _scheduler
+    if not PREWARM_ENABLED or _scheduler is not None:
+        return _scheduler
+    from src.providers.registry import get_provider_registry
+    _scheduler = PrewarmScheduler(
+        lambda asx_ticker: get_provider_registry().analyze(asx_ticker, primary=PREWARM_PROVIDER),
+        ticker_heat
+    )
+    _scheduler.start()
+    return _scheduler
+
+
+def get_prewarm_scheduler():
+    """
+    The running scheduler, or None when pre-warming is off or not started
+    """
+    return _scheduler
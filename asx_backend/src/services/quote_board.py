@@ -0,0 +1,411 @@
+"""
+Shared-memory quote board
+
+    python -m src.services.quote_board      # the fetcher, next to the web workers
+
+One fetcher process owns a fixed-layout table of the latest quote per
+ticker in shared memory and keeps the tickers people ask for current.
+Every web worker started with the same QUOTE_BOARD name maps the table and
+reads quotes from it instead of calling upstream, so upstream load and
+memory stay the same however many workers run.
+"""
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from src.providers.base import ProviderError
+
+# Name of the shared memory block; workers only read quotes from the board
+# when it is set
+QUOTE_BOARD_NAME = os.environ.get('QUOTE_BOARD')
+QUOTE_BOARD_PROVIDER = os.environ.get('QUOTE_BOARD_PROVIDER', 'demo')
+QUOTE_BOARD_CAPACITY = int(os.environ.get('QUOTE_BOARD_CAPACITY', '4096'))
+# Seconds between refreshes of a quote someone is reading
+QUOTE_BOARD_INTERVAL = float(os.environ.get('QUOTE_BOARD_INTERVAL', '5'))
+# Tickers nobody has read for this many seconds stop being refreshed
+QUOTE_BOARD_ACTIVE = float(os.environ.get('QUOTE_BOARD_ACTIVE', '600'))
+# How long a read of a ticker not yet on the board waits for the fetcher
+QUOTE_BOARD_WAIT = float(os.environ.get('QUOTE_BOARD_WAIT', '2'))
+QUOTE_BOARD_WORKERS = 16
+# A quote older than this many refresh intervals is not served: the reader
+# waits for the fetcher to refresh it instead
+QUOTE_MAX_AGE_INTERVALS = 2
+
+BOARD_MAGIC = b'ASXQUOTE'
+BOARD_VERSION = 1
+QUOTE_FIELDS = ('c', 'd', 'dp', 'h', 'l', 'o', 'pc')
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('capacity', '<u4'),
+    ('rows', '<u4'),
+    # Bumped whenever rows are added, so readers know to re-read the symbols
+    ('layout', '<u4'),
+    ('fetcher_pid', '<i8'),
+    ('heartbeat', '<f8'),
+    ('interval', '<f8'),
+    ('padding', 'V16'),
+])
+# One row per ticker; `seq` is odd while the fetcher is writing the row
+ROW_DTYPE = np.dtype(
+    [('seq', '<u8'), ('symbol', 'S16')]
+    + [(field, '<f8') for field in QUOTE_FIELDS]
+    + [('t', '<i8'), ('updated', '<f8')]
+)
+READ_RETRIES = 100
+
+
+def board_size(capacity):
+    # Header, the quote rows, then one "last read" time per row written by readers
+    return HEADER_DTYPE.itemsize + capacity * ROW_DTYPE.itemsize + capacity * 8
+
+
+class QuoteBoard:
+    """
+    Fixed-layout table of ticker -> latest quote over a shared memory block
+    The fetcher is the only writer of the rows; a reader copies one row per
+    quote and retries if the row's sequence number shows a write in
+    progress. Readers record when they last asked for each row in a
+    separate `demand` column, which is how the fetcher learns what to poll.
+    """
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        if self.header['magic'].item() != BOARD_MAGIC or int(self.header['version']) != BOARD_VERSION:
+            raise ValueError(f"{shm.name} is not a version {BOARD_VERSION} quote board")
+        capacity = int(self.header['capacity'])
+        self.capacity = capacity
+        self.rows = np.ndarray((capacity,), ROW_DTYPE, buffer=shm.buf, offset=HEADER_DTYPE.itemsize)
+        self.demand = np.ndarray(
+            (capacity,), '<f8', buffer=shm.buf, offset=HEADER_DTYPE.itemsize + capacity * ROW_DTYPE.itemsize
+        )
+        self._slots = {}
+        self._layout = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, name=None, capacity=QUOTE_BOARD_CAPACITY, interval=QUOTE_BOARD_INTERVAL):
+        shm = shared_memory.SharedMemory(name=name, create=True, size=board_size(capacity))
+        header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        header['magic'] = BOARD_MAGIC
+        header['version'] = BOARD_VERSION
+        header['capacity'] = capacity
+        header['fetcher_pid'] = os.getpid()
+        header['interval'] = interval
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        shm = shared_memory.SharedMemory(name=name)
+        # Readers must not unlink the block when they exit; only its creator does
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm)
+
+    # Writer side
+
+    def add(self, symbols):
+        """
+        Give each new symbol a row; returns the number added
+        """
+        with self._lock:
+            slots = self.slots()
+            count = int(self.header['rows'])
+            added = 0
+            for symbol in symbols:
+                if symbol in slots or len(symbol.encode('ascii')) > ROW_DTYPE['symbol'].itemsize:
+                    continue
+                if count >= self.capacity:
+                    print(f"Quote board {self.shm.name} is full; {symbol} not added")
+                    break
+                self.rows['symbol'][count] = symbol.encode('ascii')
+                slots[symbol] = count
+                count += 1
+                added += 1
+            if added:
+                self.header['rows'] = count
+                self.header['layout'] += 1
+            return added
+
+    def write(self, row, quote, now=None):
+        seq = int(self.rows['seq'][row])
+        self.rows['seq'][row] = seq + 1
+        self.rows[row] = (
+            seq + 1,
+            self.rows['symbol'][row],
+            *(np.nan if quote.get(field) is None else float(quote[field]) for field in QUOTE_FIELDS),
+            int(quote.get('t') or 0),
+            time.time() if now is None else now
+        )
+        self.rows['seq'][row] = seq + 2
+
+    def due(self, now, interval, active):
+        """
+        Rows read within `active` seconds whose quote is older than `interval`
+        """
+        count = int(self.header['rows'])
+        demand = self.demand[:count]
+        updated = self.rows['updated'][:count]
+        return np.flatnonzero((now - demand <= active) & (now - updated >= interval))
+
+    # Reader side
+
+    def slots(self):
+        """
+        {symbol: row}, re-read from the board only when its layout changes
+        """
+        layout = int(self.header['layout'])
+        if layout != self._layout:
+            count = int(self.header['rows'])
+            self._slots = {symbol.decode('ascii'): i for i, symbol in enumerate(self.rows['symbol'][:count].tolist())}
+            self._layout = layout
+        return self._slots
+
+    def read(self, row, max_age=None, now=None):
+        """
+        The row's quote dict, or None until the fetcher has written it (or,
+        with `max_age`, while the quote is older than that)
+        """
+        seq = self.rows['seq']
+        for _ in range(READ_RETRIES):
+            before = int(seq[row])
+            if before & 1:
+                continue
+            values = self.rows[row].item()
+            if int(seq[row]) == before:
+                break
+        else:
+            return None
+        if not values[-1]:
+            return None
+        if max_age is not None and (time.time() if now is None else now) - values[-1] > max_age:
+            return None
+        quote = {field: None if value != value else value for field, value in zip(QUOTE_FIELDS, values[2:-2])}
+        quote['t'] = values[-2]
+        return quote
+
+    def quote(self, symbol, wait=0.0):
+        """
+        Latest quote for a symbol on the board, marking it as wanted
+        Returns None when the symbol has no row, or when it is still not
+        filled in (or fresh) after `wait` seconds. A row nobody read for a
+        while has stopped being refreshed; the new demand stamp puts it back
+        on the fetcher's list.
+        """
+        row = self.slots().get(symbol)
+        if row is None:
+            return None
+        self.demand[row] = time.time()
+        max_age = QUOTE_MAX_AGE_INTERVALS * self.interval()
+        quote = self.read(row, max_age)
+        deadline = time.monotonic() + wait
+        while quote is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+            quote = self.read(row, max_age)
+        return quote
+
+    def interval(self):
+        return float(self.header['interval']) or QUOTE_BOARD_INTERVAL
+
+    def fetcher_alive(self):
+        return time.time() - float(self.header['heartbeat']) <= max(3 * self.interval(), 10.0)
+
+    def stats(self):
+        count = int(self.header['rows'])
+        now = time.time()
+        return {
+            'name': self.shm.name,
+            'rows': count,
+            'capacity': self.capacity,
+            'filled': int(np.count_nonzero(self.rows['updated'][:count])),
+            'active': int(np.count_nonzero(now - self.demand[:count] <= QUOTE_BOARD_ACTIVE)),
+            'fetcher_alive': self.fetcher_alive(),
+            'bytes': self.shm.size
+        }
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class QuoteBoardFetcher:
+    """
+    Keeps the quotes readers want current
+    Every tick it asks the board which wanted rows are older than
+    `interval` and fetches those (one in flight per ticker) on a small pool.
+    """
+
+    def __init__(self, board, fetch_quote, interval=QUOTE_BOARD_INTERVAL, active=QUOTE_BOARD_ACTIVE,
+                 workers=QUOTE_BOARD_WORKERS):
+        self.board = board
+        self.fetch_quote = fetch_quote
+        self.interval = interval
+        self.active = active
+        self.tick = min(interval, 0.05)
+        self.stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='quote-board')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self.stats = {'fetches': 0, 'errors': 0}
+
+    def _refresh(self, row, symbol):
+        try:
+            self.board.write(row, self.fetch_quote(symbol))
+            self.stats['fetches'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Error fetching quote for {symbol} onto the board: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(row)
+
+    def run_once(self, now=None):
+        now = time.time() if now is None else now
+        self.board.header['heartbeat'] = now
+        symbols = self.board.rows['symbol']
+        submitted = 0
+        for row in self.board.due(now, self.interval, self.active).tolist():
+            with self._lock:
+                if row in self._in_flight:
+                    continue
+                self._in_flight.add(row)
+            self._pool.submit(self._refresh, row, symbols[row].decode('ascii'))
+            submitted += 1
+        return submitted
+
+    def run(self):
+        while not self.stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in quote board fetcher: {e}")
+            self.stop.wait(self.tick)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_board = None
+_board_checked = 0.0
+_board_lock = threading.Lock()
+# Seconds between attempts to attach while the fetcher has not created the board
+ATTACH_RETRY = 5.0
+
+
+def get_quote_board():
+    """
+    The board named by QUOTE_BOARD, attached on first use, or None
+    """
+    global _board, _board_checked
+    if _board is None and QUOTE_BOARD_NAME and time.monotonic() - _board_checked >= ATTACH_RETRY:
+        with _board_lock:
+            if _board is None and time.monotonic() - _board_checked >= ATTACH_RETRY:
+                _board_checked = time.monotonic()
+                try:
+                    _board = QuoteBoard.attach(QUOTE_BOARD_NAME)
+                except FileNotFoundError:
+                    print(f"Quote board {QUOTE_BOARD_NAME} does not exist yet; is the fetcher running?")
+                except Exception as e:
+                    print(f"Error attaching quote board {QUOTE_BOARD_NAME}: {e}")
+    return _board
+
+
+def board_quote(asx_ticker, primary):
+    """
+    Quote from the shared board, or None when the caller should ask upstream
+    (no board, another provider, a ticker the board does not carry, or a
+    fetcher that has stopped). Raises when the ticker is on the board but
+    the fetcher has not filled it in, or refreshed a stale quote, within
+    QUOTE_BOARD_WAIT.
+    """
+    if primary != QUOTE_BOARD_PROVIDER:
+        return None
+    board = get_quote_board()
+    if board is None or not board.fetcher_alive():
+        return None
+    if asx_ticker not in board.slots():
+        return None
+    quote = board.quote(asx_ticker, wait=QUOTE_BOARD_WAIT)
+    if quote is None:
+        raise ProviderError(f"No current quote for {asx_ticker} on the board")
+    return quote
+
+
+def remove_stale_board(name):
+    """
+    Unlink a board left behind by a fetcher that was killed
+    Raises SystemExit if the block belongs to a live fetcher (its heartbeat
+    is recent) or is not a quote board at all.
+    """
+    try:
+        existing = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    try:
+        try:
+            board = QuoteBoard(existing)
+        except ValueError:
+            raise SystemExit(f"Shared memory {name} exists and is not a quote board")
+        if board.fetcher_alive():
+            raise SystemExit(
+                f"Quote board {name} is kept current by a running fetcher (pid {int(board.header['fetcher_pid'])})"
+            )
+        # Release the NumPy views before the buffer is closed
+        del board
+    finally:
+        existing.close()
+    existing.unlink()
+    print(f"Removed stale quote board {name}")
+
+
+def run_fetcher(name=QUOTE_BOARD_NAME, provider=QUOTE_BOARD_PROVIDER):
+    """
+    Create the board, list every known ticker on it and keep it current
+    until SIGTERM/SIGINT; the board is removed on the way out
+    Refuses to start while another fetcher is keeping a board of the same
+    name alive.
+    """
+    from src.providers.registry import get_provider_registry
+    from src.services.rate_limit import upstream_priority, BACKGROUND
+    from src.services.symbol_search import get_symbol_index
+
+    if not name:
+        raise SystemExit('Set QUOTE_BOARD to the shared memory name the workers use')
+    remove_stale_board(name)
+
+    board = QuoteBoard.create(name)
+    board.add(security['symbol'] for security in get_symbol_index().securities)
+    registry = get_provider_registry()
+
+    def fetch_quote(asx_ticker):
+        # Straight to the providers: the board itself is what workers read
+        with upstream_priority(BACKGROUND):
+            return registry.call('quote', asx_ticker, provider)[1]
+
+    fetcher = QuoteBoardFetcher(board, fetch_quote)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: fetcher.stop.set())
+    try:
+        fetcher.run()
+    finally:
+        board.close()
+
+
+def start_fetcher_process(name=QUOTE_BOARD_NAME):
+    """
+    Run the fetcher in a child process (e.g. from a gunicorn on_starting hook)
+    """
+    import multiprocessing
+    process = multiprocessing.Process(target=run_fetcher, args=(name,), name='quote-board-fetcher', daemon=True)
+    process.start()
+    return process
+
+
+if __name__ == '__main__':
+    run_fetcher()
@@ -0,0 +1,147 @@
+import json
+import os
+import queue
+import threading
+import time
+
+from src.services.rate_limit import upstream_priority, BACKGROUND
+from src.services.tickers import to_asx_ticker
+
+# Quote fields pushed to subscribers
+STREAM_FIELDS = ('c', 'd', 'dp', 'h', 'l', 't')
+STREAM_POLL_INTERVAL = float(os.environ.get('STREAM_POLL_INTERVAL', '5'))
+# Comment line sent when nothing changed, so proxies keep the connection open
+STREAM_KEEPALIVE = 15
+STREAM_MAX_TICKERS = 50
+
+
+class Subscription:
+    """
+    One client's view of the hub: a queue of (asx_ticker, delta) updates
+    """
+
+    def __init__(self, hub, asx_tickers):
+        self.hub = hub
+        self.asx_tickers = asx_tickers
+        self.updates = queue.Queue(maxsize=1000)
+
+    def push(self, asx_ticker, delta):
+        try:
+            self.updates.put_nowait((asx_ticker, delta))
+        except queue.Full:
+            # A client this far behind only needs the latest state
+            pass
+
+    def get(self, timeout):
+        try:
+            return self.updates.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class _Poller:
+    def __init__(self, asx_ticker):
+        self.asx_ticker = asx_ticker
+        self.subscribers = set()
+        self.last = {}
+        self.stop = threading.Event()
+        self.thread = None
+
+
+class QuoteHub:
+    """
+    Shares one upstream poller per ticker between all streaming clients
+    Each poller fetches the quote every `interval` seconds and pushes only the
+    fields that changed, so upstream load follows distinct tickers, not clients.
+    """
+
+    def __init__(self, fetch_quote, interval=STREAM_POLL_INTERVAL):
+        self.fetch_quote = fetch_quote
+        self.interval = interval
+        self._pollers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, tickers):
+        asx_tickers = list(dict.fromkeys(to_asx_ticker(t) for t in tickers))
+        subscription = Subscription(self, asx_tickers)
+        with self._lock:
+            for asx_ticker in asx_tickers:
+                poller = self._pollers.get(asx_ticker)
+                if poller is None:
+                    poller = _Poller(asx_ticker)
+                    self._pollers[asx_ticker] = poller
+                    poller.thread = threading.Thread(
+                        target=self._run, args=(poller,), name=f'quote-poller-{asx_ticker}', daemon=True
+                    )
+                    poller.thread.start()
+                elif poller.last:
+                    # Late joiners start from the full current state
+                    subscription.push(asx_ticker, dict(poller.last))
+                poller.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for asx_ticker in subscription.asx_tickers:
+                poller = self._pollers.get(asx_ticker)
+                if poller is None:
+                    continue
+                poller.subscribers.discard(subscription)
+                if not poller.subscribers:
+                    poller.stop.set()
+                    del self._pollers[asx_ticker]
+
+    def _run(self, poller):
+        while not poller.stop.is_set():
+            try:
+                # Polls yield upstream quota to interactive requests
+                with upstream_priority(BACKGROUND):
+                    quote = self.fetch_quote(poller.asx_ticker)
+                delta = {
+                    field: quote[field] for field in STREAM_FIELDS
+                    if field in quote and poller.last.get(field) != quote[field]
+                }
+                if delta:
+                    with self._lock:
+                        poller.last.update(delta)
+                        subscribers = list(poller.subscribers)
+                    for subscription in subscribers:
+                        subscription.push(poller.asx_ticker, delta)
+            except Exception as e:
+                print(f"Error polling quote for {poller.asx_ticker}: {e}")
+            poller.stop.wait(self.interval)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tickers': len(self._pollers),
+                'subscriptions': sum(len(p.subscribers) for p in self._pollers.values())
+            }
+
+
+def sse_events(hub, tickers, keepalive=STREAM_KEEPALIVE):
+    """
+    Yield server-sent events for `tickers` until the client disconnects
+    The subscription is only made once the server starts sending the
+    response, so a response that is never iterated leaves no poller behind.
+    """
+    subscription = hub.subscribe(tickers)
+    try:
+        yield 'retry: 5000\n\n'
+        last_sent = time.monotonic()
+        while True:
+            update = subscription.get(timeout=1.0)
+            if update is None:
+                if time.monotonic() - last_sent >= keepalive:
+                    last_sent = time.monotonic()
+                    yield ': keepalive\n\n'
+                continue
+            asx_ticker, delta = update
+            last_sent = time.monotonic()
+            yield f"event: quote\ndata: {json.dumps({'asx_ticker': asx_ticker, **delta})}\n\n"
+    finally:
+        # Runs when the WSGI server closes the generator on disconnect
+        subscription.close()
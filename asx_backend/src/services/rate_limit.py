@@ -0,0 +1,325 @@
+import asyncio
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from src.services.executor import UPSTREAM_TIMEOUT
+from src.services.metrics import rate_limit_wait, rate_limit_events
+
+# Call priorities, most urgent first
+INTERACTIVE = 0
+BACKGROUND = 1
+BATCH = 2
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background', BATCH: 'batch'}
+
+# Longest a call waits for a token before giving up, by priority
+MAX_WAIT = {
+    INTERACTIVE: UPSTREAM_TIMEOUT,
+    BACKGROUND: float(os.environ.get('RATE_LIMIT_BACKGROUND_WAIT', '30')),
+    BATCH: float(os.environ.get('RATE_LIMIT_BATCH_WAIT', '120')),
+}
+
+# Endpoints that share a quota bucket
+ENDPOINT_CLASSES = {
+    'finnhub': {
+        'quote': 'quote',
+        'profile': 'reference',
+        'financials': 'reference',
+        'sentiment': 'reference',
+        'symbol_lookup': 'reference',
+    },
+    'yahoo': {
+        'chart': 'chart',
+    },
+}
+
+# (calls, per seconds) per provider and endpoint class. Finnhub's free tier
+# allows 60 calls a minute in total; quotes get the larger share since the
+# reference sections are cached for hours.
+DEFAULT_RATE_LIMITS = 'finnhub:quote=40/60,finnhub:reference=20/60,yahoo:chart=120/60'
+
+# Retries of a call rejected with HTTP 429
+RATE_LIMIT_RETRIES = 2
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 60.0
+# After a 429 the refill rate is cut to this share and recovers per success
+BACKOFF_RATE_FACTOR = 0.5
+RECOVERY_STEP = 0.05
+MIN_RATE_SHARE = 0.1
+
+_priority = ContextVar('upstream_priority', default=INTERACTIVE)
+_STATUS_429_RE = re.compile(r'(?<![\w.])429(?![\w.])')
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+def current_priority():
+    return _priority.get()
+
+
+@contextmanager
+def upstream_priority(priority):
+    """
+    Run the enclosed upstream calls at `priority`
+    The priority follows the call onto executor threads when submitted with
+    submit_in_context.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def parse_rate_limits(spec):
+    """
+    Parse "provider:class=calls/seconds,..." into {(provider, class): (rate, burst)}
+    The burst is the per-window allowance, so a quiet bucket can absorb a
+    full window's worth of calls at once.
+    """
+    limits = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            name, quota = item.split('=')
+            provider, endpoint_class = name.strip().split(':')
+            calls, seconds = quota.split('/')
+            limits[(provider, endpoint_class)] = (float(calls) / float(seconds), float(calls))
+        except ValueError:
+            print(f"Ignoring malformed rate limit {item!r}")
+    return limits
+
+
+def is_rate_limited(error):
+    """
+    Whether an upstream exception is an HTTP 429
+    """
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None)
+    message = str(error)
+    return status == 429 or bool(_STATUS_429_RE.search(message)) or 'too many requests' in message.lower()
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out tokens to waiters in priority order
+    Only the most urgent waiter (then the oldest) may take the next token, so
+    batch work queues behind interactive requests instead of racing them.
+    """
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = BACKOFF_INITIAL
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _try_take(self, entry, now):
+        """
+        Take a token for `entry` if it is next in line; else return how long to wait
+        Must be called with the condition held.
+        """
+        self._refill(now)
+        if self._waiters[0] == entry and self.tokens >= 1 and now >= self.blocked_until:
+            self.tokens -= 1
+            return None
+        until_token = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+        return max(until_token, self.blocked_until - now, 0.001)
+
+    def _leave(self, entry):
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        self._cond.notify_all()
+
+    def acquire(self, priority, timeout):
+        """
+        Take one token, waiting up to `timeout` seconds; returns the time waited
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._try_take(entry, now)
+                    if wait is None:
+                        return now - start
+                    if now >= deadline:
+                        raise RateLimitExceeded(f"No upstream quota within {timeout:.1f}s")
+                    self._cond.wait(min(wait, deadline - now))
+            finally:
+                self._leave(entry)
+
+    async def acquire_async(self, priority, timeout):
+        """
+        acquire() for coroutines: waits on the event loop instead of a thread
+        Async waiters hold their place in the same priority queue as threads.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                now = time.monotonic()
+                with self._cond:
+                    wait = self._try_take(entry, now)
+                if wait is None:
+                    return now - start
+                if now >= deadline:
+                    raise RateLimitExceeded(f"No upstream quota within {timeout:.1f}s")
+                # Re-check at least every 50ms in case a waiter ahead left early
+                await asyncio.sleep(min(wait, deadline - now, 0.05))
+        finally:
+            with self._cond:
+                self._leave(entry)
+
+    def throttled(self, retry_after=None):
+        """
+        Back off after a 429: pause the bucket and halve its refill rate
+        """
+        with self._cond:
+            pause = retry_after if retry_after else self.backoff
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            self.backoff = min(BACKOFF_MAX, self.backoff * 2)
+            self.rate = max(self.base_rate * MIN_RATE_SHARE, self.rate * BACKOFF_RATE_FACTOR)
+            self.tokens = min(self.tokens, 0)
+            self._cond.notify_all()
+
+    def succeeded(self):
+        # Additive recovery towards the configured rate
+        with self._cond:
+            self.backoff = BACKOFF_INITIAL
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+
+    def snapshot(self):
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                'rate_per_minute': round(self.rate * 60, 2),
+                'tokens': round(self.tokens, 2),
+                'waiting': len(self._waiters),
+                'blocked_for': round(max(0.0, self.blocked_until - time.monotonic()), 2)
+            }
+
+
+class UpstreamGovernor:
+    """
+    Shared quota for every upstream client in the process
+    Calls take a token from their provider/endpoint-class bucket first; calls
+    without a configured limit pass straight through.
+    """
+
+    def __init__(self, limits=None):
+        if limits is None:
+            limits = parse_rate_limits(os.environ.get('RATE_LIMITS', DEFAULT_RATE_LIMITS))
+        self.buckets = {key: TokenBucket(rate, burst) for key, (rate, burst) in limits.items()}
+
+    def bucket_for(self, provider, endpoint):
+        endpoint_class = ENDPOINT_CLASSES.get(provider, {}).get(endpoint, endpoint)
+        return endpoint_class, self.buckets.get((provider, endpoint_class))
+
+    def call(self, provider, endpoint, fn):
+        """
+        Run `fn` once quota allows, retrying with backoff when it is rate limited
+        """
+        endpoint_class, bucket = self.bucket_for(provider, endpoint)
+        if bucket is None:
+            return fn()
+
+        priority = current_priority()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                waited = bucket.acquire(priority, MAX_WAIT[priority])
+            except RateLimitExceeded:
+                rate_limit_events.inc(provider=provider, endpoint_class=endpoint_class, event='rejected')
+                raise
+            rate_limit_wait.observe(
+                waited, provider=provider, endpoint_class=endpoint_class, priority=PRIORITY_NAMES[priority]
+            )
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                rate_limit_events.inc(provider=provider, endpoint_class=endpoint_class, event='throttled')
+                bucket.throttled(_retry_after(e))
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+                print(f"Rate limited by {provider} {endpoint}, retrying: {e}")
+                continue
+            bucket.succeeded()
+            return result
+
+    async def call_async(self, provider, endpoint, fn):
+        """
+        call() for coroutine functions
+        """
+        endpoint_class, bucket = self.bucket_for(provider, endpoint)
+        if bucket is None:
+            return await fn()
+
+        priority = current_priority()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                waited = await bucket.acquire_async(priority, MAX_WAIT[priority])
+            except RateLimitExceeded:
+                rate_limit_events.inc(provider=provider, endpoint_class=endpoint_class, event='rejected')
+                raise
+            rate_limit_wait.observe(
+                waited, provider=provider, endpoint_class=endpoint_class, priority=PRIORITY_NAMES[priority]
+            )
+            try:
+                result = await fn()
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                rate_limit_events.inc(provider=provider, endpoint_class=endpoint_class, event='throttled')
+                bucket.throttled(_retry_after(e))
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+                print(f"Rate limited by {provider} {endpoint}, retrying: {e}")
+                continue
+            bucket.succeeded()
+            return result
+
+    def snapshot(self):
+        return {f'{provider}:{endpoint_class}': bucket.snapshot()
+                for (provider, endpoint_class), bucket in self.buckets.items()}
+
+
+def _retry_after(error):
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+# Shared by every upstream client in the process
+upstream_governor = UpstreamGovernor()
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+from src.services.cache import CACHE_POLICIES
+from src.services.json_codec import encode_analysis
+
+# Encoded analyze responses are reused for as long as a quote stays fresh
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', str(CACHE_POLICIES['quote'][0])))
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+
+
+class ResponseCache:
+    """
+    LRU of encoded responses as (body bytes, etag, stored_at)
+    """
+
+    def __init__(self, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[2] >= self.ttl:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0], entry[1]
+
+    def set(self, key, body, etag):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (body, etag, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def encoded(self, key, build):
+        """
+        Return (body, etag) for key, building and encoding on a miss
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        body, etag = encode_analysis(build())
+        self.set(key, body, etag)
+        return body, etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+response_cache = ResponseCache()
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Whether an If-None-Match header value names this (strong or weak) ETag
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def cached_analysis_response(key, build):
+    """
+    Serve an analyze payload from encoded bytes, answering 304 to a client
+    that already holds the current version
+    Exceptions from build propagate, so error responses are never cached.
+    """
+    body, etag = response_cache.encoded(key, build)
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        response_cache.stats['not_modified'] += 1
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+    response.headers['ETag'] = f'"{etag}"'
+    # Clients may keep the body but should revalidate it every time
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
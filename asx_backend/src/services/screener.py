@@ -0,0 +1,245 @@
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import as_completed
+from datetime import datetime
+
+import numpy as np
+
+from src.services.batch import batch_executor
+from src.services.executor import submit_in_context
+from src.services.metrics import stage_span
+from src.services.rate_limit import upstream_priority, BATCH
+from src.services.symbol_search import get_symbol_index
+
+SCREENER_PROVIDER = os.environ.get('SCREENER_PROVIDER', 'demo')
+# Seconds before the snapshot is rebuilt in the background; it keeps being
+# served while the rebuild runs
+SCREENER_REFRESH = float(os.environ.get('SCREENER_REFRESH', '900'))
+SCREENER_MAX_RESULTS = 500
+
+# Quote fields screened next to financials.metric
+QUOTE_COLUMNS = {'price': 'c', 'change': 'd', 'changePercent': 'dp'}
+
+# Short names for the metrics people screen on most
+FIELD_ALIASES = {
+    'pe': 'peInclExtraTTM',
+    'pb': 'pbAnnual',
+    'eps': 'epsInclExtraItemsTTM',
+    'roe': 'roeTTM',
+    'roa': 'roaTTM',
+    'roae': 'roaeTTM',
+    'dividend_yield': 'dividendYieldIndicatedAnnual',
+    'yield': 'dividendYieldIndicatedAnnual',
+    'market_cap': 'marketCapitalization',
+    'volume': 'regularMarketVolume',
+    'change_percent': 'changePercent',
+    'high_52w': '52WeekHigh',
+    'low_52w': '52WeekLow',
+}
+
+COMPARISONS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '=': np.equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+_CONDITION_RE = re.compile(r'^\s*([A-Za-z0-9_]+)\s*(<=|>=|==|!=|<|>|=)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$')
+_CONDITION_SPLIT_RE = re.compile(r'\s*(?:,|;|\band\b)\s*', re.IGNORECASE)
+
+
+class ScreenRequestError(ValueError):
+    pass
+
+
+class ScreenerSnapshot:
+    """
+    Columnar view of the whole universe: one float64 array per metric
+    (NaN where a ticker has no value) and integer sector codes, row-aligned
+    with `codes`
+    """
+
+    def __init__(self, securities, rows, provider):
+        self.codes = np.array([s['code'] for s in securities])
+        self.names = [s['name'] for s in securities]
+        self.sector_names = sorted({s['sector'] for s in securities})
+        sector_index = {name: i for i, name in enumerate(self.sector_names)}
+        self.sectors = np.array([sector_index[s['sector']] for s in securities], dtype=np.int16)
+
+        fields = sorted({field for row in rows if row for field in row})
+        self.columns = {}
+        for field in fields:
+            column = np.full(len(securities), np.nan)
+            for i, row in enumerate(rows):
+                value = row.get(field) if row else None
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    column[i] = value
+            self.columns[field] = column
+        self.covered = np.array([bool(row) for row in rows])
+        self.provider = provider
+        self.built_at = datetime.now()
+        self.built_monotonic = time.monotonic()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def column(self, field):
+        name = FIELD_ALIASES.get(field, field)
+        if name not in self.columns:
+            raise ScreenRequestError(f"Unknown field {field}")
+        return name, self.columns[name]
+
+    def sector_mask(self, sectors):
+        wanted = {name.lower() for name in sectors}
+        codes = [i for i, name in enumerate(self.sector_names) if name.lower() in wanted]
+        return np.isin(self.sectors, codes)
+
+    def screen(self, conditions=(), sectors=(), sort=None, limit=50, fields=None):
+        """
+        Rows matching every (field, op, value) condition and sector, sorted
+        Missing values (NaN) never match a condition and sort last.
+        """
+        mask = self.covered.copy()
+        for field, op, value in conditions:
+            _, column = self.column(field)
+            with np.errstate(invalid='ignore'):
+                mask &= COMPARISONS[op](column, value)
+        if sectors:
+            mask &= self.sector_mask(sectors)
+        matches = np.flatnonzero(mask)
+
+        if sort:
+            descending = sort.startswith('-')
+            sort_name, column = self.column(sort.lstrip('-+'))
+            keys = column[matches]
+            # NaN sorts last either way
+            keys = np.where(np.isnan(keys), np.inf, -keys if descending else keys)
+            matches = matches[np.argsort(keys, kind='stable')]
+
+        selected = [FIELD_ALIASES.get(f, f) for f in fields] if fields else list(self.columns)
+        for name in selected:
+            self.column(name)
+        results = []
+        for i in matches[:limit]:
+            result = {
+                'symbol': self.codes[i],
+                'name': self.names[i],
+                'sector': self.sector_names[self.sectors[i]]
+            }
+            for name in selected:
+                value = self.columns[name][i]
+                result[name] = None if math.isnan(value) else float(value)
+            results.append(result)
+        return len(matches), results
+
+
+def parse_conditions(expressions):
+    """
+    Parse filters such as "pe<15, dividend_yield>5" (also "and"/";" separated)
+    """
+    conditions = []
+    for expression in expressions:
+        for part in _CONDITION_SPLIT_RE.split(expression or ''):
+            if not part:
+                continue
+            match = _CONDITION_RE.match(part)
+            if match is None:
+                raise ScreenRequestError(f"Cannot parse filter '{part}'; use field<op>number, e.g. pe<15")
+            conditions.append((match[1], match[2], float(match[3])))
+    return conditions
+
+
+def snapshot_row(data):
+    """
+    Flatten one analyze payload into the screened fields
+    """
+    row = dict((data.get('financials') or {}).get('metric') or {})
+    quote = data.get('quote') or {}
+    for column, key in QUOTE_COLUMNS.items():
+        row[column] = quote.get(key)
+    profile = data.get('profile') or {}
+    if not row.get('marketCapitalization') and profile.get('marketCapitalization'):
+        row['marketCapitalization'] = profile['marketCapitalization']
+    return row
+
+
+def build_snapshot(provider=SCREENER_PROVIDER):
+    """
+    Analyze every listed security at batch priority and pack the columns
+    """
+    from src.providers.registry import get_provider_registry
+    registry = get_provider_registry()
+    securities = get_symbol_index().securities
+
+    def analyze(symbol):
+        with upstream_priority(BATCH):
+            return snapshot_row(registry.analyze(symbol, primary=provider))
+
+    rows = [None] * len(securities)
+    with stage_span('screener_build'):
+        bulk = getattr(registry.get(provider), 'analyze_many', None)
+        if bulk is not None:
+            # Generated data comes in one vectorized pass for the whole universe
+            rows = [snapshot_row(sections) for sections in bulk([s['symbol'] for s in securities])]
+            return ScreenerSnapshot(securities, rows, provider)
+        futures = {submit_in_context(batch_executor, analyze, s['symbol']): i for i, s in enumerate(securities)}
+        for future in as_completed(futures):
+            try:
+                rows[futures[future]] = future.result()
+            except Exception as e:
+                print(f"Error adding {securities[futures[future]]['symbol']} to the screener: {e}")
+        return ScreenerSnapshot(securities, rows, provider)
+
+
+class Screener:
+    """
+    Holds the current snapshot and rebuilds it once it is SCREENER_REFRESH old
+    Builds always run in the background: until the first one finishes there
+    is no snapshot, and after that requests keep using the previous snapshot
+    until the new one is swapped in.
+    """
+
+    def __init__(self, build=build_snapshot, refresh=SCREENER_REFRESH):
+        self.build = build
+        self.refresh = refresh
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        # A build started before a fork (gunicorn --preload) does not run in the child
+        os.register_at_fork(after_in_child=self._forked)
+
+    def _forked(self):
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def snapshot(self):
+        """
+        The current snapshot, or None while the first build is running
+        """
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.built_monotonic >= self.refresh:
+            self.build_in_background()
+        return snapshot
+
+    def build_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, name='screener', daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            self._snapshot = self.build()
+        except Exception as e:
+            print(f"Error building screener snapshot: {e}")
+        finally:
+            self._rebuilding = False
+
+
+screener = Screener()
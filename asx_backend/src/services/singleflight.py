@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+
+from src.services.tickers import to_asx_ticker
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key
+    The first caller for a key runs the fetch; callers arriving while it is
+    in flight block on it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {'leaders': 0, 'shared': 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats['shared'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['leaders'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines running on one event loop
+    Waiters await the leader's task instead of blocking a thread.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self.stats = {'leaders': 0, 'shared': 0}
+
+    async def do(self, key, fn):
+        task = self._tasks.get(key)
+        if task is not None:
+            self.stats['shared'] += 1
+            # Shielded so one cancelled waiter does not cancel everyone's fetch
+            return await asyncio.shield(task)
+
+        self.stats['leaders'] += 1
+        task = asyncio.ensure_future(fn())
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    def in_flight(self):
+        return len(self._tasks)
+
+
+def flight_key(source, endpoint, ticker, params=None):
+    """
+    Build the coalescing key for an upstream request
+    """
+    return (
+        source,
+        endpoint,
+        to_asx_ticker(ticker),
+        json.dumps(params or {}, sort_keys=True, default=str)
+    )
+
+
+# Shared by every data-source route in the process
+upstream_flight = SingleFlight()
@@ -0,0 +1,308 @@
+import atexit
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from src.services.analytics import PriceSeries
+from src.services.bar_store import get_bar_store
+from src.services.cache import market_cache, cache_kind
+from src.services.json_codec import dumps_bytes, loads_bytes
+
+# Snapshot loaded at start-up when the file exists, and written back on a
+# clean shutdown unless SNAPSHOT_SAVE_ON_EXIT=0
+SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH')
+SNAPSHOT_SAVE_ON_EXIT = os.environ.get('SNAPSHOT_SAVE_ON_EXIT', '1') == '1'
+# GET /api/snapshot is off unless a token is set; requests send it as a bearer token
+SNAPSHOT_TOKEN = os.environ.get('SNAPSHOT_TOKEN')
+# Seconds an exported snapshot is served again before a new one is encoded
+SNAPSHOT_EXPORT_TTL = float(os.environ.get('SNAPSHOT_EXPORT_TTL', '60'))
+
+SNAPSHOT_MAGIC = b'ASXSNAP\x00'
+SNAPSHOT_VERSION = 1
+# Magic, format version and length of the JSON index that follows
+_HEADER = struct.Struct('<8sII')
+# Sections start on this boundary so arrays can be viewed in place from a memory map
+_ALIGNMENT = 64
+BAR_COLUMNS = ('ts', 'open', 'high', 'low', 'close', 'adjclose', 'volume')
+DIVIDEND_COLUMNS = ('ts', 'amount')
+_DTYPE = '<f8'
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _servable(cache, kind, stored_at, now):
+    fresh_ttl, stale_ttl = cache.policy(kind)
+    return now - stored_at <= fresh_ttl + stale_ttl
+
+
+def _history_arrays(bar_store):
+    """
+    Every stored ticker's bars and dividends as two stacked float64 arrays
+    plus [symbol, bar_start, bar_end, dividend_start, dividend_end] rows
+    """
+    symbols = []
+    bar_blocks = []
+    dividend_blocks = []
+    bar_rows = dividend_rows = 0
+    for symbol in sorted(bar_store.symbols()) if bar_store is not None else []:
+        series = bar_store.load(symbol)
+        bar_blocks.append(np.column_stack([
+            series.timestamps, series.open, series.high, series.low,
+            series.close, series.adjclose, series.volume
+        ]))
+        dividend_blocks.append(np.column_stack([series.dividend_timestamps, series.dividend_amounts]))
+        symbols.append([
+            symbol,
+            bar_rows, bar_rows + len(series),
+            dividend_rows, dividend_rows + len(series.dividend_amounts)
+        ])
+        bar_rows += len(series)
+        dividend_rows += len(series.dividend_amounts)
+
+    bars = np.concatenate(bar_blocks) if bar_blocks else np.empty((0, len(BAR_COLUMNS)))
+    dividends = np.concatenate(dividend_blocks) if dividend_blocks else np.empty((0, len(DIVIDEND_COLUMNS)))
+    return bars.astype(_DTYPE), dividends.astype(_DTYPE), symbols
+
+
+def export_snapshot(cache=market_cache, bar_store=None, now=None):
+    """
+    Encode the servable cache entries and the stored bar history as bytes
+    Layout: header, JSON index, then 64-byte aligned sections: the cache
+    entries (zlib-compressed JSON) and the bars and dividends as row-major
+    little-endian float64 arrays.
+    """
+    now = time.time() if now is None else now
+    entries = [
+        [key, cache_kind(key), stored_at, value]
+        for key, (value, stored_at) in cache.memory.items()
+        if _servable(cache, cache_kind(key), stored_at, now)
+    ]
+
+    try:
+        bars, dividends, symbols = _history_arrays(get_bar_store() if bar_store is None else bar_store)
+    except Exception as e:
+        print(f"Error reading bar history for snapshot: {e}")
+        bars, dividends, symbols = _history_arrays(None)
+
+    sections = {}
+    blobs = []
+    offset = 0
+    for name, blob, meta in (
+        ('entries', zlib.compress(dumps_bytes(entries), 6), {'encoding': 'json+zlib', 'count': len(entries)}),
+        ('bars', bars.tobytes(), {'dtype': _DTYPE, 'shape': list(bars.shape), 'columns': list(BAR_COLUMNS)}),
+        ('dividends', dividends.tobytes(),
+         {'dtype': _DTYPE, 'shape': list(dividends.shape), 'columns': list(DIVIDEND_COLUMNS)}),
+    ):
+        offset = _aligned(offset)
+        sections[name] = dict(meta, offset=offset, length=len(blob))
+        blobs.append((offset, blob))
+        offset += len(blob)
+
+    index = dumps_bytes({
+        'version': SNAPSHOT_VERSION,
+        'created': now,
+        'created_at': datetime.fromtimestamp(now).isoformat(),
+        'sections': sections,
+        'symbols': symbols
+    })
+    data_start = _aligned(_HEADER.size + len(index))
+    out = bytearray(data_start + offset)
+    _HEADER.pack_into(out, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(index))
+    out[_HEADER.size:_HEADER.size + len(index)] = index
+    for start, blob in blobs:
+        out[data_start + start:data_start + start + len(blob)] = blob
+    return bytes(out)
+
+
+class Snapshot:
+    """
+    A snapshot read from bytes or a memory map
+    Opening parses only the header and index; bars and dividends are NumPy
+    views into the buffer, and the cache entries are decoded on demand.
+    """
+
+    def __init__(self, buffer):
+        if len(buffer) < _HEADER.size:
+            raise SnapshotError('Snapshot is truncated')
+        magic, version, index_length = _HEADER.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError('Not a market snapshot')
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+        self.buffer = buffer
+        self.index = loads_bytes(bytes(buffer[_HEADER.size:_HEADER.size + index_length]))
+        self.data_start = _aligned(_HEADER.size + index_length)
+        self.created = self.index['created']
+        self.bars = self._array('bars')
+        self.dividends = self._array('dividends')
+        self.symbols = {row[0]: tuple(row[1:]) for row in self.index['symbols']}
+
+    def _section(self, name):
+        section = self.index['sections'][name]
+        start = self.data_start + section['offset']
+        if start + section['length'] > len(self.buffer):
+            raise SnapshotError('Snapshot is truncated')
+        return section, start
+
+    def _array(self, name):
+        section, start = self._section(name)
+        shape = section['shape']
+        return np.frombuffer(
+            self.buffer, dtype=section['dtype'], count=shape[0] * shape[1], offset=start
+        ).reshape(shape)
+
+    def entries(self):
+        """
+        [key, kind, stored_at, value] for every cached entry
+        """
+        section, start = self._section('entries')
+        return loads_bytes(zlib.decompress(self.buffer[start:start + section['length']]))
+
+    def series(self, symbol, after=None):
+        """
+        A ticker's bars and dividends, optionally only those after timestamp `after`
+        """
+        bar_start, bar_end, dividend_start, dividend_end = self.symbols[symbol]
+        bars = self.bars[bar_start:bar_end]
+        dividends = self.dividends[dividend_start:dividend_end]
+        if after is not None:
+            bars = bars[bars[:, 0] > after]
+            dividends = dividends[dividends[:, 0] > after]
+        return PriceSeries(
+            bars[:, 0], bars[:, 1], bars[:, 2], bars[:, 3], bars[:, 4], bars[:, 6], bars[:, 5],
+            dividends[:, 0], dividends[:, 1]
+        )
+
+
+def open_snapshot(path):
+    """
+    Memory-map a snapshot file
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise SnapshotError('Snapshot is empty')
+        # The map stays valid after the file is closed
+        return Snapshot(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def load_snapshot(snapshot, cache=market_cache, bar_store=None, now=None):
+    """
+    Warm the cache and the bar store from a snapshot
+    Entries keep the time they were fetched, so the freshness policy carries
+    on where the exporting instance left off: expired entries are skipped and
+    stale ones are refreshed in the background on first use. Only the bars
+    after a ticker's last stored one are merged, and the snapshot's history
+    replaces the stored one when its adjusted closes were re-based since.
+    """
+    now = time.time() if now is None else now
+    entries = 0
+    for key, kind, stored_at, value in snapshot.entries():
+        if not _servable(cache, kind, stored_at, now):
+            continue
+        current = cache.memory.get(key)
+        if current is not None and current[1] >= stored_at:
+            continue
+        # Memory tier only: a shared disk tier already outlives restarts
+        cache.memory.set(key, value, stored_at)
+        entries += 1
+
+    bar_store = get_bar_store() if bar_store is None else bar_store
+    stored = bar_store.last_timestamps()
+    items = []
+    rebased = []
+    for symbol, (bar_start, bar_end, _, _) in snapshot.symbols.items():
+        last = stored.get(symbol)
+        if bar_end > bar_start and (last is None or last < snapshot.bars[bar_end - 1, 0]):
+            series = snapshot.series(symbol)
+            # A dividend or split since the local history was stored re-based it
+            if bar_store.rebased(symbol, series):
+                rebased.append((symbol, series))
+            else:
+                items.append((symbol, series if last is None else snapshot.series(symbol, after=last)))
+    bars = bar_store.merge_many(items)
+    for symbol, series in rebased:
+        bars += bar_store.replace(symbol, series)
+    return {'entries': entries, 'symbols': len(items) + len(rebased), 'bars': bars}
+
+
+class ExportCache:
+    """
+    The last exported snapshot, reused for `ttl` seconds
+    Concurrent requests wait for one export instead of each encoding the
+    whole state.
+    """
+
+    def __init__(self, export=export_snapshot, ttl=SNAPSHOT_EXPORT_TTL):
+        self.export = export
+        self.ttl = ttl
+        self._data = None
+        self._exported = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._data is None or time.monotonic() - self._exported > self.ttl:
+                self._data = self.export()
+                self._exported = time.monotonic()
+            return self._data
+
+
+export_cache = ExportCache()
+
+
+def save_snapshot(path):
+    """
+    Write a snapshot of the current state to `path` atomically
+    """
+    data = export_snapshot()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+    try:
+        os.chmod(temp_path, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+    return len(data)
+
+
+def _save_on_exit(path):
+    try:
+        save_snapshot(path)
+    except Exception as e:
+        print(f"Error saving snapshot to {path}: {e}")
+
+
+def warm_start(path=SNAPSHOT_PATH):
+    """
+    Load the snapshot at `path` if there is one and save it again at exit
+    """
+    if not path:
+        return None
+    result = None
+    if os.path.exists(path):
+        try:
+            start = time.perf_counter()
+            result = load_snapshot(open_snapshot(path))
+            result['seconds'] = time.perf_counter() - start
+        except Exception as e:
+            print(f"Error loading snapshot {path}: {e}")
+    if SNAPSHOT_SAVE_ON_EXIT:
+        atexit.register(_save_on_exit, path)
+    return result
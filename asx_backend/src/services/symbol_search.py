@@ -0,0 +1,257 @@
+import bisect
+import csv
+import heapq
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+
+# Bundled listing of common ASX securities. Point ASX_LISTING_PATH at a full
+# export (e.g. the ASX "ASXListedCompanies.csv" download) to index everything.
+DEFAULT_LISTING_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'asx_listing.csv')
+ASX_LISTING_PATH = os.environ.get('ASX_LISTING_PATH', DEFAULT_LISTING_PATH)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Ranking weights, highest first
+SCORE_CODE_EXACT = 100
+SCORE_CODE_PREFIX = 80
+SCORE_NAME_EXACT = 60
+SCORE_NAME_PREFIX = 50
+SCORE_SECTOR = 25
+SCORE_FUZZY = 35
+FUZZY_PENALTY = 10
+
+# Name words too common to be useful on their own
+STOP_WORDS = {'limited', 'ltd', 'the', 'of', 'and', 'group', 'plc', 'inc', 'co', 'corporation'}
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _edit_distance(a, b, limit):
+    """
+    Damerau-Levenshtein (optimal string alignment) distance, or limit + 1 if larger
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _deletes(word, depth):
+    """
+    All strings reachable from `word` by removing up to `depth` characters
+    """
+    results = {word}
+    frontier = {word}
+    for _ in range(depth):
+        next_frontier = set()
+        for w in frontier:
+            for i in range(len(w)):
+                next_frontier.add(w[:i] + w[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def _keep_best(scores, i, score):
+    # A security scores by its best match for each query word
+    if score > scores.get(i, 0):
+        scores[i] = score
+
+
+def max_typos(word):
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 7 else 2
+
+
+def load_listing(path=ASX_LISTING_PATH):
+    """
+    Load securities as dicts with symbol/code/name/sector
+    Accepts JSON (a list of objects), our code,name,sector CSV, or the ASX
+    "Company name,ASX code,GICS industry group" export with its preamble.
+    """
+    if path.endswith('.json'):
+        with open(path) as f:
+            rows = json.load(f)
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            lines = f.read().splitlines()
+        # The ASX export starts with a title line and a blank line
+        start = next((i for i, line in enumerate(lines) if 'code' in line.lower()), 0)
+        rows = list(csv.DictReader(lines[start:]))
+
+    securities = []
+    seen = set()
+    for row in rows:
+        row = {k.strip().lower(): (v or '').strip() for k, v in row.items() if k}
+        code = (row.get('code') or row.get('asx code') or row.get('symbol') or '').upper()
+        code = code[:-3] if code.endswith('.AX') else code
+        if not code or code in seen:
+            continue
+        seen.add(code)
+        securities.append({
+            'code': code,
+            'symbol': f'{code}.AX',
+            'name': row.get('name') or row.get('company name') or code,
+            'sector': row.get('sector') or row.get('gics industry group') or 'General'
+        })
+    return securities
+
+
+class SymbolIndex:
+    """
+    In-memory search index over the ASX universe
+    Codes live in a sorted list for prefix lookups, name and sector words in
+    an inverted index, and a deletion-neighbourhood map gives bounded typo
+    matching without scanning every word.
+    """
+
+    def __init__(self, securities):
+        self.securities = securities
+        self.codes = sorted((s['code'].lower(), i) for i, s in enumerate(securities))
+        self._code_keys = [c for c, _ in self.codes]
+
+        self.name_tokens = defaultdict(set)
+        self.sector_tokens = defaultdict(set)
+        for i, security in enumerate(securities):
+            for token in tokenize(security['name']):
+                self.name_tokens[token].add(i)
+            for token in tokenize(security['sector']):
+                self.sector_tokens[token].add(i)
+        self._name_keys = sorted(self.name_tokens)
+        self._sector_keys = sorted(self.sector_tokens)
+
+        self.deletes = defaultdict(set)
+        for token in self._name_keys:
+            if token in STOP_WORDS:
+                continue
+            for variant in _deletes(token, max_typos(token)):
+                self.deletes[variant].add(token)
+
+    def __len__(self):
+        return len(self.securities)
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + '\uffff')
+        return lo, hi
+
+    def _fuzzy_tokens(self, token):
+        limit = max_typos(token)
+        if limit == 0:
+            return {}
+        matches = {}
+        for variant in _deletes(token, limit):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in matches:
+                    continue
+                distance = _edit_distance(token, candidate, limit)
+                if distance <= limit:
+                    matches[candidate] = distance
+        return matches
+
+    def _score_token(self, token, scores):
+        matched = False
+
+        lo, hi = self._prefix_range(self._code_keys, token)
+        for code, i in self.codes[lo:hi]:
+            if code == token:
+                _keep_best(scores, i, SCORE_CODE_EXACT)
+            else:
+                _keep_best(scores, i, SCORE_CODE_PREFIX - (len(code) - len(token)))
+            matched = True
+
+        if token in self.name_tokens:
+            for i in self.name_tokens[token]:
+                _keep_best(scores, i, SCORE_NAME_EXACT)
+            matched = True
+        lo, hi = self._prefix_range(self._name_keys, token)
+        for key in self._name_keys[lo:hi]:
+            if key == token:
+                continue
+            for i in self.name_tokens[key]:
+                _keep_best(scores, i, SCORE_NAME_PREFIX)
+            matched = True
+
+        lo, hi = self._prefix_range(self._sector_keys, token)
+        for key in self._sector_keys[lo:hi]:
+            for i in self.sector_tokens[key]:
+                _keep_best(scores, i, SCORE_SECTOR)
+            matched = True
+
+        if not matched:
+            for candidate, distance in self._fuzzy_tokens(token).items():
+                for i in self.name_tokens[candidate]:
+                    _keep_best(scores, i, SCORE_FUZZY - FUZZY_PENALTY * distance)
+                matched = True
+
+        return matched
+
+    def search(self, query, limit=10):
+        """
+        Return up to `limit` securities ranked by match quality
+        Every query word has to match (code, name, sector or a close typo).
+        """
+        query = query.strip().lower()
+        if query.endswith('.ax'):
+            query = query[:-3]
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            if not self._score_token(token, token_scores):
+                return []
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {i: scores[i] + s for i, s in token_scores.items() if i in scores}
+
+        ranked = heapq.nsmallest(
+            limit,
+            scores,
+            key=lambda i: (-scores[i], len(self.securities[i]['name']), self.securities[i]['code'])
+        )
+        return [self.securities[i] for i in ranked]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_symbol_index():
+    """
+    Return the process-wide index, building it from the listing on first use
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    securities = load_listing()
+                except Exception as e:
+                    print(f"Error loading ASX listing {ASX_LISTING_PATH}: {e}")
+                    securities = []
+                _index = SymbolIndex(securities)
+    return _index
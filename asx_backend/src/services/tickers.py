@@ -0,0 +1,15 @@
+def to_asx_ticker(ticker):
+    """
+    Normalize a ticker to ASX format (upper case with a .AX suffix)
+    """
+    asx_ticker = ticker.strip().upper()
+    if not asx_ticker.endswith('.AX'):
+        asx_ticker += '.AX'
+    return asx_ticker
+
+
+def base_ticker(asx_ticker):
+    """
+    Strip the .AX suffix from a normalized ASX ticker
+    """
+    return asx_ticker[:-len('.AX')] if asx_ticker.endswith('.AX') else asx_ticker
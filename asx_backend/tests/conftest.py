@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Import the app's modules as src.* the way src/main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Demo quotes that do not tick while the tests run
+os.environ.setdefault('DEMO_TICK_SECONDS', '0')
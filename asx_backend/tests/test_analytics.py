@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+
+from src.services.analytics import (
+    SECONDS_PER_DAY, PriceSeries, beta, compute_metrics, ema, macd, rolling_mean, rsi, vwap, wilder
+)
+
+
+def _ema_reference(values, alpha):
+    # pandas ewm(adjust=True).mean(), one element at a time
+    out = []
+    numerator = denominator = 0.0
+    for value in values:
+        numerator = numerator * (1 - alpha) + value
+        denominator = denominator * (1 - alpha) + 1
+        out.append(numerator / denominator)
+    return np.array(out)
+
+
+def _walk(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def test_ema_matches_recursive_definition():
+    values = _walk(300)
+    np.testing.assert_allclose(ema(values, span=12), _ema_reference(values, 2 / 13), rtol=1e-10)
+    np.testing.assert_allclose(ema(values, alpha=0.1), _ema_reference(values, 0.1), rtol=1e-10)
+
+
+def test_ema_edge_cases():
+    assert len(ema([], span=5)) == 0
+    np.testing.assert_allclose(ema([1.0, 2.0, 3.0], alpha=1.0), [1.0, 2.0, 3.0])
+    np.testing.assert_allclose(ema([5.0] * 10, span=3), [5.0] * 10)
+
+
+def test_rolling_mean():
+    np.testing.assert_allclose(rolling_mean(np.arange(1.0, 6.0), 2), [1.5, 2.5, 3.5, 4.5])
+    assert len(rolling_mean(np.arange(3.0), 5)) == 0
+
+
+def _wilder_reference(values, period):
+    average = float(np.mean(values[:period]))
+    out = [average]
+    for value in values[period:]:
+        average = (average * (period - 1) + value) / period
+        out.append(average)
+    return np.array(out)
+
+
+def test_wilder_matches_recursive_definition():
+    values = np.abs(np.diff(_walk(300)))
+    np.testing.assert_allclose(wilder(values, 14), _wilder_reference(values, 14), rtol=1e-10)
+    np.testing.assert_allclose(wilder([1.0, 2.0, 3.0], 3), [2.0])
+    assert len(wilder([1.0, 2.0], 3)) == 0
+
+
+def test_rsi_uses_wilder_smoothing():
+    close = _walk(120)
+    deltas = np.diff(close)
+    gains = _wilder_reference(np.clip(deltas, 0, None), 14)
+    losses = _wilder_reference(np.clip(-deltas, 0, None), 14)
+    with np.errstate(divide='ignore'):
+        expected = 100 - 100 / (1 + gains / losses)
+    np.testing.assert_allclose(rsi(close, 14), expected, rtol=1e-9)
+
+
+def test_rsi_first_value_uses_simple_averages():
+    # Wilder's worked example: the first RSI compares plain sums of the first 14 moves
+    close = np.array([44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08, 45.89, 46.03, 45.61,
+                      46.28, 46.28, 46.00])
+    deltas = np.diff(close)
+    gains, losses = deltas[:14].clip(0).sum(), (-deltas[:14]).clip(0).sum()
+    values = rsi(close, 14)
+    assert len(values) == 2
+    assert values[0] == pytest.approx(100 - 100 / (1 + gains / losses))
+    assert values[1] == pytest.approx(100 - 100 / (1 + (gains * 13 / 14) / (losses * 13 / 14 + 0.28)))
+    assert round(values[0], 1) == 70.5
+
+
+def test_rsi_bounds():
+    assert len(rsi(np.arange(10.0), 14)) == 0
+    assert rsi(np.arange(1.0, 40.0), 14)[-1] == 100.0
+    assert rsi(np.arange(40.0, 1.0, -1), 14)[-1] == pytest.approx(0.0)
+
+
+def test_macd_lines():
+    close = _walk(200)
+    line, signal, hist = macd(close)
+    expected_line = _ema_reference(close, 2 / 13) - _ema_reference(close, 2 / 27)
+    np.testing.assert_allclose(line, expected_line, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(signal, _ema_reference(expected_line, 2 / 10), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(hist, line - signal)
+
+
+def test_vwap_weights_typical_price_by_volume():
+    high = [11.0, 12.0, 13.0]
+    low = [9.0, 10.0, 11.0]
+    close = [10.0, 11.0, 12.0]
+    volume = [100, 0, 300]
+    assert vwap(high, low, close, volume) == pytest.approx((10 * 100 + 12 * 300) / 400)
+    assert vwap(high, low, close, volume, window=1) == pytest.approx(12.0)
+
+
+def test_vwap_missing_values():
+    # A missing high falls back to the close; missing volume counts as zero
+    assert vwap([np.nan, 12.0], [9.0, 10.0], [10.0, 11.0], [100, np.nan]) == pytest.approx(10.0)
+    assert vwap([1.0], [1.0], [1.0], [0]) == 0.0
+
+
+def test_beta_of_scaled_returns():
+    days = np.arange(300) * SECONDS_PER_DAY
+    index_close = _walk(300, seed=1)
+    index_returns = np.diff(np.log(index_close))
+    asset_close = np.exp(np.concatenate([[0.0], np.cumsum(1.5 * index_returns)]))
+    assert beta(days, asset_close, days, index_close) == pytest.approx(1.5)
+
+
+def test_beta_aligns_on_trading_day():
+    days = np.arange(100) * SECONDS_PER_DAY
+    index_close = _walk(100, seed=2)
+    # Asset bars stamped mid-day and missing every fifth index day
+    keep = np.arange(100) % 5 != 0
+    asset_days = days[keep] + 3600
+    assert beta(asset_days, index_close[keep], days, index_close) == pytest.approx(1.0)
+
+
+def test_beta_needs_overlap():
+    assert beta([0, SECONDS_PER_DAY], [1.0, 2.0], [10 * SECONDS_PER_DAY], [1.0]) == 0.0
+    days = np.arange(10) * SECONDS_PER_DAY
+    assert beta(days, _walk(10), days, np.ones(10)) == 0.0
+
+
+def test_compute_metrics_on_series():
+    n = 300
+    close = _walk(n, seed=3)
+    series = PriceSeries(
+        np.arange(n) * SECONDS_PER_DAY, close, close * 1.01, close * 0.99, close,
+        np.full(n, 1000.0), close, [(n - 10) * SECONDS_PER_DAY], [0.5]
+    )
+    metrics = compute_metrics(series, index_series=series)
+    assert metrics['beta'] == pytest.approx(1.0)
+    assert metrics['52WeekHigh'] == pytest.approx(close[-252:].max() * 1.01, abs=1e-4)
+    assert metrics['sma50'] == pytest.approx(close[-50:].mean(), abs=1e-4)
+    assert metrics['dividendYieldIndicatedAnnual'] == pytest.approx(0.5 / close[-1] * 100, abs=1e-4)
+    assert compute_metrics(PriceSeries([], [], [], [], [], [])) == {}
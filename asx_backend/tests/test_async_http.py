@@ -0,0 +1,125 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from src.services.async_http import AsyncHTTPClient, AsyncHTTPError
+from src.services.rate_limit import UpstreamGovernor, _retry_after, is_rate_limited
+
+BODY = json.dumps({'c': 101.5, 'symbol': 'CBA.AX'}).encode()
+
+
+def _response(status, headers, body):
+    lines = [f'HTTP/1.1 {status} X'] + [f'{name}: {value}' for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def _chunked(body, size=7):
+    chunks = [body[i:i + size] for i in range(0, len(body), size)]
+    return b''.join(b'%x\r\n%s\r\n' % (len(chunk), chunk) for chunk in chunks) + b'0\r\n\r\n'
+
+
+ROUTES = {
+    '/plain': _response(200, {'Content-Length': len(BODY)}, BODY),
+    '/gzip': _response(200, {'Content-Length': len(gzip.compress(BODY)), 'Content-Encoding': 'gzip'},
+                       gzip.compress(BODY)),
+    '/chunked': _response(200, {'Transfer-Encoding': 'chunked'}, _chunked(BODY)),
+    '/limited': _response(429, {'Content-Length': 5, 'Retry-After': '7'}, b'slow!'),
+    '/big': _response(200, {'Transfer-Encoding': 'chunked'}, _chunked(b'x' * 5000, 1000)),
+    '/bomb': _response(200, {'Content-Length': len(gzip.compress(b'0' * 100000)), 'Content-Encoding': 'gzip'},
+                       gzip.compress(b'0' * 100000)),
+}
+
+
+async def _serve(handle_paths):
+    async def handle(reader, writer):
+        handle_paths.append('connect')
+        while True:
+            request = await reader.readuntil(b'\r\n\r\n')
+            path = request.split(b' ')[1].decode().split('?')[0]
+            handle_paths.append(path)
+            writer.write(ROUTES[path])
+            await writer.drain()
+
+    async def guarded(reader, writer):
+        try:
+            await handle(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    server = await asyncio.start_server(guarded, '127.0.0.1', 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+def run(scenario, **client_options):
+    async def main():
+        paths = []
+        server, base = await _serve(paths)
+        client = AsyncHTTPClient(**client_options)
+        try:
+            return await scenario(client, base), paths
+        finally:
+            await client.close()
+            server.close()
+    return asyncio.run(main())
+
+
+def test_plain_gzip_and_chunked_bodies():
+    async def scenario(client, base):
+        return [await client.get_json(f"{base}{path}", params={'symbol': 'CBA.AX'})
+                for path in ('/plain', '/gzip', '/chunked', '/plain')]
+
+    results, paths = run(scenario)
+    assert results == [json.loads(BODY)] * 4
+    # One keep-alive connection for every request
+    assert paths == ['connect', '/plain', '/gzip', '/chunked', '/plain']
+
+
+def test_429_carries_retry_after():
+    async def scenario(client, base):
+        with pytest.raises(AsyncHTTPError) as caught:
+            await client.get_json(f"{base}/limited")
+        return caught.value
+
+    error, _ = run(scenario)
+    assert error.status_code == 429
+    assert is_rate_limited(error)
+    assert _retry_after(error) == 7.0
+
+
+def test_governor_waits_out_async_retry_after(monkeypatch):
+    governor = UpstreamGovernor({('finnhub', 'quote'): (100.0, 5)})
+    _, bucket = governor.bucket_for('finnhub', 'quote')
+    waits = []
+    monkeypatch.setattr(bucket, 'throttled', waits.append)
+
+    async def scenario(client, base):
+        with pytest.raises(AsyncHTTPError):
+            await governor.call_async('finnhub', 'quote', lambda: client.get_json(f"{base}/limited"))
+
+    run(scenario)
+    assert waits and set(waits) == {7.0}
+
+
+@pytest.mark.parametrize('path', ['/big', '/bomb'])
+def test_bodies_over_the_limit_are_refused(path):
+    async def scenario(client, base):
+        with pytest.raises(AsyncHTTPError, match='over 4096 bytes'):
+            await client.get_json(f"{base}{path}")
+
+    run(scenario, max_body=4096)
+
+
+def test_connection_failure_is_an_http_error():
+    async def main():
+        client = AsyncHTTPClient(connect_timeout=1)
+        try:
+            with pytest.raises(AsyncHTTPError) as caught:
+                # Nothing listens on the discard port
+                await client.get_json('http://127.0.0.1:9/quote')
+            return caught.value
+        finally:
+            await client.close()
+
+    assert asyncio.run(main()).status_code == 0
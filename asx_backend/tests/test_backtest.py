@@ -0,0 +1,29 @@
+import pytest
+
+from src.services.backtest import (
+    BacktestRequestError, PricePanel, backtest, get_sweep_pool, parameter_grid, shutdown_sweep_pool, sweep
+)
+from src.services.demo_data import demo_ohlcv
+
+
+@pytest.mark.parametrize('cost_bps', [float('nan'), float('inf'), -1.0])
+def test_rejects_bad_cost(cost_bps):
+    with pytest.raises(BacktestRequestError):
+        backtest('equal_weight', tickers=['CBA', 'BHP'], years=1, cost_bps=cost_bps)
+
+
+def test_sweep_pool_matches_in_process_sweep():
+    tickers = ['CBA', 'BHP', 'WES', 'WOW', 'CSL', 'NAB']
+    panel = PricePanel.from_series({t: demo_ohlcv(t, 600) for t in tickers})
+    grid = parameter_grid('sma_crossover', {'fast': [10, 20, 50], 'slow': [100, 200]})
+
+    inline = sweep(panel, 'sma_crossover', grid, cost_bps=10.0, processes=1)
+    try:
+        pooled = sweep(panel, 'sma_crossover', grid, cost_bps=10.0, processes=2)
+        pool = get_sweep_pool(2)
+        assert sweep(panel, 'sma_crossover', grid, cost_bps=10.0, processes=2) == pooled
+        # Later sweeps reuse the same workers
+        assert get_sweep_pool(2) is pool
+    finally:
+        shutdown_sweep_pool()
+    assert pooled == inline
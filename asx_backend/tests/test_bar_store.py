@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.services.analytics import SECONDS_PER_DAY, PriceSeries
+from src.services.bar_store import BarStore
+
+
+def _series(days, close, adjclose, dividends=()):
+    days = np.asarray(days)
+    close = np.asarray(close, dtype=np.float64)
+    return PriceSeries(
+        days * SECONDS_PER_DAY, close, close, close, close, np.full(len(days), 100.0), adjclose,
+        [d * SECONDS_PER_DAY for d, _ in dividends], [a for _, a in dividends]
+    )
+
+
+def _store(tmp_path):
+    store = BarStore(str(tmp_path / 'bars.db'))
+    store.merge('BHP.AX', _series(range(10), np.arange(10.0, 20.0), np.arange(9.0, 19.0), [(3, 0.5)]))
+    return store
+
+
+def test_same_basis_tail_is_not_rebased(tmp_path):
+    store = _store(tmp_path)
+    # The last stored day may be revised mid-session without re-basing
+    tail = _series(range(6, 12), [16.0, 17.0, 18.0, 19.5, 20.0, 21.0], [15.0, 16.0, 17.0, 18.5, 19.0, 20.0])
+    assert not store.rebased('BHP.AX', tail)
+    assert not store.rebased('CBA.AX', tail)
+
+
+def test_changed_adjusted_close_is_rebased(tmp_path):
+    store = _store(tmp_path)
+    tail = _series(range(6, 12), np.arange(16.0, 22.0), np.arange(14.0, 20.0))
+    assert store.rebased('BHP.AX', tail)
+
+
+def test_new_dividend_is_rebased(tmp_path):
+    store = _store(tmp_path)
+    tail = _series(range(8, 12), np.arange(18.0, 22.0), np.arange(17.0, 21.0), [(3, 0.5), (9, 0.25)])
+    assert store.rebased('BHP.AX', tail)
+
+
+def test_replace_rewrites_the_history(tmp_path):
+    store = _store(tmp_path)
+    store.replace('BHP.AX', _series(range(5, 12), np.arange(15.0, 22.0), np.arange(15.0, 22.0)))
+    series = store.load('BHP.AX')
+    assert store.first_timestamp('BHP.AX') == 5 * SECONDS_PER_DAY
+    np.testing.assert_allclose(series.adjclose, series.close)
+    assert len(series.dividend_amounts) == 0
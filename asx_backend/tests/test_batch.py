@@ -0,0 +1,86 @@
+import json
+import threading
+
+import pytest
+from flask import Flask
+
+from src.services import batch
+from src.services.batch import batch_response
+from src.services.rate_limit import BATCH, current_priority
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(batch, 'BATCH_MAX_TICKERS', 5)
+    calls = []
+    release = threading.Event()
+
+    def analyze(ticker):
+        calls.append((ticker, current_priority()))
+        if ticker == 'BAD':
+            raise ValueError('no data')
+        if ticker == 'SLOW':
+            release.wait(5)
+        return {'ticker': ticker}
+
+    app = Flask(__name__)
+    app.add_url_rule('/analyze/batch', 'batch', lambda: batch_response(analyze), methods=['GET', 'POST'])
+    client = app.test_client()
+    client.calls, client.release = calls, release
+    return client
+
+
+def test_tickers_are_normalized_and_deduplicated(client):
+    response = client.post('/analyze/batch', json={'tickers': ['cba', 'CBA.AX', ' bhp ', '', 7, 'CBA']})
+    payload = response.get_json()
+    assert response.status_code == 200
+    assert payload['tickers'] == ['CBA.AX', 'BHP.AX']
+    assert sorted(ticker for ticker, _ in client.calls) == ['BHP', 'CBA']
+    assert payload['count'] == 2
+    assert client.get('/analyze/batch?tickers=wes,WES.AX,wow').get_json()['tickers'] == ['WES.AX', 'WOW.AX']
+    assert client.post('/analyze/batch', json={'tickers': 'nab,NAB'}).get_json()['tickers'] == ['NAB.AX']
+
+
+def test_batch_work_runs_at_batch_priority(client):
+    client.get('/analyze/batch?tickers=CBA')
+    assert client.calls == [('CBA', BATCH)]
+
+
+@pytest.mark.parametrize('body', [{}, {'tickers': []}, {'tickers': 5}, ['CBA'], 'CBA',
+                                  {'tickers': ['A', 'B', 'C', 'D', 'E', 'F']}])
+def test_invalid_requests(client, body):
+    response = client.post('/analyze/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid batch request'
+    assert client.calls == []
+
+
+def test_errors_are_reported_per_ticker(client):
+    payload = client.get('/analyze/batch?tickers=CBA,BAD').get_json()
+    assert payload['results'] == {'CBA.AX': {'ticker': 'CBA'}}
+    assert payload['errors'] == {'BAD.AX': {
+        'error': 'Failed to analyze stock BAD', 'message': 'no data', 'asx_ticker': 'BAD.AX'
+    }}
+
+
+def test_stream_yields_lines_as_tickers_finish(client):
+    response = client.get('/analyze/batch?tickers=SLOW,CBA,BAD&stream=1', buffered=False)
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.response
+    # CBA and BAD arrive while SLOW is still running
+    first = [json.loads(next(lines)) for _ in range(2)]
+    assert {line['asx_ticker'] for line in first} == {'CBA.AX', 'BAD.AX'}
+    client.release.set()
+    last = json.loads(next(lines))
+    assert last == {'asx_ticker': 'SLOW.AX', 'ok': True, 'data': {'ticker': 'SLOW'}}
+    bad = next(line for line in first if line['asx_ticker'] == 'BAD.AX')
+    assert bad['ok'] is False and bad['error']['message'] == 'no data'
+    response.close()
+
+
+def test_accept_header_asks_for_a_stream(client):
+    response = client.get('/analyze/batch?tickers=CBA', headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.data.splitlines()] == [
+        {'asx_ticker': 'CBA.AX', 'ok': True, 'data': {'ticker': 'CBA'}}
+    ]
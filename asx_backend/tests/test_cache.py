@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+from src.services.cache import TieredCache
+
+
+def test_async_tier_io_runs_off_the_event_loop(tmp_path):
+    cache = TieredCache(db_path=str(tmp_path / 'cache.db'))
+    loop_thread = []
+    disk_threads = []
+    get, set_ = cache.disk.get, cache.disk.set
+    cache.disk.get = lambda *args: disk_threads.append(threading.get_ident()) or get(*args)
+    cache.disk.set = lambda *args: disk_threads.append(threading.get_ident()) or set_(*args)
+
+    async def fetch():
+        return {'c': 1.0}
+
+    async def main():
+        loop_thread.append(threading.get_ident())
+        first = await cache.get_or_fetch_async('quote', 'finnhub:quote:BHP.AX', fetch)
+        cache.memory.delete('finnhub:quote:BHP.AX')
+        # Served from the disk tier and promoted back into memory
+        second = await cache.get_or_fetch_async('quote', 'finnhub:quote:BHP.AX', fetch)
+        return first, second
+
+    assert asyncio.run(main()) == ({'c': 1.0}, {'c': 1.0})
+    assert len(disk_threads) == 3
+    assert loop_thread[0] not in disk_threads
+    assert cache.memory.get('finnhub:quote:BHP.AX')[0] == {'c': 1.0}
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.services import demo_data
+from src.services.demo_data import (
+    current_tick, demo_ohlcv, demo_snapshot, demo_snapshots, ticker_keys, uniforms
+)
+
+NOW = 1760000000.0
+TICKERS = ['CBA', 'BHP', 'ZZZ', 'XYZ', 'WES']
+
+
+def test_same_seed_same_output():
+    assert demo_snapshots(TICKERS, now=NOW) == demo_snapshots(TICKERS, now=NOW)
+    first = demo_ohlcv('ZZZ', 100, end='2025-06-30')
+    again = demo_ohlcv('ZZZ', 100, end='2025-06-30')
+    np.testing.assert_array_equal(first.close, again.close)
+    np.testing.assert_array_equal(first.dividend_amounts, again.dividend_amounts)
+
+
+def test_seed_changes_the_draws():
+    keys = ticker_keys(TICKERS)
+    np.testing.assert_array_equal(keys, ticker_keys(TICKERS, seed=demo_data.DEMO_SEED))
+    assert not np.array_equal(uniforms(keys, 4), uniforms(ticker_keys(TICKERS, seed=demo_data.DEMO_SEED + 1), 4))
+
+
+def test_batch_matches_single_ticker():
+    batch = demo_snapshots(TICKERS, now=NOW)
+    assert batch == [demo_snapshot(ticker, now=NOW) for ticker in TICKERS]
+    # Lower case is the same ticker
+    assert demo_snapshots(['cba'], now=NOW) == batch[:1]
+
+
+def test_ohlcv_stable_across_overlapping_ranges():
+    short = demo_ohlcv('BHP', 60, last_price=40.0, end='2025-06-30')
+    longer = demo_ohlcv('BHP', 200, last_price=40.0, end='2025-06-30')
+    shifted = demo_ohlcv('BHP', 200, last_price=40.0, end='2025-05-30')
+    np.testing.assert_array_equal(short.timestamps, longer.timestamps[-60:])
+    np.testing.assert_allclose(short.close, longer.close[-60:])
+    np.testing.assert_allclose(short.volume, longer.volume[-60:])
+    # A range ending earlier has the same daily moves over the shared days
+    shared = np.intersect1d(longer.timestamps, shifted.timestamps)
+    a = np.log(longer.close[np.isin(longer.timestamps, shared)])
+    b = np.log(shifted.close[np.isin(shifted.timestamps, shared)])
+    np.testing.assert_allclose(np.diff(a), np.diff(b), atol=1e-12)
+
+
+def test_quotes_tick(monkeypatch):
+    monkeypatch.setattr(demo_data, 'DEMO_TICK_SECONDS', 60.0)
+    assert current_tick(NOW) == (int(NOW // 60), int(NOW // 60) * 60)
+    first = demo_snapshots(['CBA'], now=NOW)[0]['quote']
+    assert demo_snapshots(['CBA'], now=NOW + 1)[0]['quote'] == first
+    later = demo_snapshots(['CBA'], now=NOW + 60)[0]['quote']
+    assert later['c'] != first['c'] and later['t'] == first['t'] + 60
+
+    monkeypatch.setattr(demo_data, 'DEMO_TICK_SECONDS', 0.0)
+    assert current_tick(NOW) == (0, int(NOW - NOW % 86400))
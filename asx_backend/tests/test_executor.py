@@ -0,0 +1,49 @@
+import time
+
+from src.services.executor import fan_out
+from src.services.metrics import upstream_timeouts
+from src.services.rate_limit import BATCH, INTERACTIVE, current_priority, upstream_priority
+
+
+def _sleeps(seconds, value):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def test_calls_run_concurrently_within_the_deadline():
+    start = time.monotonic()
+    results = fan_out({name: (_sleeps(0.2, name), None) for name in ('profile', 'quote', 'financials')},
+                      'CBA.AX', timeout=1.0)
+    assert results == {'profile': 'profile', 'quote': 'quote', 'financials': 'financials'}
+    assert time.monotonic() - start < 0.5
+
+
+def test_deadline_is_shared_not_per_call():
+    before = upstream_timeouts._values.get(upstream_timeouts._key({'section': 'slow_a'}), 0)
+    start = time.monotonic()
+    results = fan_out({
+        'fast': (_sleeps(0.05, 'fast'), None),
+        'slow_a': (_sleeps(1.0, 'late'), {}),
+        'slow_b': (_sleeps(1.0, 'late'), []),
+    }, 'CBA.AX', timeout=0.3)
+    elapsed = time.monotonic() - start
+    assert results == {'fast': 'fast', 'slow_a': {}, 'slow_b': []}
+    # Waiting on the second slow call did not restart the clock
+    assert elapsed < 0.55
+    assert upstream_timeouts._values[upstream_timeouts._key({'section': 'slow_a'})] == before + 1
+
+
+def test_failed_call_falls_back_to_its_default():
+    def broken():
+        raise RuntimeError('upstream down')
+
+    results = fan_out({'quote': (broken, {'c': None}), 'profile': (lambda: {'name': 'CBA'}, {})}, 'CBA.AX')
+    assert results == {'quote': {'c': None}, 'profile': {'name': 'CBA'}}
+
+
+def test_calls_inherit_the_callers_priority():
+    assert fan_out({'p': (current_priority, None)}, 'CBA.AX') == {'p': INTERACTIVE}
+    with upstream_priority(BATCH):
+        assert fan_out({'p': (current_priority, None)}, 'CBA.AX') == {'p': BATCH}
@@ -0,0 +1,89 @@
+import sys
+import textwrap
+import threading
+
+import pytest
+from flask import Flask
+
+from src.services.lazy_routes import BlueprintGroup, LazyBlueprints
+
+MODULE = 'lazy_probe_routes'
+
+
+@pytest.fixture
+def lazy(tmp_path, monkeypatch):
+    (tmp_path / f'{MODULE}.py').write_text(textwrap.dedent('''
+        from flask import Blueprint, current_app
+
+        probe_bp = Blueprint('probe', __name__)
+
+        @probe_bp.route('/probe/<name>')
+        def probe(name):
+            return {'name': name, 'setting': current_app.config['SETTING'], 'ready': current_app.config.get('READY')}
+    '''))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, MODULE, raising=False)
+
+    app = Flask(__name__)
+    app.config['SETTING'] = 'main'
+    app.add_url_rule('/health', 'health', lambda: 'ok')
+    setups = []
+
+    def setup(group_app):
+        setups.append(group_app)
+        group_app.config['READY'] = True
+
+    group = BlueprintGroup('probe', ['/api/probe'], [f'{MODULE}:probe_bp'], setup=setup)
+    configured = []
+    app.wsgi_app = LazyBlueprints(app, [group], configure=configured.append)
+    yield app, setups, configured
+    sys.modules.pop(MODULE, None)
+
+
+def test_group_loads_on_first_request(lazy):
+    app, setups, configured = lazy
+    client = app.test_client()
+    assert client.get('/health').data == b'ok'
+    assert MODULE not in sys.modules
+    assert setups == []
+
+    response = client.get('/api/probe/x')
+    assert response.get_json() == {'name': 'x', 'setting': 'main', 'ready': True}
+    assert MODULE in sys.modules
+    assert client.get('/api/probe/y').get_json()['name'] == 'y'
+    # Built, configured and set up once
+    assert len(setups) == 1 and configured == setups
+    assert 'probe' in app.wsgi_app.load_seconds
+
+
+def test_prefix_matches_whole_segments(lazy):
+    app, setups, _ = lazy
+    client = app.test_client()
+    # Served (as a 404) by the main app without loading the group
+    assert client.get('/api/probes').status_code == 404
+    assert MODULE not in sys.modules and setups == []
+    # The prefix itself belongs to the group
+    assert client.get('/api/probe').status_code == 404
+    assert len(setups) == 1
+
+
+def test_concurrent_first_requests_build_once(lazy):
+    app, setups, _ = lazy
+    start = threading.Barrier(8)
+
+    def request():
+        start.wait()
+        assert app.test_client().get('/api/probe/z').status_code == 200
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(setups) == 1
+
+
+def test_load_all(lazy):
+    app, setups, _ = lazy
+    assert len(app.wsgi_app.load_all()) == 1
+    assert len(setups) == 1
@@ -0,0 +1,168 @@
+import numpy as np
+import pytest
+
+from src.services.analytics import PriceSeries, compute_metrics, ema, max_drawdown
+from src.services.demo_data import demo_ohlcv
+from src.services.live_metrics import (
+    METRICS, AdjustedEma, RollingExtreme, RollingWindow, TickerMetrics, WilderAverage
+)
+
+
+def _head(series, bars, start=0):
+    # Bars start..bars with the dividends paid over them, like the chart
+    # tail update() is given
+    paid = (series.dividend_timestamps >= series.timestamps[start]) & (
+        series.dividend_timestamps <= series.timestamps[bars - 1]
+    )
+    return PriceSeries(
+        series.timestamps[start:bars], series.open[start:bars], series.high[start:bars], series.low[start:bars],
+        series.close[start:bars], series.volume[start:bars], series.adjclose[start:bars],
+        series.dividend_timestamps[paid], series.dividend_amounts[paid]
+    )
+
+
+def _assert_matches(state, series, index, price=None):
+    live = state.metrics(price=price, index=TickerMetrics.from_series(index).index_year())
+    full = compute_metrics(series, index, price=price)
+    assert set(live) == set(full)
+    for name in full:
+        assert np.isclose(live[name], full[name], rtol=1e-6, atol=2e-4), (name, live[name], full[name])
+
+
+@pytest.fixture(scope='module')
+def index():
+    return demo_ohlcv('XJO', 600, last_price=7000.0)
+
+
+@pytest.mark.parametrize('ticker,bars', [('CBA', 600), ('ZZZ', 260), ('BHP', 30), ('ABC', 5)])
+def test_seeded_state_matches_compute_metrics(index, ticker, bars):
+    series = demo_ohlcv(ticker, bars)
+    series.high[::37] = np.nan
+    _assert_matches(TickerMetrics.from_series(series), series, index)
+
+
+def test_incremental_bars_match_compute_metrics(index):
+    series = demo_ohlcv('CBA', 400)
+    state = TickerMetrics.from_series(_head(series, 300))
+    for bars in range(301, 401):
+        assert state.update(_head(series, bars, bars - 3))
+        if bars % 25 == 0:
+            _assert_matches(state, _head(series, bars), index, price=float(series.close[bars - 1]))
+
+
+def test_same_day_replacement_matches_compute_metrics(index):
+    series = demo_ohlcv('WES', 400)
+    state = TickerMetrics.from_series(_head(series, 399))
+    last = len(series) - 1
+    # An intraday bar for the last day, then the final one
+    state.push_bar(
+        series.timestamps[last] + 3600, series.open[last], series.high[last] * 1.02, series.low[last] * 0.98,
+        series.close[last] * 1.01, series.adjclose[last] * 1.01, series.volume[last] / 2
+    )
+    state.metrics(price=float(series.close[last]) * 1.01)
+    assert state.update(_head(series, 400, 397))
+    _assert_matches(state, series, index)
+
+
+def test_identical_bar_changes_nothing():
+    series = demo_ohlcv('NAB', 300)
+    state = TickerMetrics.from_series(series)
+    state.metrics()
+    version = state.bar_version
+    assert state.update(_head(series, 300, 297))
+    assert state.bar_version == version
+    assert not state.dirty
+    state.push_bar(*(float(v) for v in state.bars[-1][:5]), state.bars[-1][5], state.bars[-1][6] + 1)
+    assert state.bar_version != version
+    assert 'vwap20Day' in state.dirty
+
+
+def test_index_version_changes_with_rebuilt_index(index):
+    state = TickerMetrics.from_series(demo_ohlcv('CBA', 300))
+    state.metrics(index=TickerMetrics.from_series(index).index_year())
+    assert not state.dirty
+    # A new state over the same bars still counts as a different index
+    state.set_index(TickerMetrics.from_series(index).index_year())
+    assert state.dirty == {name for name, (events, _) in METRICS.items() if 'index' in events}
+
+
+def test_rolling_window():
+    values = np.random.default_rng(3).normal(5, 2, 40)
+    window = RollingWindow(10)
+    for i, value in enumerate(values):
+        window.push(value)
+        recent = values[max(0, i - 9):i + 1]
+        assert len(window) == len(recent)
+        assert window.mean() == pytest.approx(recent.mean())
+        if len(recent) > 1:
+            assert window.std() == pytest.approx(recent.std(ddof=1))
+    window.replace(100.0)
+    recent = np.append(values[-10:-1], 100.0)
+    assert window.mean() == pytest.approx(recent.mean())
+    assert window.std() == pytest.approx(recent.std(ddof=1))
+    assert RollingWindow(3).std() == 0.0
+
+
+@pytest.mark.parametrize('largest', [True, False])
+def test_rolling_extreme(largest):
+    values = np.random.default_rng(5).integers(0, 20, 60).astype(float)
+    values[[7, 30, 31]] = np.nan
+    extreme = RollingExtreme(8, largest=largest)
+    pick = np.nanargmax if largest else np.nanargmin
+    for i, value in enumerate(values):
+        extreme.push(value)
+        start = max(0, i - 7)
+        recent = values[start:i + 1]
+        if np.isnan(recent).all():
+            assert extreme.best() is None
+            continue
+        # Ties keep the earliest position
+        assert extreme.best() == (start + pick(recent), recent[pick(recent)])
+    extreme.replace(1000.0 if largest else -1000.0)
+    assert extreme.best() == (len(values) - 1, 1000.0 if largest else -1000.0)
+
+
+def test_adjusted_ema():
+    values = np.random.default_rng(9).normal(50, 5, 100)
+    seeded, pushed = AdjustedEma(2 / 13), AdjustedEma(2 / 13)
+    seeded.seed(values)
+    for value in values:
+        pushed.push(value)
+    expected = ema(values, span=12)[-1]
+    assert seeded.value == pytest.approx(expected)
+    assert pushed.value == pytest.approx(expected)
+    seeded.replace(60.0)
+    assert seeded.value == pytest.approx(ema(np.append(values[:-1], 60.0), span=12)[-1])
+    assert AdjustedEma(0.5).value == 0.0
+
+
+def _wilder(values, period):
+    average = float(np.mean(values[:period]))
+    for value in values[period:]:
+        average = (average * (period - 1) + value) / period
+    return average
+
+
+@pytest.mark.parametrize('length', [1, 10, 14, 15, 100])
+def test_wilder_average(length):
+    values = np.abs(np.random.default_rng(11).normal(0, 1, length))
+    seeded, pushed = WilderAverage(14), WilderAverage(14)
+    seeded.seed(values)
+    for value in values:
+        pushed.push(value)
+    if length >= 14:
+        assert seeded.value == pytest.approx(_wilder(values, 14))
+    assert pushed.value == pytest.approx(seeded.value)
+    assert seeded.count == pushed.count == length
+    seeded.replace(5.0)
+    revised = np.append(values[:-1], 5.0)
+    expected = _wilder(revised, 14) if length >= 14 else revised.mean()
+    assert seeded.value == pytest.approx(expected)
+
+
+def test_max_drawdown_window_is_the_last_year():
+    series = demo_ohlcv('CSL', 600)
+    state = TickerMetrics.from_series(series)
+    assert state.metrics()['maxDrawdown52Week'] == pytest.approx(
+        round(max_drawdown(series.adjclose[-252:]) * 100.0, 4)
+    )
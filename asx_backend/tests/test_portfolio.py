@@ -0,0 +1,76 @@
+import time
+
+import pytest
+from flask import Flask
+
+from src.routes.portfolio import portfolio_bp
+from src.routes.user import user_bp
+from src.services.batch import BATCH_MAX_WORKERS
+from src.services.database import ensure_schema, init_database
+from src.services.portfolio import gather
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    init_database(app, f"sqlite:///{tmp_path / 'app.db'}")
+    ensure_schema(app)
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(portfolio_bp, url_prefix='/api')
+    client = app.test_client()
+    assert client.post('/api/users', json={'username': 'alice', 'email': 'alice@example.com'}).status_code == 201
+    return client
+
+
+def test_gather_deadline_scales_with_queued_calls():
+    tickers = [f'T{i}.AX' for i in range(BATCH_MAX_WORKERS * 3)]
+
+    def slow(asx_ticker):
+        time.sleep(0.1)
+        return asx_ticker
+
+    # Each call fits the per-call timeout, but three rounds exceed one
+    results, errors = gather(slow, tickers, 'quote', timeout=0.2)
+    assert errors == {}
+    assert sorted(results) == sorted(tickers)
+
+
+def test_gather_reports_timeouts_and_errors():
+    def fetch(asx_ticker):
+        if asx_ticker == 'BAD.AX':
+            raise ValueError('no data')
+        time.sleep(0.5 if asx_ticker == 'SLOW.AX' else 0)
+        return 1
+
+    results, errors = gather(fetch, ['OK.AX', 'BAD.AX', 'SLOW.AX'], 'quote', timeout=0.1)
+    assert results == {'OK.AX': 1}
+    assert errors['BAD.AX'] == 'no data'
+    assert errors['SLOW.AX'].startswith('Timed out fetching quote')
+
+
+def test_create_portfolio_rejects_non_object_body(client):
+    for body in (['x'], 'x', 3):
+        response = client.post('/api/users/1/portfolios', json=body)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid portfolio request'
+    response = client.post('/api/users/1/portfolios', json={'name': 'Main', 'holdings': 5})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('field', ['quantity', 'cost_basis'])
+@pytest.mark.parametrize('value', ['nan', 'inf', '-inf', -1])
+def test_holdings_must_be_finite(client, field, value):
+    holding = {'ticker': 'CBA', 'quantity': 10, 'cost_basis': 100, field: value}
+    response = client.post('/api/users/1/portfolios', json={'name': 'Main', 'holdings': [holding]})
+    assert response.status_code == 400
+
+    created = client.post('/api/users/1/portfolios', json={'name': 'Other'})
+    assert created.status_code == 201
+    portfolio_id = created.get_json()['id']
+    response = client.put(f'/api/portfolios/{portfolio_id}/holdings', json=holding)
+    assert response.status_code == 400
+    # Nothing half-written was left in the session
+    holding[field] = 1
+    response = client.put(f'/api/portfolios/{portfolio_id}/holdings', json=holding)
+    assert response.status_code == 200
+    assert [h['ticker'] for h in response.get_json()['holdings']] == ['CBA.AX']
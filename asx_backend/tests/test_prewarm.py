@@ -0,0 +1,19 @@
+from src.services.prewarm import TickerHeat
+
+
+def test_hottest_ranks_by_request_count():
+    heat = TickerHeat(seeds=['CBA'])
+    for _ in range(3):
+        heat.record('bhp')
+    heat.record('wes')
+    assert [ticker for ticker, _ in heat.hottest(3)] == ['BHP.AX', 'WES.AX', 'CBA.AX']
+
+
+def test_tracked_tickers_are_capped():
+    heat = TickerHeat(seeds=[], max_tracked=100)
+    for _ in range(5):
+        heat.record('bhp')
+    for i in range(1000):
+        heat.record(f'X{i}')
+    assert len(heat.hottest(1000)) <= 100
+    assert heat.hottest(1)[0][0] == 'BHP.AX'
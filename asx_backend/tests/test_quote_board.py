@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.services.quote_board import QuoteBoard, QuoteBoardFetcher, remove_stale_board
+
+
+@pytest.fixture
+def board():
+    board = QuoteBoard.create(name=f'asxqb_test_{os.getpid()}', capacity=8, interval=0.05)
+    board.add(['CBA', 'BHP'])
+    yield board
+    board.close()
+
+
+def test_read_skips_quotes_older_than_max_age(board):
+    row = board.slots()['CBA']
+    board.write(row, {'c': 100.0, 't': 1}, now=1000.0)
+    assert board.read(row)['c'] == 100.0
+    assert board.read(row, max_age=1.0, now=1000.5)['c'] == 100.0
+    assert board.read(row, max_age=1.0, now=1002.0) is None
+
+
+def test_stale_quote_waits_for_fetcher_refresh(board):
+    calls = []
+
+    def fetch(symbol):
+        calls.append(symbol)
+        return {'c': 101.0, 't': 2}
+
+    row = board.slots()['CBA']
+    # Written long ago and nobody asked since, so the fetcher is idle
+    board.write(row, {'c': 100.0, 't': 1}, now=time.time() - 3600)
+    fetcher = QuoteBoardFetcher(board, fetch, interval=0.05, active=60)
+    assert fetcher.run_once() == 0
+
+    thread = threading.Thread(target=fetcher.run, daemon=True)
+    thread.start()
+    try:
+        quote = board.quote('CBA', wait=2.0)
+    finally:
+        fetcher.stop.set()
+        thread.join()
+    assert quote['c'] == 101.0
+    assert calls[0] == 'CBA'
+
+
+def test_stale_quote_not_served_without_fetcher(board):
+    board.write(board.slots()['BHP'], {'c': 40.0, 't': 1}, now=time.time() - 3600)
+    assert board.quote('BHP', wait=0.05) is None
+
+
+def test_remove_stale_board_refuses_live_fetcher(board):
+    board.header['heartbeat'] = time.time()
+    with pytest.raises(SystemExit):
+        remove_stale_board(board.shm.name)
+    # Still there for the live fetcher and its readers
+    reader = QuoteBoard.attach(board.shm.name)
+    assert reader.slots() == {'CBA': 0, 'BHP': 1}
+    del reader
+
+
+def test_remove_stale_board_unlinks_dead_board():
+    name = f'asxqb_dead_{os.getpid()}'
+    board = QuoteBoard.create(name=name, capacity=4, interval=0.05)
+    board.header['heartbeat'] = time.time() - 3600
+    board.owner = False
+    board.close()
+    remove_stale_board(name)
+    with pytest.raises(FileNotFoundError):
+        QuoteBoard.attach(name)
+    # Nothing to remove
+    remove_stale_board(name)
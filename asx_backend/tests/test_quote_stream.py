@@ -0,0 +1,33 @@
+import threading
+
+from src.services.quote_stream import QuoteHub, sse_events
+
+
+def _hub():
+    fetched = threading.Event()
+
+    def fetch_quote(asx_ticker):
+        fetched.set()
+        return {'c': 1.0, 'd': 0.1, 'dp': 10.0, 'h': 1.1, 'l': 0.9, 't': 1}
+
+    return QuoteHub(fetch_quote, interval=60), fetched
+
+
+def test_unstarted_stream_does_not_subscribe():
+    hub, fetched = _hub()
+    events = sse_events(hub, ['bhp'])
+    assert hub.stats() == {'tickers': 0, 'subscriptions': 0}
+    events.close()
+    assert not fetched.is_set()
+
+
+def test_stream_subscribes_on_first_event_and_closes():
+    hub, fetched = _hub()
+    events = sse_events(hub, ['bhp', 'BHP.AX', 'cba'])
+    assert next(events) == 'retry: 5000\n\n'
+    assert hub.stats() == {'tickers': 2, 'subscriptions': 2}
+    event = next(events)
+    assert event.startswith('event: quote\ndata: ')
+    assert '"c": 1.0' in event
+    events.close()
+    assert hub.stats() == {'tickers': 0, 'subscriptions': 0}
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from src.services import rate_limit
+from src.services.rate_limit import (
+    BATCH, BACKGROUND, INTERACTIVE, RateLimitExceeded, TokenBucket, UpstreamGovernor,
+    is_rate_limited, parse_rate_limits, upstream_priority
+)
+
+
+class Throttled(Exception):
+    def __init__(self, retry_after):
+        super().__init__('HTTP 429 Too Many Requests')
+        self.status_code = 429
+        self.response = type('Response', (), {'headers': {'Retry-After': str(retry_after)}})()
+
+
+def _drained(rate):
+    bucket = TokenBucket(rate, 1)
+    bucket.acquire(INTERACTIVE, 1)
+    return bucket
+
+
+def _wait_for_waiters(bucket, count):
+    deadline = time.monotonic() + 2
+    while bucket.snapshot()['waiting'] < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_waiters_take_tokens_in_priority_order():
+    bucket = _drained(5.0)
+    order = []
+
+    def take(name, priority):
+        bucket.acquire(priority, 5)
+        order.append(name)
+
+    threads = []
+    for count, (name, priority) in enumerate([('batch', BATCH), ('background', BACKGROUND),
+                                              ('interactive', INTERACTIVE)], start=1):
+        thread = threading.Thread(target=take, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        _wait_for_waiters(bucket, count)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ['interactive', 'background', 'batch']
+
+
+def test_equal_priority_is_first_come_first_served():
+    bucket = _drained(10.0)
+    order = []
+    threads = []
+    for i in range(3):
+        thread = threading.Thread(target=lambda i=i: (bucket.acquire(BATCH, 5), order.append(i)))
+        thread.start()
+        threads.append(thread)
+        _wait_for_waiters(bucket, i + 1)
+    for thread in threads:
+        thread.join(5)
+    assert order == [0, 1, 2]
+
+
+def test_acquire_times_out():
+    bucket = _drained(0.5)
+    with pytest.raises(RateLimitExceeded):
+        bucket.acquire(INTERACTIVE, 0.05)
+    assert bucket.snapshot()['waiting'] == 0
+
+
+def test_throttled_pauses_and_cuts_the_rate():
+    bucket = TokenBucket(10.0, 10)
+    bucket.throttled()
+    snapshot = bucket.snapshot()
+    assert snapshot['tokens'] <= 0
+    assert snapshot['rate_per_minute'] == pytest.approx(300.0)
+    assert snapshot['blocked_for'] > 0.9
+    assert bucket.backoff == 2 * rate_limit.BACKOFF_INITIAL
+
+    bucket.throttled()
+    assert bucket.rate == pytest.approx(2.5)
+    assert bucket.backoff == 4 * rate_limit.BACKOFF_INITIAL
+
+
+def test_rate_never_drops_below_the_floor_and_recovers():
+    bucket = TokenBucket(10.0, 10)
+    for _ in range(10):
+        bucket.throttled(retry_after=0.01)
+    assert bucket.rate == pytest.approx(10.0 * rate_limit.MIN_RATE_SHARE)
+
+    bucket.succeeded()
+    assert bucket.backoff == rate_limit.BACKOFF_INITIAL
+    assert bucket.rate == pytest.approx(10.0 * (rate_limit.MIN_RATE_SHARE + rate_limit.RECOVERY_STEP))
+    for _ in range(100):
+        bucket.succeeded()
+    assert bucket.rate == 10.0
+
+
+def test_governor_retries_after_429():
+    governor = UpstreamGovernor({('yahoo', 'chart'): (100.0, 5)})
+    attempts = []
+
+    def fetch():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise Throttled(retry_after=0.1)
+        return 'ok'
+
+    assert governor.call('yahoo', 'chart', fetch) == 'ok'
+    # The retry waited out Retry-After before taking a token
+    assert attempts[1] - attempts[0] >= 0.09
+    assert governor.buckets[('yahoo', 'chart')].rate == pytest.approx(50.0 + 100.0 * rate_limit.RECOVERY_STEP)
+
+
+def test_governor_gives_up_after_retries():
+    governor = UpstreamGovernor({('yahoo', 'chart'): (1000.0, 5)})
+    attempts = []
+
+    def fetch():
+        attempts.append(1)
+        raise Throttled(retry_after=0.01)
+
+    with pytest.raises(Throttled):
+        governor.call('yahoo', 'chart', fetch)
+    assert len(attempts) == rate_limit.RATE_LIMIT_RETRIES + 1
+
+
+def test_governor_passes_unlimited_and_other_errors_through():
+    governor = UpstreamGovernor({('finnhub', 'quote'): (1.0, 1)})
+    assert governor.call('yahoo', 'chart', lambda: 'unlimited') == 'unlimited'
+    with pytest.raises(ValueError):
+        with upstream_priority(BATCH):
+            governor.call('finnhub', 'quote', lambda: (_ for _ in ()).throw(ValueError('bad ticker')))
+
+
+def test_is_rate_limited():
+    assert is_rate_limited(Throttled(1))
+    assert is_rate_limited(Exception('FinnhubAPIException(status_code: 429): API limit reached'))
+    assert is_rate_limited(Exception('Too Many Requests'))
+    assert not is_rate_limited(Exception('price 4290.5 out of range'))
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits('finnhub:quote=30/60, yahoo:chart=10/1,broken') == {
+        ('finnhub', 'quote'): (0.5, 30.0),
+        ('yahoo', 'chart'): (10.0, 10.0),
+    }
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from src.providers.base import DataProvider, ProviderError
+from src.providers.registry import ProviderRegistry
+
+
+class StubProvider(DataProvider):
+    def __init__(self, name, quote=None, hedged=True):
+        self.name = name
+        self.data_source = name
+        self.hedged = hedged
+        self._quote = quote
+        self.calls = 0
+
+    def quote(self, asx_ticker):
+        self.calls += 1
+        if self._quote is None:
+            raise ProviderError(f'{self.name} is down')
+        return self._quote
+
+
+def _registry(*providers, **kwargs):
+    registry = ProviderRegistry(failover=[p.name for p in providers], **kwargs)
+    for provider in providers:
+        registry.register(provider)
+    return registry
+
+
+def test_fails_over_to_the_next_provider():
+    down = StubProvider('yahoo')
+    up = StubProvider('finnhub', quote={'c': 1.0})
+    assert _registry(down, up).quote('bhp', 'yahoo') == {'c': 1.0}
+    assert down.calls == 1 and up.calls == 1
+
+
+def test_unhedged_primary_never_fails_over():
+    demo = StubProvider('demo', hedged=False)
+    other = StubProvider('yahoo', quote={'c': 1.0})
+    registry = _registry(demo, other)
+    assert registry.order_for('demo') == ['demo']
+    with pytest.raises(ProviderError):
+        registry.quote('bhp', 'demo')
+    assert other.calls == 0
+
+
+def test_quote_source_is_asked_first():
+    provider = StubProvider('demo', quote={'c': 2.0})
+    asked = []
+
+    def quote_source(asx_ticker, primary):
+        asked.append((asx_ticker, primary))
+        return {'c': 1.0} if asx_ticker == 'BHP.AX' else None
+
+    registry = _registry(provider, quote_source=quote_source)
+    assert registry.quote('bhp', 'demo') == {'c': 1.0}
+    assert registry.quote('cba', 'demo') == {'c': 2.0}
+    assert asked == [('BHP.AX', 'demo'), ('CBA.AX', 'demo')]
+    assert provider.calls == 1
+
+
+class AsyncStubProvider:
+    hedged = True
+    note = None
+
+    def __init__(self, name, quote=None, delay=0.0):
+        self.name = name
+        self.data_source = name
+        self._quote = quote
+        self.delay = delay
+        self.calls = 0
+
+    async def quote(self, asx_ticker):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self._quote is None:
+            raise ProviderError(f'{self.name} is down')
+        return self._quote
+
+
+def test_call_async_fails_over_and_records_stats():
+    down = AsyncStubProvider('finnhub')
+    threaded = StubProvider('yahoo', quote={'c': 1.0})
+    registry = _registry(threaded)
+    registry.failover = ['finnhub', 'yahoo']
+    registry.register_async(down)
+
+    provider, quote = asyncio.run(registry.call_async('quote', 'BHP.AX', 'finnhub'))
+    assert (provider.name, quote) == ('yahoo', {'c': 1.0})
+    assert registry.snapshot()['finnhub']['error_rate'] == 1.0
+    assert registry.snapshot()['yahoo']['calls'] == 1
+
+
+def test_call_async_hedges_a_slow_provider():
+    slow = AsyncStubProvider('finnhub', quote={'c': 1.0}, delay=2.0)
+    fast = AsyncStubProvider('yahoo', quote={'c': 2.0})
+    registry = ProviderRegistry(failover=['finnhub', 'yahoo'])
+    registry.register_async(slow)
+    registry.register_async(fast)
+    registry.stats['finnhub'].hedge_delay = lambda: 0.05
+
+    provider, quote = asyncio.run(registry.call_async('quote', 'BHP.AX', 'finnhub'))
+    assert (provider.name, quote) == ('yahoo', {'c': 2.0})
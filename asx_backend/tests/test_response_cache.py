@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from flask import Flask
+
+from src.services import json_codec, response_cache as response_cache_module
+from src.services.demo_data import demo_snapshot
+from src.services.json_codec import FastJSONProvider, encode_analysis
+from src.services.response_cache import ResponseCache, cached_analysis_response, etag_matches
+
+NOW = 1760000000.0
+
+
+def _payload(timestamp='2025-10-09T10:00:00', price=None):
+    sections = demo_snapshot('CBA', now=NOW)
+    payload = {
+        'ticker': 'CBA',
+        'asx_ticker': 'CBA.AX',
+        'profile': dict(sections['profile'], name='Société Générale – Test ✓'),
+        'quote': dict(sections['quote']),
+        'financials': sections['financials'],
+        'sentiment': sections['sentiment'],
+        'history': {'close': np.array([1.5, 2.25]), 'count': np.int64(2), 'beta': np.float64(0.8)},
+        'data_source': 'Demo',
+        'timestamp': timestamp
+    }
+    if price is not None:
+        payload['quote']['c'] = price
+    return payload
+
+
+@pytest.fixture
+def client(monkeypatch):
+    cache = ResponseCache(ttl=60)
+    monkeypatch.setattr(response_cache_module, 'response_cache', cache)
+    builds = []
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    @app.route('/analyze/<ticker>')
+    def analyze(ticker):
+        def build():
+            builds.append(ticker)
+            if ticker == 'BAD':
+                raise ValueError('no data')
+            return _payload(timestamp=f'build {len(builds)}')
+        try:
+            return cached_analysis_response(('demo', ticker), build)
+        except Exception as e:
+            return {'error': f'Failed to analyze stock {ticker}', 'message': str(e)}, 500
+
+    client = app.test_client()
+    client.cache, client.builds = cache, builds
+    return client
+
+
+def test_if_none_match_gets_304(client):
+    first = client.get('/analyze/CBA')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'no-cache'
+    assert first.get_json()['asx_ticker'] == 'CBA.AX'
+
+    again = client.get('/analyze/CBA', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+    assert client.get('/analyze/CBA', headers={'If-None-Match': f'"other", W/{etag}'}).status_code == 304
+    assert client.get('/analyze/CBA', headers={'If-None-Match': '"other"'}).status_code == 200
+    assert client.builds == ['CBA']
+    assert client.cache.stats['not_modified'] == 2
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', 'abc')
+    assert etag_matches('W/"abc"', 'abc')
+    assert etag_matches('"x", "abc"', 'abc')
+    assert etag_matches('*', 'abc')
+    assert not etag_matches('"abcd"', 'abc')
+    assert not etag_matches(None, 'abc')
+    assert not etag_matches('', 'abc')
+
+
+def test_etag_ignores_timestamp():
+    body, etag = encode_analysis(_payload(timestamp='2025-10-09T10:00:00'))
+    rebuilt, rebuilt_etag = encode_analysis(_payload(timestamp='2025-10-09T10:00:05'))
+    assert body != rebuilt
+    assert etag == rebuilt_etag
+    assert encode_analysis(_payload(price=123.45))[1] != etag
+
+
+def test_errors_are_never_cached(client):
+    assert client.get('/analyze/BAD').status_code == 500
+    assert client.get('/analyze/BAD').status_code == 500
+    assert client.builds == ['BAD', 'BAD']
+    assert len(client.cache) == 0
+
+
+def test_orjson_and_stdlib_encode_identical_bytes(monkeypatch):
+    if json_codec.orjson is None:
+        pytest.skip('orjson is not installed')
+    payload = _payload()
+    fast = encode_analysis(payload)
+    monkeypatch.setattr(json_codec, 'orjson', None)
+    # The stdlib path splices in the pre-encoded profile: check a hit as well
+    assert encode_analysis(payload) == fast
+    assert encode_analysis(payload) == fast
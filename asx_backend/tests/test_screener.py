@@ -0,0 +1,54 @@
+import threading
+
+from src.services.screener import FIELD_ALIASES, Screener
+
+
+class Built:
+    def __init__(self, built_monotonic):
+        self.built_monotonic = built_monotonic
+
+
+def test_first_snapshot_builds_in_the_background():
+    release = threading.Event()
+    builds = []
+
+    def build():
+        builds.append(1)
+        release.wait(5)
+        return Built(float('inf'))
+
+    screener = Screener(build=build, refresh=60)
+    assert screener.snapshot() is None
+    assert screener.snapshot() is None
+    release.set()
+    for _ in range(500):
+        if screener.snapshot() is not None:
+            break
+        threading.Event().wait(0.01)
+    assert isinstance(screener.snapshot(), Built)
+    assert len(builds) == 1
+
+
+def test_failed_build_is_retried():
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('upstream down')
+        return Built(float('inf'))
+
+    screener = Screener(build=build, refresh=60)
+    snapshot = None
+    for _ in range(500):
+        snapshot = screener.snapshot()
+        if snapshot is not None:
+            break
+        threading.Event().wait(0.01)
+    assert isinstance(snapshot, Built)
+    assert len(attempts) == 2
+
+
+def test_roa_alias():
+    assert FIELD_ALIASES['roa'] == 'roaTTM'
+    assert FIELD_ALIASES['roae'] == 'roaeTTM'
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.singleflight import AsyncSingleFlight, SingleFlight, flight_key
+
+
+def test_concurrent_callers_share_one_fetch():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'price': 1.0}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('BHP.AX', fetch)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.stats['leaders'] + flight.stats['shared'] < 8 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{'price': 1.0}] * 8
+    assert flight.stats == {'leaders': 1, 'shared': 7}
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(5)
+        raise ValueError('upstream down')
+
+    errors = []
+
+    def call():
+        try:
+            flight.do('key', fetch)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    while flight.stats['shared'] < 1:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert errors == ['upstream down', 'upstream down']
+    assert flight.in_flight() == 0
+
+
+def test_sequential_calls_fetch_again():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do('key', lambda: next(counter)) == 0
+    assert flight.do('key', lambda: next(counter)) == 1
+    assert flight.stats == {'leaders': 2, 'shared': 0}
+
+
+def test_distinct_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 'A') == 'A'
+    assert flight.do('b', lambda: 'B') == 'B'
+    assert flight.stats['shared'] == 0
+
+
+def test_async_waiters_share_the_leader_task():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        return await asyncio.gather(*(flight.do('key', fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == [42] * 5
+    assert len(calls) == 1
+    assert flight.stats == {'leaders': 1, 'shared': 4}
+    assert flight.in_flight() == 0
+
+
+def test_async_cancelled_waiter_does_not_cancel_fetch():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(main()) == 'done'
+
+
+def test_flight_key_normalises_ticker_and_params():
+    assert flight_key('yahoo', 'chart', 'bhp', {'range': '1y', 'interval': '1d'}) == \
+        flight_key('yahoo', 'chart', 'BHP.AX', {'interval': '1d', 'range': '1y'})
+    assert flight_key('yahoo', 'chart', 'BHP', None) != flight_key('finnhub', 'chart', 'BHP', None)
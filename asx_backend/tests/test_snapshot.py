@@ -0,0 +1,72 @@
+import numpy as np
+from flask import Flask
+
+from src.routes import snapshot as snapshot_route
+from src.services.analytics import SECONDS_PER_DAY, PriceSeries
+from src.services.bar_store import BarStore
+from src.services.cache import TieredCache
+from src.services.snapshot import ExportCache, Snapshot, export_snapshot, load_snapshot
+
+
+def _series(days, adjclose_offset=0.0):
+    days = np.asarray(days)
+    close = days + 10.0
+    return PriceSeries(days * SECONDS_PER_DAY, close, close, close, close, np.full(len(days), 100.0),
+                       close - adjclose_offset)
+
+
+def _snapshot(tmp_path, series):
+    source = BarStore(str(tmp_path / 'source.db'))
+    source.merge('BHP.AX', series)
+    cache = TieredCache(db_path=None)
+    return Snapshot(export_snapshot(cache=cache, bar_store=source)), cache
+
+
+def test_load_merges_only_bars_after_the_local_history(tmp_path):
+    snapshot, cache = _snapshot(tmp_path, _series(range(20)))
+    local = BarStore(str(tmp_path / 'local.db'))
+    # Same basis, but the local copy of the last overlapping bar was provisional
+    provisional = _series(range(10))
+    provisional.close[-1] = provisional.adjclose[-1] = 99.0
+    local.merge('BHP.AX', provisional)
+
+    result = load_snapshot(snapshot, cache=cache, bar_store=local)
+    assert result['bars'] == 10
+    series = local.load('BHP.AX')
+    assert len(series) == 20
+    assert series.close[9] == 99.0
+
+
+def test_load_replaces_a_rebased_history(tmp_path):
+    snapshot, cache = _snapshot(tmp_path, _series(range(20), adjclose_offset=1.0))
+    local = BarStore(str(tmp_path / 'local.db'))
+    local.merge('BHP.AX', _series(range(10)))
+
+    result = load_snapshot(snapshot, cache=cache, bar_store=local)
+    assert result['bars'] == 20
+    series = local.load('BHP.AX')
+    np.testing.assert_allclose(series.close - series.adjclose, 1.0)
+
+
+def test_export_cache_reuses_bytes():
+    exports = []
+    cache = ExportCache(export=lambda: exports.append(1) or b'snap', ttl=60)
+    assert cache.get() == cache.get() == b'snap'
+    assert len(exports) == 1
+
+
+def test_route_requires_the_token(monkeypatch):
+    app = Flask(__name__)
+    app.register_blueprint(snapshot_route.snapshot_bp, url_prefix='/api')
+    client = app.test_client()
+    monkeypatch.setattr(snapshot_route, 'export_cache', ExportCache(export=lambda: b'snap'))
+
+    monkeypatch.setattr(snapshot_route, 'SNAPSHOT_TOKEN', None)
+    assert client.get('/api/snapshot').status_code == 404
+
+    monkeypatch.setattr(snapshot_route, 'SNAPSHOT_TOKEN', 'secret')
+    assert client.get('/api/snapshot').status_code == 401
+    assert client.get('/api/snapshot', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/api/snapshot', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert response.data == b'snap'
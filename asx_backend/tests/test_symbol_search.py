@@ -0,0 +1,82 @@
+from src.services.symbol_search import SymbolIndex, _edit_distance, load_listing
+
+SECURITIES = [
+    {'code': 'BHP', 'symbol': 'BHP.AX', 'name': 'BHP Group Limited', 'sector': 'Materials'},
+    {'code': 'BHPX', 'symbol': 'BHPX.AX', 'name': 'Bhpx Minerals', 'sector': 'Materials'},
+    {'code': 'CBA', 'symbol': 'CBA.AX', 'name': 'Commonwealth Bank of Australia', 'sector': 'Banks'},
+    {'code': 'WBC', 'symbol': 'WBC.AX', 'name': 'Westpac Banking Corporation', 'sector': 'Banks'},
+    {'code': 'WES', 'symbol': 'WES.AX', 'name': 'Wesfarmers Limited', 'sector': 'Retailing'},
+    {'code': 'WOW', 'symbol': 'WOW.AX', 'name': 'Woolworths Group Limited', 'sector': 'Food Retailing'},
+    {'code': 'FMG', 'symbol': 'FMG.AX', 'name': 'Fortescue Metals Group', 'sector': 'Materials'},
+]
+
+
+def _codes(results):
+    return [s['code'] for s in results]
+
+
+def test_exact_code_ranks_above_prefix():
+    assert _codes(SymbolIndex(SECURITIES).search('bhp')) == ['BHP', 'BHPX']
+
+
+def test_ax_suffix_is_ignored():
+    assert _codes(SymbolIndex(SECURITIES).search('CBA.AX'))[0] == 'CBA'
+
+
+def test_name_word_and_prefix():
+    index = SymbolIndex(SECURITIES)
+    assert _codes(index.search('woolworths')) == ['WOW']
+    assert _codes(index.search('wesf')) == ['WES']
+
+
+def test_exact_name_word_ranks_above_name_prefix():
+    # "Bank" is a word of CBA's name; Westpac only has "Banking"
+    assert _codes(SymbolIndex(SECURITIES).search('bank')) == ['CBA', 'WBC']
+
+
+def test_sector_matches_rank_below_names():
+    index = SymbolIndex(SECURITIES)
+    assert _codes(index.search('retailing')) == ['WES', 'WOW']
+    assert _codes(index.search('food')) == ['WOW']
+
+
+def test_typos_match_names():
+    index = SymbolIndex(SECURITIES)
+    assert _codes(index.search('wolworths')) == ['WOW']
+    assert _codes(index.search('fortsecue')) == ['FMG']
+    assert _codes(index.search('commonwelth bank')) == ['CBA']
+
+
+def test_short_words_do_not_fuzzy_match():
+    assert SymbolIndex(SECURITIES).search('xyz') == []
+
+
+def test_every_query_word_must_match():
+    index = SymbolIndex(SECURITIES)
+    assert _codes(index.search('group metals')) == ['FMG']
+    assert index.search('woolworths zzzzzz') == []
+
+
+def test_limit_and_tiebreak():
+    results = _codes(SymbolIndex(SECURITIES).search('materials', limit=2))
+    # Equal sector scores fall back to the shorter name
+    assert results == ['BHPX', 'BHP']
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert _edit_distance('fortescue', 'fortsecue', 2) == 1
+    assert _edit_distance('abc', 'abc', 1) == 0
+    assert _edit_distance('abcdef', 'zzzzzz', 2) == 3
+
+
+def test_load_listing_reads_asx_export(tmp_path):
+    path = tmp_path / 'ASXListedCompanies.csv'
+    path.write_text(
+        'ASX listed companies as at Mon Jan 01 2024\n\n'
+        'Company name,ASX code,GICS industry group\n'
+        'BHP GROUP LIMITED,BHP,Materials\n'
+        'BHP GROUP LIMITED,BHP,Materials\n'
+        'COMMONWEALTH BANK OF AUSTRALIA,CBA.AX,Banks\n'
+    )
+    listing = load_listing(str(path))
+    assert [(s['symbol'], s['sector']) for s in listing] == [('BHP.AX', 'Materials'), ('CBA.AX', 'Banks')]
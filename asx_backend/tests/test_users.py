@@ -0,0 +1,96 @@
+import pytest
+from flask import Flask
+
+from src.routes.user import user_bp
+from src.services.database import ensure_schema, init_database
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    init_database(app, f"sqlite:///{tmp_path / 'app.db'}")
+    ensure_schema(app)
+    app.register_blueprint(user_bp, url_prefix='/api')
+    client = app.test_client()
+    for name in ('alice', 'bob'):
+        assert client.post('/api/users', json={'username': name, 'email': f'{name}@example.com'}).status_code == 201
+    return client
+
+
+def test_update_user_partial(client):
+    response = client.put('/api/users/1', json={'email': ' alice@example.org '})
+    assert response.status_code == 200
+    assert response.get_json() == {'id': 1, 'username': 'alice', 'email': 'alice@example.org'}
+
+
+def test_update_user_rejects_invalid_fields(client):
+    for body in ({'username': None}, {'email': ''}, {'username': 'x' * 81}, ['alice']):
+        response = client.put('/api/users/1', json=body)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid user'
+    assert client.put('/api/users/1', data='not json', content_type='application/json').status_code == 400
+    assert client.get('/api/users/1').get_json()['username'] == 'alice'
+
+
+def test_update_user_duplicate_is_a_conflict(client):
+    response = client.put('/api/users/2', json={'username': 'alice'})
+    assert response.status_code == 409
+    assert client.get('/api/users/2').get_json()['username'] == 'bob'
+    # The session was rolled back and stays usable
+    assert client.put('/api/users/2', json={'username': 'carol'}).status_code == 200
+
+
+def test_update_missing_user(client):
+    assert client.put('/api/users/99', json={'username': 'dave'}).status_code == 404
+
+
+def test_ensure_schema_skips_an_unchanged_database(tmp_path, monkeypatch):
+    from sqlalchemy import Column, Integer, Table, inspect
+
+    from src.models.user import db
+
+    created = []
+    create_all = db.create_all
+    monkeypatch.setattr(db, 'create_all', lambda *a, **k: (created.append(1), create_all(*a, **k))[1])
+
+    def boot():
+        app = Flask(__name__)
+        init_database(app, f"sqlite:///{tmp_path / 'schema.db'}")
+        return app, ensure_schema(app)
+
+    assert boot()[1] is True
+    assert boot()[1] is False
+    assert len(created) == 1
+
+    # A changed model changes the fingerprint, so the next boot creates it
+    probe = Table('schema_probe', db.metadata, Column('id', Integer, primary_key=True))
+    try:
+        app, ran = boot()
+        assert ran is True and len(created) == 2
+        with app.app_context():
+            assert 'schema_probe' in inspect(db.engine).get_table_names()
+        assert boot()[1] is False
+    finally:
+        db.metadata.remove(probe)
+    assert boot()[1] is True
+
+    # A replaced file starts without the stamp
+    (tmp_path / 'schema.db').unlink()
+    assert boot()[1] is True
+
+
+def test_list_users_returns_everyone_without_paging_parameters(client):
+    users = [{'username': f'user{i}', 'email': f'user{i}@example.com'} for i in range(149)]
+    assert client.post('/api/users/batch', json={'users': users}).status_code in (200, 201)
+
+    response = client.get('/api/users')
+    assert len(response.get_json()) == 151
+    assert 'X-Next-Cursor' not in response.headers
+
+    page = client.get('/api/users?limit=100')
+    assert len(page.get_json()) == 100
+    cursor = page.headers['X-Next-Cursor']
+    rest = client.get(f'/api/users?cursor={cursor}')
+    assert [user['id'] for user in rest.get_json()] == list(range(101, 152))
+    assert 'X-Next-Cursor' not in rest.headers
+    assert client.get('/api/users?limit=x').status_code == 400